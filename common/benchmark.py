@@ -0,0 +1,48 @@
+import math
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+
+
+# 벤치마크 관리 명령어(bench_*)에서 공통으로 쓰는 도구 모음
+
+def percentile(samples, pct):
+    """정렬되지 않은 샘플 목록에서 pct 백분위 값 계산 (nearest-rank 방식)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples):
+    """지연시간 샘플(초)을 ms 단위 요약 통계로 변환"""
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3) if samples else 0.0,
+    }
+
+
+def measure(func, iterations):
+    """func를 iterations번 호출하며 호출별 소요시간(초) 목록 반환"""
+    samples = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        func(i)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+@contextmanager
+def benchmark_database(keepdb=False, verbosity=0):
+    """운영 DB를 건드리지 않도록 테스트 DB를 만들어 그 안에서 벤치마크 실행"""
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, keepdb=keepdb)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity, keepdb=keepdb)
@@ -0,0 +1,218 @@
+import pickle
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+from common.metrics import observe_cache
+
+SEQUENCE_KEY = "tiered:sequence"
+JOURNAL_KEY = "tiered:invalidated:{}"
+_MISSING = object()
+_UNCHECKED = object()
+
+
+class TieredCache(BaseCache):
+    """프로세스별 L1 LRU + 워커 간 공유 L2 캐시 (settings.CACHES 의 다른 alias)
+
+    - 읽기: L1 -> L2 순서, L2 에서 찾은 값은 L1 에 L1_TIMEOUT 동안 보관
+    - 쓰기: 항상 L2 에 쓰고 L1 도 갱신
+    - 무효화: delete/incr 시 L2 의 순번을 올리고 그 순번에 지운 키를 기록(JOURNAL_TIMEOUT 동안 보관),
+      각 프로세스는 VERSION_CHECK_INTERVAL 마다 순번을 확인해 그 사이 기록된 키만 L1 에서 지움
+      (기록이 만료됐거나 JOURNAL_MAX_GAP 보다 많이 밀렸거나 clear 된 경우에는 L1 전체를 비움)
+      (set 으로 덮어쓴 값은 다른 프로세스 L1 에서 최대 L1_TIMEOUT 동안 이전 값이 보일 수 있음)
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.shared_alias = options.get("SHARED", "shared")
+        self.l1_max_entries = options.get("L1_MAX_ENTRIES", 1000)
+        self.l1_timeout = options.get("L1_TIMEOUT", 5)
+        self.check_interval = options.get("VERSION_CHECK_INTERVAL", 1)
+        self.journal_timeout = options.get("JOURNAL_TIMEOUT", 60)
+        self.journal_max_gap = options.get("JOURNAL_MAX_GAP", 1000)
+        self.metrics_name = options.get("METRICS_NAME", "default")  # cache_requests_total 의 cache 라벨
+
+        self._l1 = OrderedDict()  # key -> (만료 시각, pickle 된 값)
+        self._lock = threading.Lock()
+        self._sequence = _UNCHECKED  # 마지막으로 반영한 L2 무효화 순번
+        self._checked_at = 0.0
+        self._stats = {"l1": {"hits": 0, "misses": 0}, "l2": {"hits": 0, "misses": 0}}
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    # --- L1 ---
+
+    def _l1_get(self, l1_key):
+        with self._lock:
+            entry = self._l1.get(l1_key)
+            if entry is None:
+                return _MISSING
+            expires_at, pickled = entry
+            if expires_at <= time.monotonic():
+                del self._l1[l1_key]
+                return _MISSING
+            self._l1.move_to_end(l1_key)
+        # 호출자가 값을 수정해도 L1 이 오염되지 않도록 pickle 로 보관 (LocMemCache 와 동일)
+        return pickle.loads(pickled)
+
+    def _l1_set(self, l1_key, value, timeout):
+        if timeout is not None and timeout <= 0:
+            self._l1_delete(l1_key)
+            return
+        ttl = self.l1_timeout if timeout is None else min(self.l1_timeout, timeout)
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._l1[l1_key] = (time.monotonic() + ttl, pickled)
+            self._l1.move_to_end(l1_key)
+            while len(self._l1) > self.l1_max_entries:
+                self._l1.popitem(last=False)  # 가장 오래 안 쓴 항목 제거
+
+    def _l1_delete(self, l1_key):
+        with self._lock:
+            self._l1.pop(l1_key, None)
+
+    def _check_invalidations(self):
+        """다른 프로세스의 무효화를 반영 (check_interval 마다 L2 의 순번 한 번 조회)"""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        sequence = self.shared.get(SEQUENCE_KEY)
+        previous, self._sequence = self._sequence, sequence
+        if previous is _UNCHECKED or sequence == previous:
+            return  # 처음 확인할 때는 L1 이 이 프로세스가 쓴 값뿐이므로 그대로 둠
+
+        previous = previous or 0  # 순번이 없던 상태 = 0 에서 시작
+        if sequence is None or not 0 < sequence - previous <= self.journal_max_gap:
+            self._l1_clear()  # clear/만료로 순번이 바뀌었거나 너무 많이 밀림
+            return
+        journal_keys = [JOURNAL_KEY.format(n) for n in range(previous + 1, sequence + 1)]
+        journal = self.shared.get_many(journal_keys)
+        if len(journal) < len(journal_keys):
+            self._l1_clear()  # 기록이 만료됐거나 아직 쓰이는 중
+            return
+        with self._lock:
+            for l1_keys in journal.values():
+                for l1_key in l1_keys:
+                    self._l1.pop(l1_key, None)
+
+    def _publish_invalidation(self, l1_keys):
+        """다른 프로세스가 L1 에서 지우도록 키 목록을 새 순번으로 기록"""
+        try:
+            sequence = self.shared.incr(SEQUENCE_KEY)
+        except ValueError:
+            self.shared.add(SEQUENCE_KEY, 0, None)
+            sequence = self.shared.incr(SEQUENCE_KEY)
+        self.shared.set(JOURNAL_KEY.format(sequence), list(l1_keys), self.journal_timeout)
+
+    def _l1_clear(self):
+        with self._lock:
+            self._l1.clear()
+
+    def _count(self, tier, outcome):
+        with self._lock:
+            self._stats[tier][outcome] += 1
+        # caches[alias] 는 스레드마다 다른 객체이므로 프로세스 전체 값은 조회 시점에 메트릭 카운터로 누적
+        observe_cache(self.metrics_name, tier, "hit" if outcome == "hits" else "miss")
+
+    def _timeout_seconds(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    # --- Django cache API ---
+
+    def get(self, key, default=None, version=None):
+        l1_key = self.make_and_validate_key(key, version=version)
+        self._check_invalidations()
+
+        value = self._l1_get(l1_key)
+        if value is not _MISSING:
+            self._count("l1", "hits")
+            return value
+        self._count("l1", "misses")
+
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            self._count("l2", "misses")
+            return default
+        self._count("l2", "hits")
+        self._l1_set(l1_key, value, self.l1_timeout)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        l1_key = self.make_and_validate_key(key, version=version)
+        self.shared.set(key, value, timeout, version=version)
+        self._l1_set(l1_key, value, self._timeout_seconds(timeout))
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        l1_key = self.make_and_validate_key(key, version=version)
+        added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            self._l1_set(l1_key, value, self._timeout_seconds(timeout))
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        l1_key = self.make_and_validate_key(key, version=version)
+        self._l1_delete(l1_key)
+        deleted = self.shared.delete(key, version=version)
+        self._publish_invalidation([l1_key])
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        l1_keys = [self.make_and_validate_key(key, version=version) for key in keys]
+        for l1_key in l1_keys:
+            self._l1_delete(l1_key)
+        self.shared.delete_many(keys, version=version)
+        if l1_keys:
+            self._publish_invalidation(l1_keys)
+
+    def has_key(self, key, version=None):
+        l1_key = self.make_and_validate_key(key, version=version)
+        self._check_invalidations()
+        if self._l1_get(l1_key) is not _MISSING:
+            return True
+        return self.shared.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        l1_key = self.make_and_validate_key(key, version=version)
+        value = self.shared.incr(key, delta, version=version)
+        self._l1_delete(l1_key)
+        self._publish_invalidation([l1_key])
+        return value
+
+    def clear(self):
+        self._l1_clear()
+        self.shared.clear()
+        # 이전 순번과 겹치지 않는 임의 값으로 다시 시작 -> 다른 프로세스는 L1 전체를 비움
+        self.shared.set(SEQUENCE_KEY, random.randrange(self.journal_max_gap + 1, 1 << 40), None)
+
+    def close(self, **kwargs):
+        pass  # L2 커넥션은 공유 alias 쪽에서 정리
+
+    def stats(self):
+        """계층별 hit/miss 통계 (이 캐시 객체 기준, 프로세스 전체 값은 cache_requests_total 메트릭)"""
+        with self._lock:
+            counts = {tier: dict(tier_counts) for tier, tier_counts in self._stats.items()}
+            entries = len(self._l1)
+        stats = {
+            tier: {**hits, "hit_ratio": round(hits["hits"] / max(hits["hits"] + hits["misses"], 1), 4)}
+            for tier, hits in counts.items()
+        }
+        stats["l1"]["entries"] = entries
+        return stats
+
+
+def shared_cache():
+    """L1 을 거치지 않는 공유 캐시 (락/버전처럼 모든 워커가 바로 같은 값을 봐야 하는 키용)"""
+    cache = caches["default"]
+    return cache.shared if isinstance(cache, TieredCache) else cache
@@ -0,0 +1,215 @@
+import random
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from common.metrics import observe_upstream
+
+# 외부 API(OpenFoodFacts, 소셜 로그인) 호출용 공용 HTTP 클라이언트
+# - 호스트별 커넥션 풀 + keep-alive (요청마다 TCP/TLS 핸드셰이크 반복 방지)
+# - 멱등 요청(GET 등)만 지수 백오프 + 지터로 제한된 횟수 재시도
+# - 호스트별 서킷 브레이커: 연속 실패 시 일정 시간 즉시 실패 처리
+# - 호스트별 지연시간/에러 카운터 (common.metrics 의 upstream_* 메트릭에도 기록)
+
+DEFAULT_TIMEOUT = 10  # 초
+DEFAULT_RETRIES = 2
+BACKOFF_BASE = 0.2  # 초
+BACKOFF_MAX = 2.0  # 초
+POOL_MAXSIZE = 20  # 호스트별 최대 keep-alive 커넥션 수
+POOL_HOSTS = 10  # 커넥션 풀을 유지할 호스트 수
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+FAILURE_THRESHOLD = 5  # 연속 실패 횟수가 이 값에 도달하면 서킷 오픈
+RESET_TIMEOUT = 30  # 서킷 오픈 유지 시간(초), 이후 1건만 시험 요청 허용
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """서킷이 열려 있어 요청을 보내지 않고 즉시 실패 (기존 RequestException 처리로 함께 잡힘)"""
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self.trial_in_flight:
+                self.trial_in_flight = True  # 반열림 상태에서는 시험 요청 1건만 통과
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class HostStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.rejected = 0  # 서킷 오픈으로 보내지 않은 요청 수
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def as_dict(self):
+        completed = self.requests - self.rejected
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "latency_avg_ms": round(self.latency_total / completed * 1000, 3) if completed else 0.0,
+            "latency_max_ms": round(self.latency_max * 1000, 3),
+        }
+
+
+class HttpClient:
+    def __init__(self, retries=DEFAULT_RETRIES, timeout=DEFAULT_TIMEOUT, pool_maxsize=POOL_MAXSIZE,
+                 failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.retries = retries
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        # Session 하나가 호스트별 urllib3 커넥션 풀을 관리 (pool_block=False: 풀이 차면 임시 커넥션 사용)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.breakers = {}
+        self.stats = defaultdict(HostStats)
+        self.lock = threading.Lock()
+
+    def breaker(self, host):
+        with self.lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self.breakers[host]
+
+    def request(self, method, url, retries=None, **kwargs):
+        """재시도/서킷 브레이커가 적용된 요청. 실패 시 requests 예외를 그대로 발생시킴"""
+        method = method.upper()
+        host = urlsplit(url).netloc
+        breaker = self.breaker(host)
+        stats = self.stats[host]
+        kwargs.setdefault("timeout", self.timeout)
+        if retries is None:
+            # 멱등하지 않은 요청(POST 등)은 중복 처리 위험이 있어 기본적으로 재시도하지 않음
+            retries = self.retries if method in IDEMPOTENT_METHODS else 0
+
+        # 서킷 브레이커에는 재시도를 포함한 요청 하나당 성공/실패 한 번만 기록
+        attempt = 0
+        last_error = last_response = None
+        while True:
+            # 재시도 중에는 시험 요청 자리를 다시 얻지 않고, 다른 요청이 서킷을 연 경우에만 중단
+            allowed = breaker.allow() if attempt == 0 else breaker.state != "open"
+            with breaker.lock:
+                stats.requests += 1
+                if not allowed:
+                    stats.rejected += 1
+            if not allowed:
+                observe_upstream(host, None, "rejected")
+                if attempt == 0:
+                    raise CircuitOpenError(f"{host} 서킷 오픈 상태 (최근 연속 실패)")
+                # 재시도 중 서킷이 열리면 마지막 실패(타임아웃 등)를 그대로 전달
+                breaker.record_failure()
+                if last_response is not None:
+                    return last_response
+                raise last_error
+
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.exceptions.RequestException as e:
+                self.record(host, stats, breaker, started, failed=True)
+                if attempt >= retries:
+                    breaker.record_failure()
+                    raise
+                last_error, last_response = e, None
+            else:
+                failed = response.status_code in RETRY_STATUSES
+                self.record(host, stats, breaker, started, failed=failed)
+                if not failed:
+                    breaker.record_success()
+                    return response
+                if attempt >= retries:
+                    breaker.record_failure()
+                    return response
+                response.close()  # 본문은 이미 읽었으므로 재시도가 막히면 그대로 반환 가능
+                last_error, last_response = None, response
+
+            with breaker.lock:
+                stats.retries += 1
+            attempt += 1
+            time.sleep(self.backoff(attempt))
+
+    def max_duration(self, timeout=None, retries=None):
+        """재시도/백오프를 모두 포함한 멱등 요청 하나의 최대 소요 시간(초) (락 TTL 등 계산용)"""
+        timeout = self.timeout if timeout is None else timeout
+        retries = self.retries if retries is None else retries
+        backoff = sum(min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)) for attempt in range(1, retries + 1))
+        return timeout * (retries + 1) + backoff
+
+    @staticmethod
+    def backoff(attempt):
+        """full jitter 지수 백오프: 0 ~ min(최대값, 기본값 * 2^attempt) 사이 임의 대기"""
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+    @staticmethod
+    def record(host, stats, breaker, started, failed):
+        """시도 하나의 지연시간/에러 기록 (호스트 카운터는 스레드 풀에서도 함께 쓰므로 호스트별 락 안에서 갱신)"""
+        elapsed = time.perf_counter() - started
+        with breaker.lock:
+            stats.latency_total += elapsed
+            stats.latency_max = max(stats.latency_max, elapsed)
+            if failed:
+                stats.errors += 1
+        observe_upstream(host, elapsed, "error" if failed else "success")
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def snapshot(self):
+        """호스트별 카운터와 서킷 상태"""
+        return {
+            host: {**stats.as_dict(), "circuit": self.breaker(host).state}
+            for host, stats in list(self.stats.items())
+        }
+
+
+# 프로세스(gunicorn 워커)마다 하나씩 공유하는 클라이언트
+http_client = HttpClient()
@@ -0,0 +1,122 @@
+import atexit
+import contextvars
+import datetime
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+import uuid
+import zlib
+
+# 구조화(JSON) 로그 + 백그라운드 스레드 출력
+# - BackgroundHandler: 요청 스레드는 레코드를 큐에 넣기만 하고, stdout 쓰기/JSON 변환은 리스너 스레드가 처리
+#   (큐가 가득 차면 기다리지 않고 버린 뒤 버린 개수를 다음 레코드에 남김)
+# - RequestIdFilter: 요청 id(contextvar)를 레코드에 붙임 (RequestIdMiddleware 가 설정)
+# - DebugSamplingFilter: DEBUG 레코드는 요청 id 기준으로 일부 요청만 남김 (샘플된 요청은 DEBUG 전부 기록)
+
+request_id_var = contextvars.ContextVar("request_id", default=None)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")  # 외부에서 받은 id 는 이 형식일 때만 사용
+QUEUE_SIZE = 10_000
+
+# LogRecord 기본 속성 (나머지는 extra 로 넘긴 필드로 보고 JSON 에 포함)
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+
+def new_request_id(header_value=None):
+    """요청 헤더 값이 올바르면 그대로, 아니면 새 id"""
+    if header_value and REQUEST_ID_PATTERN.match(header_value):
+        return header_value
+    return uuid.uuid4().hex
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record):
+        if not hasattr(record, "request_id"):
+            # django.request 로그는 미들웨어가 끝난 뒤 기록되므로 레코드의 request 에서 가져옴
+            request = getattr(record, "request", None)
+            record.request_id = request_id_var.get() or getattr(request, "request_id", None)
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """DEBUG 레코드를 rate 비율의 요청에서만 통과 (INFO 이상은 항상 통과)"""
+
+    def __init__(self, rate=0.01):
+        super().__init__()
+        self.rate = float(rate)
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.rate >= 1:
+            return True
+        request_id = getattr(record, "request_id", None) or request_id_var.get()
+        if request_id is None:
+            return random.random() < self.rate
+        # 같은 요청의 DEBUG 레코드는 모두 남기거나 모두 버림
+        return zlib.crc32(request_id.encode()) % 10_000 < self.rate * 10_000
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        data.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS})
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc_info"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class BackgroundHandler(logging.handlers.QueueHandler):
+    """큐에 넣기만 하는 핸들러 (실제 출력은 QueueListener 스레드가 stream 에 씀)"""
+
+    def __init__(self, stream=None, queue_size=QUEUE_SIZE):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.target = logging.StreamHandler(stream or sys.stdout)
+        self.listener = logging.handlers.QueueListener(self.queue, self.target, respect_handler_level=False)
+        self.dropped = 0
+        self.listener.start()
+        atexit.register(self.close)
+
+    def setFormatter(self, fmt):
+        # 변환은 리스너 스레드에서 하도록 실제 출력 핸들러에 설정
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # 호출 스레드에서는 메시지 인자만 합치고(인자가 나중에 바뀔 수 있으므로) 포맷은 하지 않음
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        if self.dropped:
+            record.dropped_records, self.dropped = self.dropped, 0
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """큐에 남은 레코드를 모두 출력할 때까지 대기 (테스트/벤치마크용)"""
+        if self.listener._thread is not None:
+            self.queue.join()
+
+    def close(self):
+        if self.listener._thread is not None:
+            self.listener.stop()  # 남은 레코드를 모두 출력한 뒤 종료
+        self.target.close()
+        super().close()
@@ -0,0 +1,304 @@
+import datetime
+import json
+import random
+import subprocess
+import time
+import tracemalloc
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from common.benchmark import benchmark_database, summarize
+from common.stub_server import StubServer
+from diet.models import Diet
+from dietfood.models import DietFood
+from food.models import Food
+from food.openfoodfacts import SEARCH_PATH
+from food.stubs import openfoodfacts_search_handler
+from user.models import Profile, User
+
+WORDS = [
+    "organic", "banana", "apple", "greek", "yogurt", "chicken", "breast", "brown", "rice", "oat", "milk",
+    "almond", "peanut", "butter", "whole", "wheat", "bread", "tofu", "salmon", "tuna", "spinach", "kimchi",
+]
+PASSWORD = "bench-password"
+FOODS_PER_DIET = 5
+RESERVED_FOODS = 1000  # 식단에 넣지 않은 음식 (추가/삭제 시나리오용)
+REGRESSION_PCT = 20  # --compare 시 p95 가 이 비율 이상 늘면 회귀로 표시
+
+
+def oauth_routes(email, name):
+    """구글/카카오/네이버 토큰 발급과 사용자 정보 API 스텁 (항상 같은 사용자로 응답)"""
+
+    def token(method, params, body):
+        if not params.get("code"):
+            return 400, {"error": "invalid_grant"}
+        return 200, {"access_token": f"stub-token-{params['code']}", "token_type": "bearer"}
+
+    return {
+        "/google/token": token,
+        "/google/userinfo": lambda method, params, body: (200, {"email": email, "name": name}),
+        "/kakao/token": token,
+        "/kakao/userinfo": lambda method, params, body: (
+            200, {"kakao_account": {"email": email}, "properties": {"nickname": name}}
+        ),
+        "/naver/token": token,
+        "/naver/userinfo": lambda method, params, body: (200, {"response": {"email": email, "name": name}}),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "API 엔드포인트 벤치마크 (테스트 DB 에 합성 데이터를 채우고 실제 URLconf 를 호출, "
+        "OpenFoodFacts/OAuth 는 로컬 스텁 서버 사용) -> 엔드포인트별 지연시간/쿼리 수/메모리 JSON 리포트"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--foods", type=int, default=20_000)
+        parser.add_argument("--diets-per-user", type=int, default=30)
+        parser.add_argument("--iterations", type=int, default=50, help="엔드포인트별 요청 수")
+        parser.add_argument("--memory-iterations", type=int, default=5, help="tracemalloc 으로 최대 메모리를 잴 요청 수")
+        parser.add_argument("--endpoints", nargs="+", help="이 이름의 엔드포인트만 측정")
+        parser.add_argument("--stub-latency", type=float, default=0.0, help="스텁 서버 응답 지연(초)")
+        parser.add_argument("--output", help="리포트를 저장할 JSON 파일 경로")
+        parser.add_argument("--compare", help="이전 리포트 JSON 과 비교 (p95/쿼리 수 변화)")
+        parser.add_argument("--fail-on-regression", action="store_true", help="회귀가 있으면 오류로 종료")
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        report = {"meta": self.meta(options), "endpoints": {}}
+
+        with benchmark_database():
+            users = self.seed(options)
+            routes = {SEARCH_PATH: openfoodfacts_search_handler(), **oauth_routes(users[0].email, users[0].name)}
+            with StubServer(routes, latency=options["stub_latency"]) as stub, override_settings(
+                **self.stub_settings(stub.url), ALLOWED_HOSTS=["testserver"]
+            ):
+                cache.clear()
+                report["meta"]["vendor"] = connection.vendor
+                for name, scenario in self.scenarios(users, options["iterations"]):
+                    if options["endpoints"] and name not in options["endpoints"]:
+                        continue
+                    result = self.run(scenario, options["iterations"], options["memory_iterations"])
+                    report["endpoints"][name] = result
+                    self.stdout.write(
+                        f"{name:<20} p50={result['p50_ms']:>8}ms  p95={result['p95_ms']:>8}ms  "
+                        f"queries={result['queries_avg']:>5} (max {result['queries_max']})  "
+                        f"peak={result['peak_kb']}KB  errors={result['errors']}"
+                    )
+
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                report["comparison"] = self.compare(json.load(f), report)
+            for name, delta in report["comparison"].items():
+                self.stdout.write(
+                    f"{name:<20} p95 {delta['p95_pct']:+}%  queries {delta['queries_avg_delta']:+}"
+                    + ("  ← 회귀" if delta["regression"] else "")
+                )
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+        self.stdout.write(json.dumps(report, ensure_ascii=False))
+
+        regressions = [name for name, delta in report.get("comparison", {}).items() if delta["regression"]]
+        if options["fail_on_regression"] and regressions:
+            raise CommandError(f"성능 회귀: {', '.join(regressions)}")
+
+    def meta(self, options):
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=settings.BASE_DIR
+            ).stdout.strip() or None
+        except OSError:
+            commit = None
+        return {
+            "commit": commit,
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "django": django.get_version(),
+            "users": options["users"],
+            "foods": options["foods"],
+            "diets_per_user": options["diets_per_user"],
+            "iterations": options["iterations"],
+            "stub_latency": options["stub_latency"],
+        }
+
+    def stub_settings(self, url):
+        return {
+            "OPENFOODFACTS_BASE_URL": url,
+            "GOOGLE_TOKEN_URL": f"{url}/google/token",
+            "GOOGLE_USER_INFO_URL": f"{url}/google/userinfo",
+            "KAKAO_TOKEN_URL": f"{url}/kakao/token",
+            "KAKAO_USER_INFO_URL": f"{url}/kakao/userinfo",
+            "NAVER_TOKEN_URL": f"{url}/naver/token",
+            "NAVER_USER_INFO_URL": f"{url}/naver/userinfo",
+            # 빌드된 영양소 컬럼 테이블이 있어도 쓰지 않도록 빈 경로 사용 (DB 경로 측정)
+            "NUTRIENT_TABLE_DIR": f"{settings.BASE_DIR}/var/bench_nutrient_table_missing",
+        }
+
+    def seed(self, options, batch_size=5000):
+        """사용자/프로필/음식/식단/식단 음식 합성 데이터 저장 -> 사용자 목록"""
+        password = make_password(PASSWORD)  # 해시는 한 번만 계산해 모든 사용자가 공유
+        users = User.objects.bulk_create([
+            User(email=f"bench{n}@example.com", name=f"사용자{n}", nickname=f"bench{n}", password=password)
+            for n in range(options["users"])
+        ])
+        Profile.objects.bulk_create([
+            Profile(user=user, age=self.rng.randint(20, 60), gender=self.rng.choice("MF"),
+                    height=self.rng.uniform(150, 190), weight=self.rng.uniform(45, 95),
+                    target_weight=self.rng.uniform(45, 95),
+                    allergies=self.rng.choice([[], [], ["견과류"], ["유제품"]]))
+            for user in users
+        ])
+
+        for start in range(0, options["foods"], batch_size):
+            foods = []
+            for n in range(start, min(start + batch_size, options["foods"])):
+                protein, carbs, fat = self.rng.uniform(0, 30), self.rng.uniform(0, 70), self.rng.uniform(0, 30)
+                foods.append(Food(
+                    external_id=f"bench-{n}", name=" ".join(self.rng.sample(WORDS, self.rng.randint(2, 4))),
+                    calories=protein * 4 + carbs * 4 + fat * 9, protein=protein, carbs=carbs, fat=fat,
+                ))
+            Food.objects.bulk_create(foods)
+
+        # 앞쪽 RESERVED_FOODS 개는 식단에 넣지 않음 (추가 시나리오가 항상 새 음식을 추가하도록)
+        diet_foods = list(Food.objects.order_by("id")[RESERVED_FOODS:RESERVED_FOODS + batch_size])
+        today = datetime.date.today()
+        for user in users:
+            diets = Diet.objects.bulk_create([
+                Diet(user=user, name=f"식단 {n}", date=today - datetime.timedelta(days=n // 3))
+                for n in range(options["diets_per_user"])
+            ])
+            DietFood.objects.bulk_create([
+                DietFood(diet=diet, food=food, portion_size=self.rng.randint(5, 40) * 10).set_nutrients()
+                for diet in diets for food in self.rng.sample(diet_foods, min(FOODS_PER_DIET, len(diet_foods)))
+            ], batch_size=batch_size)
+        Diet.objects.all().refresh_totals()
+        return users
+
+    def scenarios(self, users, iterations):
+        """(이름, 요청 함수(i) -> 응답) 목록 (추가 -> 양 수정 -> 삭제 순서로 같은 음식을 다룸)"""
+        client = APIClient()
+        auth = {
+            user.id: {"HTTP_AUTHORIZATION": f"Bearer {RefreshToken.for_user(user).access_token}"} for user in users
+        }
+        diets = list(Diet.objects.order_by("id").values_list("id", "user_id"))
+        reserved = list(Food.objects.order_by("id").values_list("external_id", flat=True)[:RESERVED_FOODS])
+        food_names = list(Food.objects.order_by("?").values_list("name", flat=True)[:iterations])
+
+        def user(i):
+            return users[i % len(users)]
+
+        def diet(i):
+            # i 번째 요청이 쓰는 (식단 id, 주인 인증 헤더), 식단마다 예약 음식 하나씩
+            diet_id, user_id = diets[i * 7 % len(diets)]
+            return diet_id, auth[user_id]
+
+        def food(i):
+            return reserved[i % len(reserved)]
+
+        def diet_food_request(method, url_name, data):
+            def request(i):
+                diet_id, headers = diet(i)
+                return getattr(client, method)(reverse(url_name, args=[diet_id]), data(i), format="json", **headers)
+            return request
+
+        def batch(i):
+            diet_id, headers = diet(i + iterations)
+            operations = [
+                {"op": "add", "diet_id": diet_id, "external_ids": [food(i + iterations)], "portion_size": 120},
+                {"op": "set_portion", "diet_id": diet_id,
+                 "updates": [{"external_id": food(i + iterations), "portion_size": 180}]},
+                {"op": "remove", "diet_id": diet_id, "external_ids": [food(i + iterations)]},
+            ]
+            return client.post(reverse("dietfood-batch"), {"operations": operations}, format="json", **headers)
+
+        def social(url_name):
+            return lambda i: client.post(reverse(url_name), {"code": f"code-{i}", "state": "bench"}, format="json")
+
+        return [
+            ("diet-list", lambda i: client.get(reverse("diet-list"), **auth[user(i).id])),
+            ("diet-list-range", lambda i: client.get(
+                reverse("diet-list"), {"from": datetime.date.today() - datetime.timedelta(days=7), "limit": 10},
+                **auth[user(i).id])),
+            ("diet-detail", lambda i: client.get(reverse("diet-detail", args=[diet(i)[0]]), **diet(i)[1])),
+            ("diet-stats", lambda i: client.get(reverse("diet-stats"), {"granularity": "week"}, **auth[user(i).id])),
+            ("diet-create", lambda i: client.post(reverse("diet-create"), **auth[user(i).id])),
+            ("dietfood-add", diet_food_request("post", "dietfood-add",
+                                               lambda i: {"external_ids": [food(i)], "portion_size": 150})),
+            ("dietfood-portion", diet_food_request("put", "dietfood-protionsize",
+                                                   lambda i: {"external_ids": [food(i)], "portion_size": 200})),
+            ("dietfood-remove", diet_food_request("delete", "dietfood-remove",
+                                                  lambda i: {"external_ids": [food(i)]})),
+            ("dietfood-batch", batch),
+            ("food-info", lambda i: client.get(reverse("food-info"), {"query": food_names[i % len(food_names)]})),
+            ("food-info-upstream", lambda i: client.get(reverse("food-info"), {"query": f"stub product {i}"})),
+            ("food-search", lambda i: client.get(reverse("food-search"), {"query": food_names[i % len(food_names)]})),
+            ("user-me", lambda i: client.get(reverse("my-info"), **auth[user(i).id])),
+            ("user-profile", lambda i: client.get(reverse("profile"), **auth[user(i).id])),
+            ("user-login", lambda i: client.post(
+                reverse("login"), {"email": user(i).email, "password": PASSWORD}, format="json")),
+            ("social-google", social("google-login")),
+            ("social-kakao", social("kakao-login")),
+            ("social-naver", social("naver-login")),
+        ]
+
+    def run(self, scenario, iterations, memory_iterations):
+        """요청별 지연시간/쿼리 수 측정 후, 별도 요청 몇 번으로 tracemalloc 최대 메모리 측정"""
+        samples, query_counts, errors = [], [], []
+        for i in range(iterations):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = scenario(i)
+                samples.append(time.perf_counter() - started)
+            query_counts.append(len(queries))
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+
+        # tracemalloc 은 느리므로 지연시간 측정과 분리 (측정한 요청 이후 번호를 사용해 같은 데이터 재사용 방지)
+        peak = 0
+        tracemalloc.start()
+        try:
+            for i in range(iterations, iterations + memory_iterations):
+                tracemalloc.reset_peak()
+                scenario(i)
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+
+        return {
+            **summarize(samples),
+            "queries_avg": round(sum(query_counts) / len(query_counts), 2) if query_counts else 0,
+            "queries_max": max(query_counts, default=0),
+            "peak_kb": round(peak / 1024, 1),
+            "errors": len(errors),
+            "error_statuses": sorted(set(errors)),
+        }
+
+    def compare(self, old, new):
+        """엔드포인트별 p95/평균 쿼리 수 변화 (p95 가 REGRESSION_PCT% 이상 늘거나 쿼리가 늘면 회귀)"""
+        comparison = {}
+        for name, result in new["endpoints"].items():
+            before = old.get("endpoints", {}).get(name)
+            if before is None:
+                continue
+            p95_pct = round((result["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100, 1) if before["p95_ms"] else 0.0
+            queries_delta = round(result["queries_avg"] - before["queries_avg"], 2)
+            comparison[name] = {
+                "p95_ms_before": before["p95_ms"],
+                "p95_ms_after": result["p95_ms"],
+                "p95_pct": p95_pct,
+                "queries_avg_delta": queries_delta,
+                "regression": p95_pct >= REGRESSION_PCT or queries_delta > 0,
+            }
+        return comparison
@@ -0,0 +1,97 @@
+import json
+import logging
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from common.benchmark import measure, summarize
+from common.logging import BackgroundHandler, DebugSamplingFilter, JsonFormatter, RequestIdFilter, request_id_var
+from food.openfoodfacts import product_to_food_data
+from food.stubs import fake_product
+
+
+class SlowStream:
+    """쓰기마다 지연되는 출력 (파이프가 막힌 stdout 흉내)"""
+
+    def __init__(self, stream, latency):
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, data):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.stream.write(data)
+
+    def flush(self):
+        self.stream.flush()
+
+
+class Command(BaseCommand):
+    help = "식단 생성 요청 하나가 남기던 로그(print 9줄, 음식 샘플 repr 포함)를 print/동기 로깅/백그라운드 로깅으로 비교"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=2000, help="요청 수")
+        parser.add_argument("--sink-latency-ms", type=float, default=0.0, help="출력 쓰기마다 추가할 지연 (ms)")
+        parser.add_argument("--debug-rate", type=float, default=0.01, help="DEBUG 로그를 남길 요청 비율")
+
+    def handle(self, *args, **options):
+        foods = [product_to_food_data(fake_product(n)) for n in range(500)]
+        meals = [[(n * 3 + i, 100.0) for i in range(3)] for n in range(3)]
+        latency = options["sink_latency_ms"] / 1000
+        report = {"iterations": options["iterations"], "sink_latency_ms": options["sink_latency_ms"], "results": {}}
+
+        url = "https://world.openfoodfacts.org/cgi/search.pl?search_terms=organic"
+
+        with tempfile.TemporaryFile("w+", encoding="utf-8") as sink:
+            stream = SlowStream(sink, latency)
+
+            def print_request(i):
+                print(f"🔍 [API 요청] {url}", file=stream, flush=True)
+                print(f"✅ [최종 데이터] 총 {len(foods)}개 음식 수집 완료", file=stream, flush=True)
+                print(f"📌 [디버그] 외부 API에서 가져온 음식 개수: {len(foods)}", file=stream, flush=True)
+                for food in foods[:5]:
+                    print(f"📌 [디버그] 음식 데이터: {repr(food)}", file=stream, flush=True)
+                print(f"📌 [디버그] 중복 제거 후 음식 개수: {len(foods)}", file=stream, flush=True)
+                print(f"📌 [디버그] 끼니별 선택된 음식: {meals}", file=stream, flush=True)
+
+            report["results"]["print"] = summarize(measure(print_request, options["iterations"]))
+
+            for name, handler in [
+                ("logging_sync", logging.StreamHandler(stream)),
+                ("logging_background", BackgroundHandler(stream)),
+            ]:
+                logger = self.make_logger(handler, options["debug_rate"])
+                samples = measure(lambda i: self.log_request(logger, i, url, foods, meals), options["iterations"])
+                started = time.perf_counter()
+                handler.flush()  # 백그라운드 핸들러는 남은 레코드를 모두 쓸 때까지 대기
+                result = summarize(samples)
+                result["drain_ms"] = round((time.perf_counter() - started) * 1000, 3)
+                report["results"][name] = result
+                handler.close()
+                request_id_var.set(None)
+
+        for name, result in report["results"].items():
+            self.stdout.write(f"{name:<20} p50={result['p50_ms']}ms  p95={result['p95_ms']}ms  p99={result['p99_ms']}ms")
+        self.stdout.write(json.dumps(report, ensure_ascii=False))
+
+    def make_logger(self, handler, debug_rate):
+        handler.setFormatter(JsonFormatter())
+        handler.addFilter(RequestIdFilter())
+        handler.addFilter(DebugSamplingFilter(debug_rate))
+        logger = logging.getLogger(f"bench_logging.{id(handler)}")
+        logger.handlers = [handler]
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        return logger
+
+    def log_request(self, logger, i, url, foods, meals):
+        """diet/services.generate_default_diets 가 요청마다 남기는 로그"""
+        request_id_var.set(f"bench-{i}")
+        logger.debug("외부 API 요청: %s", url)
+        logger.info("외부 음식 %d개 수집", len(foods), extra={"query": "organic", "foods": len(foods)})
+        logger.debug("외부 API 음식 샘플: %r", foods[:5])
+        logger.debug("중복 제거 후 음식 %d개", len(foods))
+        logger.debug("DB에 저장할 새 음식 %d개", 0)
+        logger.debug("알레르기 필터: %s", [])
+        logger.debug("끼니별 선택된 음식: %s", meals)
@@ -0,0 +1,135 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from common.benchmark import benchmark_database, summarize
+from diet.models import Diet
+from dietfood.models import DietFood
+from food.models import Food
+from user.models import Profile, User
+
+PASSWORD = "bench-password"
+
+
+class Command(BaseCommand):
+    help = (
+        "로그인 폭주 중 식단 목록 지연시간 비교 (비밀번호 해시 동시 실행 수 제한 없음 vs 호스트 전체 슬롯 제한) "
+        "-> 로그인 처리량/503 수와 식단 목록 p50/p95 JSON 리포트"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=20)
+        parser.add_argument("--diets-per-user", type=int, default=30)
+        parser.add_argument("--duration", type=float, default=5.0, help="모드별 측정 시간(초)")
+        parser.add_argument("--login-threads", type=int, default=os.cpu_count() or 4, help="동시에 로그인하는 스레드 수")
+        parser.add_argument("--slots", type=int, default=settings.PASSWORD_HASH_WORKERS or 2, help="동시 해시 슬롯 수")
+        parser.add_argument("--output", help="리포트를 저장할 JSON 파일 경로")
+
+    def handle(self, *args, **options):
+        report = {
+            "meta": {key: options[key] for key in ("users", "diets_per_user", "duration", "login_threads", "slots")},
+            "modes": {},
+        }
+        report["meta"]["cpu_count"] = os.cpu_count()
+        slot_dir = tempfile.TemporaryDirectory()
+        modes = {
+            "unbounded": {"PASSWORD_HASH_WORKERS": 0},
+            "bounded": {"PASSWORD_HASH_WORKERS": options["slots"], "PASSWORD_HASH_SLOT_DIR": slot_dir.name},
+        }
+
+        with slot_dir, benchmark_database(), override_settings(ALLOWED_HOSTS=["testserver"]):
+            users = self.seed(options)
+            cache.clear()
+            report["baseline"] = summarize(self.diet_list_load(users, options["duration"], login_threads=0)[0])
+            self.stdout.write(self.format("baseline", report["baseline"]))
+
+            for name, overrides in modes.items():
+                with override_settings(**overrides):
+                    samples, logins = self.diet_list_load(users, options["duration"], options["login_threads"])
+                result = summarize(samples)
+                result["logins"] = logins
+                result["logins_per_sec"] = round(logins.get(200, 0) / options["duration"], 1)
+                report["modes"][name] = result
+                self.stdout.write(self.format(name, result) + f"  logins/s={result['logins_per_sec']}  {logins}")
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+        self.stdout.write(json.dumps(report, ensure_ascii=False))
+
+    def format(self, name, result):
+        return f"{name:<10} diet-list p50={result['p50_ms']:>8}ms  p95={result['p95_ms']:>8}ms  n={result['count']}"
+
+    def seed(self, options):
+        """사용자/프로필/식단 합성 데이터 저장 -> 사용자 목록 (모두 같은 비밀번호)"""
+        password = make_password(PASSWORD)
+        users = User.objects.bulk_create([
+            User(email=f"bench{n}@example.com", name=f"사용자{n}", nickname=f"bench{n}", password=password)
+            for n in range(options["users"])
+        ])
+        Profile.objects.bulk_create([Profile(user=user) for user in users])
+        foods = Food.objects.bulk_create([
+            Food(external_id=f"bench-{n}", name=f"음식 {n}", calories=200, protein=10, carbs=30, fat=5)
+            for n in range(50)
+        ])
+        for user in users:
+            diets = Diet.objects.bulk_create([
+                Diet(user=user, name=f"식단 {n}") for n in range(options["diets_per_user"])
+            ])
+            DietFood.objects.bulk_create([
+                DietFood(diet=diet, food=foods[(diet.id + k) % len(foods)], portion_size=100).set_nutrients()
+                for diet in diets for k in range(3)
+            ])
+        Diet.objects.all().refresh_totals()
+        return users
+
+    def diet_list_load(self, users, duration, login_threads):
+        """login_threads 개 스레드가 로그인을 반복하는 동안 식단 목록 지연시간 측정 -> (샘플, 로그인 상태 코드별 수)"""
+        stop = threading.Event()
+        logins = {}
+        lock = threading.Lock()
+
+        def login_loop(n):
+            client = APIClient()
+            data = {"email": users[n % len(users)].email, "password": PASSWORD}
+            try:
+                while not stop.is_set():
+                    status_code = client.post(reverse("login"), data, format="json").status_code
+                    with lock:
+                        logins[status_code] = logins.get(status_code, 0) + 1
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=login_loop, args=(n,)) for n in range(login_threads)]
+        for thread in threads:
+            thread.start()
+
+        client = APIClient()
+        samples = []
+        deadline = time.perf_counter() + duration
+        i = 0
+        try:
+            while time.perf_counter() < deadline:
+                user = users[i % len(users)]
+                client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+                started = time.perf_counter()
+                client.get(reverse("diet-list"))
+                samples.append(time.perf_counter() - started)
+                i += 1
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+        return samples, logins
@@ -0,0 +1,289 @@
+import atexit
+import fcntl
+import glob
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+# 프로세스 내 메트릭 레지스트리 + Prometheus 텍스트 포맷 출력
+# - 워커(프로세스)마다 값을 메모리에 모으고 백그라운드 스레드가 FLUSH_INTERVAL 마다 METRICS_DIR/<pid>.json 으로 저장
+#   (os.replace 로 교체, 요청 스레드는 메모리 값만 갱신)
+# - 스크레이프 요청을 받은 워커가 모든 워커 파일을 합산해 응답하므로 어느 워커가 받아도 같은 결과
+# - 워커가 종료되면 그 파일 값을 retired.json 합계로 옮기고 파일 삭제 (gunicorn.conf.py 의 child_exit)
+#   같은 pid 를 다시 받은 워커는 처음 저장하기 전에 남아 있는 이전 파일을 같은 방식으로 옮김 (카운터가 줄지 않음)
+# - 카운터/히스토그램만 지원 (합산 가능한 값만 파일로 공유)
+
+FLUSH_INTERVAL = 1.0  # 초
+RETIRED_FILE = "retired.json"  # 종료된 워커 값 합계
+RETIRED_KEEP = 100  # retired.json 에 남길 옮긴 워커 id 수 (옮기는 중인 파일을 두 번 세지 않기 위한 표시)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # 초
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+logger = logging.getLogger("common.metrics")
+
+
+class Counter:
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dump(self):
+        return [[list(key), value] for key, value in self.values.items()]
+
+
+class Histogram(Counter):
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            # [버킷별 누적 개수..., 합계, 개수]
+            state = self.values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def dump(self):
+        return [[list(key), list(state)] for key, state in self.values.items()]
+
+
+class Registry:
+    def __init__(self, directory=None, flush_interval=FLUSH_INTERVAL):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.metrics = {}
+        self.lock = threading.Lock()
+        self.pid = None  # 파일을 저장한 프로세스 (fork 된 워커는 새 id 로 시작)
+        self.instance = None
+        self.flusher_pid = None
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def path(self):
+        directory = self.directory or settings.METRICS_DIR
+        return directory, os.path.join(directory, f"{os.getpid()}.json")
+
+    def start(self):
+        """이 프로세스의 백그라운드 저장 스레드를 (아직 없으면) 시작"""
+        pid = os.getpid()
+        if self.flusher_pid == pid:
+            return
+        with self.lock:
+            if self.flusher_pid == pid:
+                return
+            self.flusher_pid = pid  # fork 된 워커에는 부모의 스레드가 없으므로 pid 로 구분
+        threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:  # 저장 실패로 스레드가 멈추지 않도록 함 (다음 주기에 다시 시도)
+                logger.warning("메트릭 저장 실패", exc_info=True)
+
+    def flush(self):
+        """이 프로세스의 값을 파일로 저장"""
+        with self.lock:
+            data = {name: metric.dump() for name, metric in self.metrics.items()}
+
+        directory, path = self.path()
+        os.makedirs(directory, exist_ok=True)
+        if self.pid != os.getpid():
+            # 같은 pid 를 쓰던 종료된 워커의 파일이 남아 있으면 덮어쓰기 전에 합계로 옮김
+            retire_worker(os.getpid(), directory)
+            self.pid, self.instance = os.getpid(), uuid.uuid4().hex
+        _write_json(path, {"instance": self.instance, "metrics": data})
+
+    def collect(self):
+        """모든 프로세스 파일과 종료된 워커 합계를 합산 -> {이름: {라벨 튜플: 값 또는 [버킷..., 합계, 개수]}}"""
+        self.flush()
+        directory, _ = self.path()
+        retired_path = os.path.join(directory, RETIRED_FILE)
+        workers = [_read_json(path) for path in glob.glob(os.path.join(directory, "*.json")) if path != retired_path]
+        # 워커 파일 다음에 읽어야 그 사이 합계로 옮겨진 워커가 빠지거나 두 번 세지지 않음
+        retired = _read_json(retired_path) or {}
+        merged = {name: {} for name in self.metrics}
+        for data in workers:
+            if data and data.get("instance") not in retired.get("instances", []):
+                merge_metrics(merged, data.get("metrics", {}))
+        merge_metrics(merged, retired.get("metrics", {}))
+        return merged
+
+    def render(self):
+        """Prometheus 텍스트 포맷"""
+        merged = self.collect()
+        lines = []
+        for name, metric in self.metrics.items():
+            kind = "histogram" if isinstance(metric, Histogram) else "counter"
+            lines += [f"# HELP {name} {metric.documentation}", f"# TYPE {name} {kind}"]
+            for key, value in sorted(merged[name].items()):
+                labels = dict(zip(metric.labelnames, key))
+                if kind == "counter":
+                    lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+                    continue
+                for bound, count in zip(metric.buckets, value):
+                    lines.append(f"{name}_bucket{format_labels({**labels, 'le': format_value(bound)})} {count}")
+                lines.append(f"{name}_bucket{format_labels({**labels, 'le': '+Inf'})} {value[-1]}")
+                lines.append(f"{name}_sum{format_labels(labels)} {format_value(value[-2])}")
+                lines.append(f"{name}_count{format_labels(labels)} {value[-1]}")
+        lines += cache_hit_ratio_lines(merged.get(CACHE_REQUESTS.name, {}))
+        return "\n".join(lines) + "\n"
+
+
+def merge_metrics(merged, data):
+    """파일의 {이름: [[라벨 목록, 값], ...]} 를 merged {이름: {라벨 튜플: 값}} 에 더함"""
+    for name, rows in data.items():
+        target = merged.setdefault(name, {})
+        for labels, value in rows:
+            key = tuple(labels)
+            current = target.get(key)
+            if current is None:
+                target[key] = value
+            elif isinstance(value, list):
+                target[key] = [a + b for a, b in zip(current, value)]
+            else:
+                target[key] = current + value
+    return merged
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):  # 다른 프로세스가 삭제/교체 중이거나 깨진 파일
+        return None
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def retire_worker(pid, directory=None):
+    """종료된 워커의 <pid>.json 값을 retired.json 합계에 더하고 파일 삭제 (gunicorn child_exit 에서 호출)"""
+    directory = directory or settings.METRICS_DIR
+    path = os.path.join(directory, f"{pid}.json")
+    if not os.path.exists(path):
+        return
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "retired.lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)  # 마스터와 워커가 동시에 옮겨도 합계를 잃지 않도록 함
+        data = _read_json(path)
+        if data and data.get("instance"):
+            retired_path = os.path.join(directory, RETIRED_FILE)
+            retired = _read_json(retired_path) or {"instances": [], "metrics": {}}
+            if data["instance"] not in retired["instances"]:
+                merged = merge_metrics({}, retired["metrics"])
+                merge_metrics(merged, data.get("metrics", {}))
+                _write_json(retired_path, {
+                    "instances": (retired["instances"] + [data["instance"]])[-RETIRED_KEEP:],
+                    "metrics": {name: [[list(key), value] for key, value in rows.items()]
+                                for name, rows in merged.items()},
+                })
+        try:
+            os.remove(path)  # 합계를 먼저 저장한 뒤 삭제 (collect 는 워커 파일을 먼저 읽음)
+        except FileNotFoundError:
+            pass
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in labels.items()) + "}"
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+registry = Registry()
+
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "요청 처리 시간 (URL 이름별)", ["view", "method", "status"]
+)
+REQUEST_DB_TIME = registry.histogram("http_request_db_seconds", "요청별 DB 쿼리 시간 합계", ["view"])
+REQUEST_QUERIES = registry.counter("http_request_queries_total", "요청에서 실행된 쿼리 수", ["view"])
+UPSTREAM_LATENCY = registry.histogram(
+    "upstream_request_duration_seconds", "외부 API(OpenFoodFacts, OAuth) 요청 시간 (시도별)", ["host"]
+)
+UPSTREAM_REQUESTS = registry.counter(
+    "upstream_requests_total", "외부 API 요청 수 (outcome: success/error/rejected)", ["host", "outcome"]
+)
+CACHE_REQUESTS = registry.counter(
+    "cache_requests_total", "캐시 조회 수 (계층별 hit/miss)", ["cache", "tier", "result"]
+)
+
+
+def cache_hit_ratio_lines(rows):
+    """합산한 hit/miss 카운터로 캐시/계층별 적중률 게이지 계산"""
+    totals = {}
+    for (cache_alias, tier, result), value in rows.items():
+        totals.setdefault((cache_alias, tier), {"hit": 0, "miss": 0})[result] += value
+    lines = ["# HELP cache_hit_ratio 캐시 적중률 (모든 워커 합산)", "# TYPE cache_hit_ratio gauge"]
+    for (cache_alias, tier), counts in sorted(totals.items()):
+        ratio = counts["hit"] / max(counts["hit"] + counts["miss"], 1)
+        lines.append(f"cache_hit_ratio{format_labels({'cache': cache_alias, 'tier': tier})} {round(ratio, 4)}")
+    return lines
+
+
+def observe_request(view, method, status, duration, db_duration, queries):
+    REQUEST_LATENCY.observe(duration, view=view, method=method, status=status)
+    REQUEST_DB_TIME.observe(db_duration, view=view)
+    REQUEST_QUERIES.inc(queries, view=view)
+    registry.start()  # 파일 저장은 백그라운드 스레드에서
+
+
+def observe_upstream(host, duration, outcome):
+    if duration is not None:
+        UPSTREAM_LATENCY.observe(duration, host=host)
+    UPSTREAM_REQUESTS.inc(host=host, outcome=outcome)
+    registry.start()
+
+
+def observe_cache(cache, tier, result):
+    """캐시 조회 1번 (TieredCache 가 조회할 때마다 호출, 스레드별 캐시 객체와 관계없이 프로세스 단위로 누적)"""
+    CACHE_REQUESTS.inc(cache=cache, tier=tier, result=result)
+    registry.start()
+
+
+@atexit.register
+def flush_at_exit():
+    try:
+        registry.flush()
+    except OSError:
+        pass
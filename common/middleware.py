@@ -0,0 +1,223 @@
+import hmac
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+from common import metrics
+from common.logging import REQUEST_ID_HEADER, new_request_id, request_id_var
+from common.profiling import Sampler, save_profile
+
+# 요청별 SQL 계측 미들웨어
+# - connection.execute_wrapper 로 요청 중 실행된 쿼리 수/DB 시간을 모아 로그로 남김
+#   (Server-Timing 헤더는 내부 정보이므로 DEBUG 이거나 staff 사용자일 때만)
+# - 값만 다른 같은 모양의 쿼리가 여러 번 실행되면 N+1 의심으로 경고
+# - 느린 SELECT 는 응답을 보낸 뒤(response.close) EXPLAIN 결과를 함께 로그로 남김 (요청당 최대 SQL_EXPLAIN_MAX 개)
+# - 요청 시간/DB 시간/쿼리 수는 URL 이름별로 common.metrics 에도 기록
+
+logger = logging.getLogger("common.sql")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+
+
+class RequestIdMiddleware:
+    """요청마다 id 를 정해 로그 레코드(common.logging.RequestIdFilter)와 X-Request-ID 응답 헤더에 사용
+
+    앞단(로드밸런서 등)이 보낸 X-Request-ID 가 올바른 형식이면 그대로 이어서 사용
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.request_id = new_request_id(request.headers.get(REQUEST_ID_HEADER))
+        token = request_id_var.set(request.request_id)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_id_var.reset(token)
+        response[REQUEST_ID_HEADER] = request.request_id
+        return response
+
+
+class ProfilingMiddleware:
+    """PROFILE_SAMPLE_RATE 비율의 요청, 또는 X-Profile 헤더에 PROFILE_HEADER_TOKEN 을 담은 요청을 샘플링 프로파일
+
+    결과는 URL 이름별 collapsed stack 파일로 저장 (common/profiling.py), 파일 이름은 X-Profile-Id 응답 헤더
+    """
+
+    HEADER = "X-Profile"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def should_profile(self, request):
+        token = settings.PROFILE_HEADER_TOKEN
+        header = request.headers.get(self.HEADER)
+        # str 비교는 ASCII 가 아닌 문자가 있으면 TypeError 이므로 bytes 로 비교
+        if token and header and hmac.compare_digest(header.encode(), token.encode()):
+            return True
+        return random.random() < settings.PROFILE_SAMPLE_RATE
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        with Sampler() as sampler:
+            response = self.get_response(request)
+        match = getattr(request, "resolver_match", None)
+        try:
+            response["X-Profile-Id"] = save_profile(
+                match.view_name if match else None, getattr(request, "request_id", None) or "request", sampler
+            )
+        except OSError:  # 저장 실패가 응답을 막지 않도록 함
+            logging.getLogger("common.profiling").warning("프로파일 저장 실패", exc_info=True)
+        return response
+
+
+def query_shape(sql):
+    """값/자리표시자를 ? 로 바꾼 쿼리 모양 (IN 목록 길이도 무시)"""
+    shape = _PLACEHOLDER.sub("?", _NUMBER.sub("?", _STRING.sub("?", sql)))
+    return _IN_LIST.sub("(...)", shape)
+
+
+class QueryRecorder:
+    """execute_wrapper 로 등록해 실행된 쿼리를 기록 [(alias, sql, params, 소요 초), ...]"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((context["connection"].alias, sql, params, time.perf_counter() - started))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def duration_ms(self):
+        return sum(duration for *_, duration in self.queries) * 1000
+
+    def repeated(self, threshold):
+        """threshold 번 이상 실행된 같은 모양의 쿼리 [(모양, 횟수), ...]"""
+        shapes = Counter(query_shape(sql) for _, sql, _, _ in self.queries)
+        return [(shape, count) for shape, count in shapes.most_common() if count >= threshold]
+
+    def slow(self, threshold_ms):
+        return [query for query in self.queries if query[3] * 1000 >= threshold_ms]
+
+
+@contextmanager
+def record_queries():
+    """with record_queries() as recorder: ... 블록 안에서 모든 DB 연결이 실행한 쿼리 기록"""
+    recorder = QueryRecorder()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        yield recorder
+
+
+def explain(alias, sql, params):
+    """SELECT 쿼리의 실행 계획 (실행하지 않음, 실패하면 None)"""
+    if not sql.lstrip().upper().startswith("SELECT"):
+        return None
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+            return "\n".join(" ".join(map(str, row)) for row in cursor.fetchall())
+    except Exception:  # 계측 실패가 응답을 막지 않도록 함
+        logger.debug("EXPLAIN 실패", exc_info=True)
+        return None
+
+
+class QueryInstrumentationMiddleware:
+    """요청별 쿼리 수/DB 시간을 common.sql 로그, 메트릭, (DEBUG/staff 면) Server-Timing 헤더로 남김"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.repeat_threshold = settings.SQL_REPEAT_THRESHOLD
+        self.slow_query_ms = settings.SQL_SLOW_QUERY_MS
+        self.explain_max = settings.SQL_EXPLAIN_MAX
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        with record_queries() as recorder:
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - started) * 1000
+
+        if self.show_timing(request):
+            response["Server-Timing"] = ", ".join(filter(None, [
+                response.get("Server-Timing"),
+                f'db;dur={recorder.duration_ms:.1f};desc="{recorder.count} queries"',
+                f"app;dur={total_ms:.1f}",
+            ]))
+        self.log(request, response, recorder, total_ms)
+
+        match = getattr(request, "resolver_match", None)
+        metrics.observe_request(
+            match.view_name if match else "unmatched", request.method, response.status_code,
+            total_ms / 1000, recorder.duration_ms / 1000, recorder.count,
+        )
+        return response
+
+    def show_timing(self, request):
+        # DRF 인증(JWT) 사용자도 뷰가 끝나면 request.user 에 반영됨
+        user = getattr(request, "user", None)
+        return settings.DEBUG or bool(user and user.is_staff)
+
+    def log(self, request, response, recorder, total_ms):
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else None
+        fields = {
+            "method": request.method,
+            "path": request.path,
+            "view": view,
+            "status": response.status_code,
+            "queries": recorder.count,
+            "db_ms": round(recorder.duration_ms, 1),
+            "total_ms": round(total_ms, 1),
+        }
+        logger.info(
+            "%s %s %s %d queries %.1fms (db %.1fms)",
+            request.method, request.path, response.status_code, recorder.count, total_ms, recorder.duration_ms,
+            extra={"sql": fields},
+        )
+
+        for shape, count in recorder.repeated(self.repeat_threshold):
+            logger.warning(
+                "N+1 의심: %s 에서 같은 모양의 쿼리 %d번 실행: %s", view or request.path, count, shape,
+                extra={"sql": {**fields, "repeated": count, "shape": shape}},
+            )
+
+        slow = recorder.slow(self.slow_query_ms)[:self.explain_max]
+        if slow:
+            # EXPLAIN 은 이미 느린 요청을 더 늦추지 않도록 응답을 보낸 뒤 실행
+            # (WSGI 서버가 본문 전송 후 response.close() 호출, DB 연결은 그 다음 request_finished 에서 정리)
+            response._resource_closers.append(
+                lambda: self.log_slow(getattr(request, "request_id", None), view or request.path, fields, slow)
+            )
+
+    def log_slow(self, request_id, view, fields, slow):
+        token = request_id_var.set(request_id)  # 응답 후에는 RequestIdMiddleware 가 이미 값을 되돌림
+        try:
+            for alias, sql, params, duration in slow:
+                plan = explain(alias, sql, params)
+                logger.warning(
+                    "느린 쿼리 %.1fms (%s): %s\n%s", duration * 1000, view, sql, plan or "",
+                    extra={"sql": {**fields, "duration_ms": round(duration * 1000, 1), "query": sql, "plan": plan}},
+                )
+        finally:
+            request_id_var.reset(token)
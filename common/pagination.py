@@ -0,0 +1,44 @@
+import base64
+import datetime
+import json
+
+from django.db.models import Q
+
+# 키셋(커서) 페이지네이션: OFFSET 없이 마지막 행의 정렬 키 다음부터 읽으므로
+# 몇 번째 페이지든 인덱스 범위 스캔 한 번으로 끝남 (정렬 키는 (날짜, id) 내림차순)
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(date, pk):
+    raw = json.dumps([date.isoformat(), pk]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """커서 -> (날짜, id), 형식이 잘못되면 InvalidCursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        date, pk = json.loads(raw)
+        return datetime.date.fromisoformat(date), int(pk)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(str(e)) from e
+
+
+def keyset_page(queryset, cursor=None, limit=30, date_field="date"):
+    """(date_field, id) 내림차순으로 limit 개와 다음 커서(없으면 None) 반환"""
+    queryset = queryset.order_by(f"-{date_field}", "-id")
+    if cursor:
+        date, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(**{f"{date_field}__lt": date}) | Q(**{date_field: date, "id__lt": pk}))
+
+    rows = list(queryset[:limit + 1])  # 한 개 더 읽어 다음 페이지 존재 여부 확인
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, date_field), last.pk)
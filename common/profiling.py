@@ -0,0 +1,117 @@
+import datetime
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+# 운영 요청용 샘플링 프로파일러
+# - 요청을 처리하는 스레드의 스택을 별도 스레드가 PROFILE_INTERVAL 마다 sys._current_frames() 로 읽어 집계
+#   (요청 코드에는 훅을 걸지 않으므로 프로파일 중에도 오버헤드가 작음)
+# - 결과는 flamegraph.pl / speedscope 에서 바로 여는 collapsed stack 형식 ("a;b;c 횟수")
+# - PROFILE_DIR/<URL 이름>/<시각>-<요청 id>.folded 로 저장하고 URL 이름별 최근 PROFILE_KEEP 개만 유지
+
+NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9_.-]*$")  # 다운로드 경로 검사 (. 으로 시작하는 이름 거부)
+SUFFIX = ".folded"
+
+
+class Sampler:
+    """with Sampler(thread_id) as sampler: ... 동안 해당 스레드의 스택을 주기적으로 수집"""
+
+    def __init__(self, thread_id=None, interval=None):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval or settings.PROFILE_INTERVAL
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def profile_dir():
+    return settings.PROFILE_DIR
+
+
+def safe_name(name):
+    """URL 이름 -> 디렉터리 이름 (admin:index 같은 namespace 구분자 치환)"""
+    return re.sub(r"[^A-Za-z0-9_.-]", ".", name or "").lstrip(".") or "unmatched"
+
+
+def save_profile(url_name, request_id, sampler):
+    """collapsed stack 파일 저장 후 이전 파일 정리 -> 파일 이름"""
+    directory = os.path.join(profile_dir(), safe_name(url_name))
+    os.makedirs(directory, exist_ok=True)
+    filename = f"{time.strftime('%Y%m%d%H%M%S')}-{safe_name(request_id)}{SUFFIX}"
+    tmp_path = os.path.join(directory, f".{filename}.tmp")
+    with open(tmp_path, "w") as f:
+        f.write(sampler.collapsed())
+    os.replace(tmp_path, os.path.join(directory, filename))
+    _rotate(directory)
+    return filename
+
+
+def _rotate(directory):
+    files = sorted(name for name in os.listdir(directory) if name.endswith(SUFFIX))
+    for name in files[:max(0, len(files) - settings.PROFILE_KEEP)]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:  # 다른 워커가 먼저 지운 경우
+            pass
+
+
+def list_profiles(url_name=None):
+    """저장된 프로파일 목록 (최신순) [{"url_name", "name", "size", "created_at"}, ...]"""
+    root = profile_dir()
+    if not os.path.isdir(root):
+        return []
+    names = [url_name] if url_name else sorted(os.listdir(root))
+    profiles = []
+    for name in names:
+        directory = os.path.join(root, name)
+        if not NAME_PATTERN.match(name) or not os.path.isdir(directory):
+            continue
+        for filename in os.listdir(directory):
+            if not filename.endswith(SUFFIX):
+                continue
+            stat = os.stat(os.path.join(directory, filename))
+            profiles.append({
+                "url_name": name,
+                "name": filename,
+                "size": stat.st_size,
+                "created_at": datetime.datetime.fromtimestamp(stat.st_mtime, datetime.timezone.utc).isoformat(),
+            })
+    return sorted(profiles, key=lambda profile: profile["name"], reverse=True)
+
+
+def profile_path(url_name, name):
+    """다운로드할 파일 경로 (이름 형식이 잘못됐거나 없으면 None)"""
+    if not NAME_PATTERN.match(url_name) or not NAME_PATTERN.match(name) or not name.endswith(SUFFIX):
+        return None
+    path = os.path.join(profile_dir(), url_name, name)
+    return path if os.path.isfile(path) else None
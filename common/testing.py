@@ -0,0 +1,30 @@
+from contextlib import contextmanager
+
+from common.middleware import record_queries
+
+# 테스트 도우미: 뷰/함수의 쿼리 수 상한(budget) 검사
+# assertNumQueries 와 달리 상한만 검사하고, 실패 시 반복된 쿼리 모양(N+1 의심)을 함께 보여줌
+
+
+class QueryBudgetMixin:
+    """TestCase 에 섞어 쓰는 쿼리 예산 검사
+
+    with self.assertQueryBudget(3):
+        self.client.get(...)
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, budget, repeat_threshold=None):
+        with record_queries() as recorder:
+            yield recorder
+
+        problems = []
+        if recorder.count > budget:
+            problems.append(f"쿼리 {recorder.count}개 실행 (예산 {budget}개)")
+        if repeat_threshold is not None:
+            problems += [
+                f"같은 모양의 쿼리 {count}번 실행: {shape}" for shape, count in recorder.repeated(repeat_threshold)
+            ]
+        if problems:
+            queries = "\n".join(f"{index}. {sql}" for index, (_, sql, _, _) in enumerate(recorder.queries, start=1))
+            self.fail("\n".join(problems) + f"\n\n실행된 쿼리:\n{queries}")
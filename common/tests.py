@@ -1,3 +1,468 @@
-from django.test import TestCase
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from common.cache import JOURNAL_KEY, SEQUENCE_KEY, TieredCache
+from common.http import BACKOFF_BASE, BACKOFF_MAX, CircuitOpenError, HttpClient
+from common.logging import BackgroundHandler, DebugSamplingFilter, JsonFormatter, RequestIdFilter, request_id_var
+from common.metrics import Registry, registry, retire_worker
+from common.middleware import QueryInstrumentationMiddleware, query_shape
+from common.profiling import Sampler
+from common.stub_server import StubServer
+from common.testing import QueryBudgetMixin
+from user.models import User
+
+
+def make_worker_cache():
+    """같은 L2 를 공유하는 별도 프로세스(gunicorn 워커)의 캐시 흉내"""
+    return TieredCache(None, {"OPTIONS": {"SHARED": "shared", "VERSION_CHECK_INTERVAL": 0}})
+
+
+class TieredCacheTest(SimpleTestCase):
+    def setUp(self):
+        caches["shared"].clear()
+        self.worker_a = make_worker_cache()
+        self.worker_b = make_worker_cache()
+
+    def test_l2_hit_then_l1_hit(self):
+        self.worker_a.set("key", {"value": 1})
+        self.assertEqual(self.worker_b.get("key"), {"value": 1})  # L2 hit
+        self.assertEqual(self.worker_b.get("key"), {"value": 1})  # L1 hit
+        stats = self.worker_b.stats()
+        self.assertEqual(stats["l1"]["hits"], 1)
+        self.assertEqual(stats["l2"]["hits"], 1)
+
+    def test_delete_invalidates_other_workers_l1(self):
+        self.worker_a.set("key", "old")
+        self.assertEqual(self.worker_b.get("key"), "old")
+        self.worker_a.delete("key")
+        self.assertIsNone(self.worker_b.get("key"))
+
+    def test_delete_only_invalidates_that_key(self):
+        self.worker_a.set("key", "old")
+        self.worker_a.set("other", "value")
+        self.worker_b.get("key")
+        self.worker_b.get("other")
+
+        self.worker_a.delete("key")
+        self.assertIsNone(self.worker_b.get("key"))
+        self.assertEqual(self.worker_b.get("other"), "value")
+        self.assertEqual(self.worker_b.stats()["l1"]["hits"], 1)
+
+    def test_expired_journal_clears_whole_l1(self):
+        self.worker_a.set("key", "old")
+        self.worker_b.get("key")
+
+        self.worker_a.delete("other")
+        caches["shared"].delete(JOURNAL_KEY.format(caches["shared"].get(SEQUENCE_KEY)))  # 기록 만료
+        caches["shared"].set("key", "new")  # L2 만 바뀐 상태
+        self.assertEqual(self.worker_b.get("key"), "new")
+
+    def test_clear_invalidates_other_workers_l1(self):
+        self.worker_a.set("key", "old")
+        self.worker_b.get("key")
+
+        self.worker_a.clear()
+        self.assertIsNone(self.worker_b.get("key"))
+
+    def test_l1_value_is_copied(self):
+        self.worker_a.set("key", [1])
+        self.worker_a.get("key").append(2)
+        self.assertEqual(self.worker_a.get("key"), [1])
+
+
+class CountingRoute:
+    """앞의 failures 번은 503, 이후 200 으로 응답하는 스텁 경로 (호출 횟수 기록)"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self, method, params, body):
+        self.calls += 1
+        return (503, {}) if self.calls <= self.failures else (200, {"ok": True})
+
+
+@mock.patch.object(HttpClient, "backoff", return_value=0)
+class HttpClientTest(SimpleTestCase):
+    def test_retries_until_success(self, backoff):
+        route = CountingRoute(failures=2)
+        with StubServer({"/flaky": route}) as stub:
+            client = HttpClient(retries=2)
+            response = client.get(f"{stub.url}/flaky")
+            host = stub.url.split("//")[1]
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(route.calls, 3)
+        self.assertEqual(client.snapshot()[host]["retries"], 2)
+        self.assertEqual(client.snapshot()[host]["circuit"], "closed")
+        self.assertEqual([call.args for call in backoff.call_args_list], [(1,), (2,)])
+
+    def test_post_is_not_retried(self, backoff):
+        route = CountingRoute(failures=1)
+        with StubServer({"/flaky": route}) as stub:
+            self.assertEqual(HttpClient(retries=2).post(f"{stub.url}/flaky").status_code, 503)
+        self.assertEqual(route.calls, 1)
+
+    def test_breaker_counts_one_failure_per_request(self, backoff):
+        route = CountingRoute(failures=100)
+        with StubServer({"/down": route}) as stub:
+            client = HttpClient(retries=2, failure_threshold=2)
+            host = stub.url.split("//")[1]
+
+            client.get(f"{stub.url}/down")  # 3번 시도해도 실패 1번
+            self.assertEqual(client.breaker(host).failures, 1)
+            self.assertEqual(client.snapshot()[host]["circuit"], "closed")
+
+            client.get(f"{stub.url}/down")
+            self.assertEqual(client.snapshot()[host]["circuit"], "open")
+            with self.assertRaises(CircuitOpenError):
+                client.get(f"{stub.url}/down")
+        self.assertEqual(route.calls, 6)  # 열린 뒤에는 요청을 보내지 않음
+
+    def test_half_open_trial_closes_breaker(self, backoff):
+        route = CountingRoute(failures=1)
+        with StubServer({"/flaky": route}) as stub:
+            client = HttpClient(retries=0, failure_threshold=1, reset_timeout=0)
+            host = stub.url.split("//")[1]
+            client.get(f"{stub.url}/flaky")
+            self.assertEqual(client.snapshot()[host]["circuit"], "half-open")
+
+            self.assertEqual(client.get(f"{stub.url}/flaky").status_code, 200)
+        self.assertEqual(client.snapshot()[host]["circuit"], "closed")
+
+    def test_breaker_opening_mid_retry_keeps_original_error(self, backoff):
+        with StubServer({"/slow": CountingRoute()}, latency=0.3) as stub:
+            client = HttpClient(retries=2, timeout=0.05, failure_threshold=1, reset_timeout=60)
+            host = stub.url.split("//")[1]
+            # 첫 시도가 실패한 사이 다른 요청이 서킷을 연 상황
+            backoff.side_effect = lambda attempt: client.breaker(host).record_failure() or 0
+
+            with self.assertRaises(requests.exceptions.Timeout) as raised:
+                client.get(f"{stub.url}/slow")
+
+        self.assertNotIsInstance(raised.exception, CircuitOpenError)
+        self.assertEqual(client.snapshot()[host]["requests"], 2)
+
+
+class BackoffTest(SimpleTestCase):
+    def test_full_jitter_is_bounded(self):
+        for attempt in range(1, 8):
+            delays = [HttpClient.backoff(attempt) for _ in range(50)]
+            self.assertTrue(all(0 <= delay <= min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) for delay in delays))
+
+
+class QueryInstrumentationTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def run_middleware(self, view):
+        return QueryInstrumentationMiddleware(view)(self.factory.get("/api/test/"))
+
+    def test_server_timing_header_only_for_staff(self):
+        user = User.objects.create_user(email="timing@example.com", password="pw", name="시간", nickname="timing")
+        client = APIClient()
+        client.force_authenticate(user)
+        self.assertNotIn("Server-Timing", client.get(reverse("diet-list")))
+
+        user.is_staff = True
+        response = client.get(reverse("diet-list"))
+        self.assertIn("db;dur=", response["Server-Timing"])
+        self.assertIn("app;dur=", response["Server-Timing"])
+
+    @override_settings(DEBUG=True)
+    def test_server_timing_header_in_debug(self):
+        self.assertIn("app;dur=", self.client.get(reverse("diet-list"))["Server-Timing"])
+
+    def test_repeated_query_shape_is_reported(self):
+        def view(request):
+            for user_id in range(6):  # 값만 다른 같은 쿼리 (N+1)
+                User.objects.filter(id=user_id).exists()
+            return HttpResponse()
+
+        with self.assertLogs("common.sql", "WARNING") as logs:
+            self.run_middleware(view)
+
+        self.assertEqual(logs.records[0].sql["queries"], 6)
+        self.assertIn("N+1", logs.output[0])
+
+    @override_settings(SQL_SLOW_QUERY_MS=0)
+    def test_slow_query_is_explained(self):
+        def view(request):
+            list(User.objects.filter(email="a@example.com"))
+            return HttpResponse()
+
+        with self.assertNoLogs("common.sql", "WARNING"):
+            response = self.run_middleware(view)
+        with self.assertLogs("common.sql", "WARNING") as logs:
+            response.close()  # 응답을 보낸 뒤 EXPLAIN
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertTrue(logs.records[0].sql["plan"])
+
+    def test_query_shape_ignores_values(self):
+        self.assertEqual(
+            query_shape("SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'x'"),
+            query_shape("SELECT * FROM t WHERE id IN (%s) AND name = %s"),
+        )
+
+    def test_query_budget(self):
+        with self.assertQueryBudget(1):
+            User.objects.exists()
+
+        with self.assertRaises(AssertionError):
+            with self.assertQueryBudget(1):
+                User.objects.exists()
+                User.objects.exists()
+
+        with self.assertRaises(AssertionError):
+            with self.assertQueryBudget(5, repeat_threshold=2):
+                User.objects.filter(id=1).exists()
+                User.objects.filter(id=2).exists()
+
+
+class MetricsTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        settings_override = override_settings(METRICS_DIR=self.directory, METRICS_TOKEN=None)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def make_registry(self):
+        worker = Registry(self.directory)
+        latency = worker.histogram("latency_seconds", "지연시간", ["view"], buckets=(0.1, 1.0))
+        requests = worker.counter("requests_total", "요청 수", ["view"])
+        return worker, latency, requests
+
+    def test_values_are_summed_across_worker_files(self):
+        other, latency, requests = self.make_registry()
+        latency.observe(0.05, view="diet-list")
+        requests.inc(view="diet-list")
+        other.flush()
+        os.replace(other.path()[1], os.path.join(self.directory, "other-worker.json"))  # 다른 pid 의 파일
+
+        worker, latency, requests = self.make_registry()
+        latency.observe(0.5, view="diet-list")
+        requests.inc(2, view="diet-list")
+        text = worker.render()
+
+        self.assertIn('requests_total{view="diet-list"} 3', text)
+        self.assertIn('latency_seconds_bucket{view="diet-list",le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{view="diet-list",le="+Inf"} 2', text)
+        self.assertIn('latency_seconds_count{view="diet-list"} 2', text)
+
+    def test_worker_exit_moves_values_to_retired_total(self):
+        exited, _, requests = self.make_registry()
+        requests.inc(3, view="diet-list")
+        exited.flush()
+        retire_worker(os.getpid(), self.directory)
+
+        self.assertFalse(os.path.exists(exited.path()[1]))
+        worker, _, requests = self.make_registry()
+        requests.inc(view="diet-list")
+        self.assertIn('requests_total{view="diet-list"} 4', worker.render())
+        retire_worker(os.getpid(), self.directory)
+        self.assertIn('requests_total{view="diet-list"} 4', worker.render())
+
+    def test_reused_pid_does_not_overwrite_previous_worker_values(self):
+        previous, _, requests = self.make_registry()
+        requests.inc(3, view="diet-list")
+        previous.flush()  # child_exit 없이 종료된 워커의 파일
+
+        worker, _, requests = self.make_registry()  # 같은 pid 를 받은 새 워커
+        requests.inc(2, view="diet-list")
+        self.assertIn('requests_total{view="diet-list"} 5', worker.render())
+
+    def test_values_are_flushed_by_background_thread(self):
+        worker = Registry(self.directory, flush_interval=0.01)
+        worker.counter("requests_total", "요청 수").inc()
+        worker.start()
+
+        deadline = time.monotonic() + 2
+        while not os.path.exists(worker.path()[1]) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(os.path.exists(worker.path()[1]))
+
+    def test_requests_are_labelled_by_url_name(self):
+        self.client.get(reverse("diet-list"))
+        staff = User.objects.create_user(email="staff@example.com", password="pw", name="관리", nickname="staff")
+        staff.is_staff = True
+        staff.save()
+        self.client.force_login(staff)
+        response = self.client.get(reverse("metrics"))
+
+        self.assertEqual(response.status_code, 200)
+        text = response.content.decode()
+        self.assertIn('http_request_duration_seconds_count{view="diet-list",method="GET",status="401"}', text)
+        self.assertIn('http_request_queries_total{view="diet-list"}', text)
+        self.assertIn("cache_hit_ratio", text)
+
+    def test_cache_hits_from_request_threads_are_exported(self):
+        caches["shared"].clear()
+        tiered = TieredCache(None, {"OPTIONS": {"SHARED": "shared", "METRICS_NAME": "metrics-test"}})
+        tiered.set("key", "value")
+
+        def lookups():
+            tiered.get("key")  # L1 hit
+            tiered.get("missing")  # L1 miss, L2 miss
+
+        thread = threading.Thread(target=lookups)  # 요청 스레드에서 조회하고 다른 스레드(스크레이프)에서 수집
+        thread.start()
+        thread.join()
+        text = registry.render()
+
+        self.assertIn('cache_requests_total{cache="metrics-test",tier="l1",result="hit"} 1', text)
+        self.assertIn('cache_requests_total{cache="metrics-test",tier="l1",result="miss"} 1', text)
+        self.assertIn('cache_requests_total{cache="metrics-test",tier="l2",result="miss"} 1', text)
+        self.assertIn('cache_hit_ratio{cache="metrics-test",tier="l1"} 0.5', text)
+
+    def test_upstream_calls_are_recorded(self):
+        with StubServer({"/ok": lambda method, params, body: (200, {}),
+                         "/fail": lambda method, params, body: (503, {})}) as stub:
+            client = HttpClient(retries=0)
+            client.get(f"{stub.url}/ok")
+            client.get(f"{stub.url}/fail")
+            host = stub.url.split("//")[1]
+
+        text = registry.render()
+        self.assertIn(f'upstream_requests_total{{host="{host}",outcome="success"}} 1', text)
+        self.assertIn(f'upstream_requests_total{{host="{host}",outcome="error"}} 1', text)
+        self.assertIn(f'upstream_request_duration_seconds_count{{host="{host}"}} 2', text)
+
+    def test_anonymous_is_denied_without_token(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_token_is_required_when_configured(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer sécret")
+        self.assertEqual(response.status_code, 403)
+
+
+class StructuredLoggingTest(TestCase):
+    def make_logger(self, stream, debug_rate=1.0):
+        handler = BackgroundHandler(stream)
+        handler.setFormatter(JsonFormatter())
+        handler.addFilter(RequestIdFilter())
+        handler.addFilter(DebugSamplingFilter(debug_rate))
+        self.addCleanup(handler.close)
+        logger = logging.getLogger(f"test.structured.{id(handler)}")
+        logger.handlers = [handler]
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        return logger, handler
+
+    def test_records_are_written_as_json_by_background_thread(self):
+        stream = io.StringIO()
+        logger, handler = self.make_logger(stream)
+        token = request_id_var.set("req-1")
+        try:
+            foods = [{"name": "사과"}]
+            logger.info("음식 %d개", len(foods), extra={"foods": foods})
+            foods.append({"name": "배"})  # 기록 후 인자가 바뀌어도 메시지는 그대로
+        finally:
+            request_id_var.reset(token)
+        handler.flush()
+
+        record = json.loads(stream.getvalue())
+        self.assertEqual(record["message"], "음식 1개")
+        self.assertEqual(record["request_id"], "req-1")
+        self.assertEqual(record["level"], "INFO")
+
+    def test_debug_records_are_sampled_per_request(self):
+        stream = io.StringIO()
+        logger, handler = self.make_logger(stream, debug_rate=0.5)
+        for n in range(40):
+            token = request_id_var.set(f"req-{n}")
+            logger.debug("첫 번째")
+            logger.debug("두 번째")
+            logger.info("항상 기록")
+            request_id_var.reset(token)
+        handler.flush()
+
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        debug_ids = [record["request_id"] for record in records if record["level"] == "DEBUG"]
+        self.assertEqual(sum(record["level"] == "INFO" for record in records), 40)
+        self.assertTrue(0 < len(set(debug_ids)) < 40)
+        self.assertEqual(len(debug_ids), len(set(debug_ids)) * 2)  # 샘플된 요청은 DEBUG 를 모두 남김
+
+    def test_request_id_header(self):
+        response = self.client.get(reverse("diet-list"), HTTP_X_REQUEST_ID="lb-123")
+        self.assertEqual(response["X-Request-ID"], "lb-123")
+
+        response = self.client.get(reverse("diet-list"), HTTP_X_REQUEST_ID="bad id\n")
+        self.assertNotEqual(response["X-Request-ID"], "bad id\n")
+        self.assertEqual(len(response["X-Request-ID"]), 32)
+
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class ProfilingTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        settings_override = override_settings(PROFILE_DIR=self.directory, PROFILE_HEADER_TOKEN="secret", PROFILE_KEEP=2)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.staff = User.objects.create_user(email="staff@example.com", password="pw", name="운영", nickname="staff",
+                                              is_staff=True)
+        self.api = APIClient()
+        self.api.force_authenticate(self.staff)
+
+    def test_sampler_collects_stacks_of_target_thread(self):
+        with Sampler(interval=0.001) as sampler:
+            busy_loop(0.05)
+
+        self.assertGreater(sampler.samples, 0)
+        self.assertIn("busy_loop (tests.py:", sampler.collapsed())
+
+    def test_profile_header_saves_collapsed_stacks_per_url_name(self):
+        response = self.client.get(reverse("diet-list"), HTTP_X_PROFILE="secret")
+        profile_id = response["X-Profile-Id"]
+
+        self.assertTrue(os.path.isfile(os.path.join(self.directory, "diet-list", profile_id)))
+        self.assertNotIn("X-Profile-Id", self.client.get(reverse("diet-list"), HTTP_X_PROFILE="wrong"))
+        self.assertNotIn("X-Profile-Id", self.client.get(reverse("diet-list"), HTTP_X_PROFILE="sécret"))
+
+    def test_old_profiles_are_rotated(self):
+        for n in range(4):
+            self.client.get(reverse("diet-list"), HTTP_X_PROFILE="secret", HTTP_X_REQUEST_ID=f"req-{n}")
+
+        self.assertEqual(len(os.listdir(os.path.join(self.directory, "diet-list"))), 2)
+
+    def test_staff_can_list_and_download(self):
+        profile_id = self.client.get(reverse("diet-list"), HTTP_X_PROFILE="secret")["X-Profile-Id"]
+
+        response = self.api.get(reverse("profile-list"), {"url_name": "diet-list"})
+        self.assertEqual([profile["name"] for profile in response.data], [profile_id])
+
+        response = self.api.get(response.data[0]["download_url"])
+        self.assertEqual(response.status_code, 200)
+        with open(os.path.join(self.directory, "diet-list", profile_id), "rb") as f:
+            self.assertEqual(b"".join(response.streaming_content), f.read())
+
+        response = self.api.get(reverse("profile-download", args=["..", profile_id]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_non_staff_is_forbidden(self):
+        user = User.objects.create_user(email="user@example.com", password="pw", name="일반", nickname="user")
+        self.api.force_authenticate(user)
+
+        self.assertEqual(self.api.get(reverse("profile-list")).status_code, 403)
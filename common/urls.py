@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .views import ProfileDownloadView, ProfileListView, metrics_view
+
+urlpatterns = [
+    path("metrics/", metrics_view, name="metrics"),  # Prometheus 메트릭 (모든 워커 합산)
+    path("profiles/", ProfileListView.as_view(), name="profile-list"),  # 요청 프로파일 목록 (스태프 전용)
+    path("profiles/<str:url_name>/<str:name>/", ProfileDownloadView.as_view(), name="profile-download"),
+]
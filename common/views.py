@@ -1,3 +1,52 @@
-from django.shortcuts import render
+import hmac
 
-# Create your views here.
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden
+from django.urls import reverse
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from common.metrics import CONTENT_TYPE, registry
+from common.profiling import NAME_PATTERN, list_profiles, profile_path
+
+
+@require_GET
+def metrics_view(request):
+    """Prometheus 스크레이프 엔드포인트 (Authorization: Bearer <METRICS_TOKEN>, 토큰이 없으면 staff 세션만 허용)"""
+    if settings.METRICS_TOKEN:
+        expected = f"Bearer {settings.METRICS_TOKEN}"
+        # str 비교는 ASCII 가 아닌 문자가 있으면 TypeError 이므로 bytes 로 비교
+        allowed = hmac.compare_digest(request.headers.get("Authorization", "").encode(), expected.encode())
+    else:
+        allowed = request.user.is_staff
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
+
+
+class ProfileListView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """저장된 프로파일 목록 (최신순, ?url_name=diet-create 로 필터)"""
+        url_name = request.query_params.get("url_name")
+        if url_name and not NAME_PATTERN.match(url_name):
+            return Response({"detail": "잘못된 URL 이름입니다."}, status=status.HTTP_400_BAD_REQUEST)
+        profiles = list_profiles(url_name)
+        for profile in profiles:
+            profile["download_url"] = reverse("profile-download", args=[profile["url_name"], profile["name"]])
+        return Response(profiles, status=status.HTTP_200_OK)
+
+
+class ProfileDownloadView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, url_name, name):
+        """collapsed stack 파일 다운로드 (flamegraph.pl, speedscope 등에서 열기)"""
+        path = profile_path(url_name, name)
+        if path is None:
+            raise Http404
+        return FileResponse(open(path, "rb"), as_attachment=True, filename=name, content_type="text/plain")
@@ -0,0 +1,96 @@
+import os
+import socket
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import DietJob
+from .services import DietGenerationError, generate_default_diets
+
+MAX_ATTEMPTS = 3
+STALE_AFTER = timedelta(minutes=5)  # 이 시간 이상 running 이면 워커가 죽은 것으로 보고 다시 가져감
+
+
+class JobLost(Exception):
+    """처리 중 다른 워커가 다시 가져간 작업 (이 워커의 결과는 저장하지 않음)"""
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue(user):
+    return DietJob.objects.create(user=user)
+
+
+def claim_job(worker, stale_after=STALE_AFTER):
+    """대기 중인 작업 하나를 가져와 running 으로 변경 (여러 워커가 동시에 실행해도 같은 작업을 가져가지 않음)"""
+    now = timezone.now()
+    stale = Q(status=DietJob.STATUS_RUNNING, started_at__lt=now - stale_after)
+
+    # 시도 횟수를 다 쓴 채로 멈춘 작업(워커를 죽게 만드는 작업 등)은 다시 가져가지 않고 실패 처리
+    DietJob.objects.filter(stale, attempts__gte=MAX_ATTEMPTS).update(
+        status=DietJob.STATUS_FAILED, error="작업을 처리하던 워커가 응답하지 않았습니다.", finished_at=now, updated_at=now,
+    )
+    claimable = Q(status=DietJob.STATUS_PENDING) | (stale & Q(attempts__lt=MAX_ATTEMPTS))
+
+    with transaction.atomic():
+        # SELECT ... FOR UPDATE SKIP LOCKED: 다른 워커가 잠근 행은 기다리지 않고 건너뜀
+        job = (
+            DietJob.objects.select_for_update(skip_locked=True)
+            .filter(claimable)
+            .order_by("id")
+            .first()
+        )
+        if job is None:
+            return None
+
+        # 행 잠금을 지원하지 않는 DB(SQLite)에서도 중복 처리되지 않도록 조건부 UPDATE 로 한 번 더 확인
+        claimed = DietJob.objects.filter(pk=job.pk, status=job.status, attempts=job.attempts).update(
+            status=DietJob.STATUS_RUNNING,
+            attempts=F("attempts") + 1,
+            worker=worker,
+            started_at=now,
+        )
+        if not claimed:
+            return None
+
+    job.refresh_from_db()
+    return job
+
+
+def run_job(job):
+    """작업 실행 후 결과 저장 (실패 시 MAX_ATTEMPTS 까지 다시 대기열로)"""
+    try:
+        # 완료 표시는 식단 생성과 같은 트랜잭션에서 (작업을 뺏겼으면 식단 생성도 취소)
+        generate_default_diets(
+            job.user, on_created=lambda diets: finish(job, DietJob.STATUS_DONE, diet_ids=[diet.id for diet in diets])
+        )
+    except JobLost:
+        raise
+    except DietGenerationError as e:
+        finish(job, DietJob.STATUS_FAILED, error=e.detail)
+    except Exception as e:
+        if job.attempts >= MAX_ATTEMPTS:
+            finish(job, DietJob.STATUS_FAILED, error=str(e))
+        else:
+            _owned(job).update(status=DietJob.STATUS_PENDING, error=str(e), updated_at=timezone.now())
+        raise
+
+
+def _owned(job):
+    """이 워커가 가져간 그대로인 작업 (다시 가져가졌으면 worker/attempts 가 바뀜)"""
+    return DietJob.objects.filter(pk=job.pk, status=DietJob.STATUS_RUNNING, worker=job.worker, attempts=job.attempts)
+
+
+def finish(job, status, diet_ids=None, error=""):
+    now = timezone.now()
+    updated = _owned(job).update(status=status, diet_ids=diet_ids or [], error=error, finished_at=now, updated_at=now)
+    if not updated:
+        raise JobLost(f"작업 {job.pk} 를 다른 워커가 다시 가져감")
+    job.status = status
+    job.diet_ids = diet_ids or []
+    job.error = error
+    job.finished_at = now
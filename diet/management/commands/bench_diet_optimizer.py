@@ -0,0 +1,72 @@
+import json
+import random
+import types
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from common.benchmark import benchmark_database, measure, summarize
+from diet.optimizer import NUTRIENT_FIELDS, daily_targets, load_candidates, plan_meals, plan_totals
+from food.models import Food
+
+TARGET_MS = 200
+
+
+class Command(BaseCommand):
+    help = "식단 최적화기(plan_meals) 지연시간/목표 오차 벤치마크 (합성 후보 음식 영양소 행렬 사용)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--foods", type=int, default=50_000, help="후보 음식 수")
+        parser.add_argument("--iterations", type=int, default=100)
+        parser.add_argument("--with-db", action="store_true", help="테스트 DB 에 음식을 채우고 후보 로드 시간까지 포함해 측정")
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        np_rng = np.random.default_rng(options["seed"])
+        size = options["foods"]
+        ids = np.arange(1, size + 1, dtype=np.int64)
+        # 100g 기준 탄단지를 뽑고 열량은 4/4/9 kcal 로 계산 (실제 음식처럼 일관된 값)
+        protein, carbs, fat = np_rng.uniform(0, 30, size), np_rng.uniform(0, 70, size), np_rng.uniform(0, 30, size)
+        nutrients = np.column_stack([protein * 4 + carbs * 4 + fat * 9, protein, carbs, fat])
+        profile = types.SimpleNamespace(age=30, gender="F", height=165, weight=62, target_weight=55, preferences=[])
+        targets = daily_targets(profile)
+
+        plans = []
+        samples = measure(lambda i: plans.append(plan_meals(ids, nutrients, targets, rng=rng)), options["iterations"])
+        report = {
+            "foods": size,
+            "targets": dict(zip(NUTRIENT_FIELDS, np.round(targets, 1).tolist())),
+            "plan": summarize(samples),
+            "mean_abs_error_pct": self.target_error(plans, dict(zip(ids.tolist(), nutrients)), targets),
+        }
+
+        if options["with_db"]:
+            with benchmark_database():
+                self.seed_foods(ids, nutrients)
+                queryset = Food.objects.all()
+                samples = measure(lambda i: plan_meals(*load_candidates(queryset, rng=rng), targets, rng=rng), 10)
+                report["vendor"] = connection.vendor
+                report["load_and_plan"] = summarize(samples)
+
+        report["within_target"] = report["plan"]["p95_ms"] <= TARGET_MS
+        self.stdout.write(
+            f"foods={size:,}  p50={report['plan']['p50_ms']}ms  p95={report['plan']['p95_ms']}ms  "
+            f"error={report['mean_abs_error_pct']}"
+        )
+        self.stdout.write(json.dumps(report, ensure_ascii=False))
+
+    def target_error(self, plans, nutrients_by_id, targets):
+        """하루 합계가 목표에서 벗어난 정도 (영양소별 평균 절대 오차 %)"""
+        totals = np.array([sum(plan_totals(nutrients_by_id, meal) for meal in plan) for plan in plans])
+        errors = np.abs(totals - targets) / targets * 100
+        return dict(zip(NUTRIENT_FIELDS, np.round(errors.mean(axis=0), 1).tolist()))
+
+    def seed_foods(self, ids, nutrients, batch_size=5000):
+        for start in range(0, len(ids), batch_size):
+            Food.objects.bulk_create([
+                Food(id=int(food_id), external_id=f"bench-{food_id}", name=f"음식 {food_id}",
+                     **dict(zip(NUTRIENT_FIELDS, map(float, row))))
+                for food_id, row in zip(ids[start:start + batch_size], nutrients[start:start + batch_size])
+            ])
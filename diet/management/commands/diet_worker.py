@@ -0,0 +1,46 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from diet.jobs import claim_job, run_job, worker_id
+
+
+class Command(BaseCommand):
+    help = "비동기 식단 생성 작업(DietJob) 처리 워커 (여러 프로세스를 동시에 실행 가능)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="대기 작업이 없을 때 재확인 간격(초)")
+        parser.add_argument("--once", action="store_true", help="대기 작업을 모두 처리하면 종료")
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        worker = worker_id()
+        self.stdout.write(f"diet_worker 시작: {worker}")
+
+        while not self.stopping:
+            close_old_connections()  # 오래 실행되는 프로세스이므로 끊어진 DB 커넥션 정리
+            job = claim_job(worker)
+            if job is None:
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+                continue
+
+            self.stdout.write(f"작업 {job.id} 처리 시작 (user={job.user_id}, attempt={job.attempts})")
+            try:
+                run_job(job)
+            except Exception as e:
+                self.stderr.write(f"작업 {job.id} 처리 실패: {e}")
+            else:
+                self.stdout.write(f"작업 {job.id} 처리 완료")
+
+        self.stdout.write(f"diet_worker 종료: {worker}")
+
+    def stop(self, signum, frame):
+        # 처리 중인 작업은 끝낸 뒤 종료
+        self.stopping = True
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from diet.models import Diet
+from dietfood.models import DietFood
+
+
+class Command(BaseCommand):
+    help = "DietFood 영양소 컬럼과 Diet 합계 컬럼을 현재 음식 정보로 일괄 재계산 (id 구간 단위 UPDATE)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000, help="한 트랜잭션에서 처리할 식단 id 구간 크기")
+        parser.add_argument("--user", type=int, help="특정 사용자 id 의 식단만 재계산")
+
+    def handle(self, *args, **options):
+        diets = Diet.objects.all()
+        if options["user"]:
+            diets = diets.filter(user_id=options["user"])
+        last_id = diets.aggregate(last=Max("id"))["last"] or 0
+        batch_size = options["batch_size"]
+
+        started = time.perf_counter()
+        diet_count = diet_food_count = 0
+        for start in range(0, last_id, batch_size):
+            batch = diets.filter(id__gt=start, id__lte=start + batch_size)
+            # 음식 영양소 -> 식단 합계 순서로 같은 트랜잭션에서 갱신
+            with transaction.atomic():
+                diet_food_count += DietFood.objects.filter(diet__in=batch).refresh_nutrients()
+                diet_count += batch.refresh_totals()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ 식단 {diet_count:,}개, 식단 음식 {diet_food_count:,}개 재계산 ({time.perf_counter() - started:.2f}초)"
+        ))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('diet', '0003_dietjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='diet',
+            name='total_calories',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='diet',
+            name='total_carbs',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='diet',
+            name='total_fat',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='diet',
+            name='total_protein',
+            field=models.FloatField(default=0),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+TOTAL_FIELDS = ["total_calories", "total_protein", "total_carbs", "total_fat"]
+
+
+def backfill_daily_nutrition(apps, schema_editor):
+    """기존 식단의 합계 컬럼으로 일별 합계 채우기"""
+    Diet = apps.get_model("diet", "Diet")
+    DailyNutrition = apps.get_model("diet", "DailyNutrition")
+    rows = Diet.objects.values("user_id", "date").annotate(
+        diet_count=Count("id"), **{field: Sum(field) for field in TOTAL_FIELDS}
+    ).order_by()
+    batch = []
+    for row in rows.iterator():
+        batch.append(DailyNutrition(user_id=row.pop("user_id"), day=row.pop("date"), **row))
+        if len(batch) >= 2000:
+            DailyNutrition.objects.bulk_create(batch)
+            batch = []
+    DailyNutrition.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('diet', '0004_diet_totals'),
+        ('dietfood', '0004_dietfood_nutrients'),  # 식단 합계 컬럼이 채워진 뒤 실행
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyNutrition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('diet_count', models.PositiveIntegerField(default=0)),
+                ('total_calories', models.FloatField(default=0)),
+                ('total_protein', models.FloatField(default=0)),
+                ('total_carbs', models.FloatField(default=0)),
+                ('total_fat', models.FloatField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_nutrition', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'day'), name='daily_nutrition_user_day')],
+            },
+        ),
+        migrations.RunPython(backfill_daily_nutrition, migrations.RunPython.noop),
+    ]
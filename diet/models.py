@@ -1,14 +1,150 @@
 from django.db import models
+from django.db.models import Count, F, FloatField, OuterRef, Prefetch, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth, TruncWeek
 from common.models import CommonModel
 from django.conf import settings
 
+NUTRIENT_FIELDS = ["calories", "protein", "carbs", "fat"]
+TOTAL_FIELDS = [f"total_{field}" for field in NUTRIENT_FIELDS]
+PERIOD_TRUNCS = {"week": TruncWeek, "month": TruncMonth}  # 일별 합계를 묶는 단위 (day 는 그대로)
+
+
+class DietQuerySet(models.QuerySet):
+    def with_foods(self):
+        """음식 목록을 음식 정보와 함께 한 번에 미리 가져옴 (영양소 합계는 total_* 컬럼에 저장됨)"""
+        diet_foods = self.model._meta.get_field("diet_foods").related_model.objects.select_related("food")
+        return self.prefetch_related(Prefetch("diet_foods", queryset=diet_foods))
+
+    def refresh_totals(self):
+        """total_* 컬럼을 DietFood 영양소 컬럼 합계로 다시 계산 (UPDATE 1번) -> 갱신된 식단 수"""
+        diet_foods = self.model._meta.get_field("diet_foods").related_model.objects.filter(diet=OuterRef("pk"))
+        totals = {
+            f"total_{field}": Coalesce(
+                Subquery(diet_foods.values("diet").annotate(total=Sum(field)).values("total")[:1]),
+                0.0,
+                output_field=FloatField(),
+            )
+            for field in NUTRIENT_FIELDS
+        }
+        days = set(self.values_list("user_id", "date"))
+        updated = self.update(**totals)
+        # 일별 합계도 같은 트랜잭션에서 갱신
+        DailyNutrition.objects.refresh_days(days)
+        return updated
+
+
 class Diet(CommonModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="diets")
     name = models.CharField(max_length=255)
     image_url = models.URLField(blank=True, null=True)
+    # 영양소 합계 (음식 추가/삭제/양 변경과 같은 트랜잭션에서 refresh_totals 로 갱신)
+    total_calories = models.FloatField(default=0)
+    total_protein = models.FloatField(default=0)
+    total_carbs = models.FloatField(default=0)
+    total_fat = models.FloatField(default=0)
+
+    objects = DietQuerySet.as_manager()
+
+    class Meta:
+        # 사용자별 날짜 범위 조회/키셋 페이지네이션 (date, id) 용 인덱스
+        indexes = [models.Index(fields=["user", "date", "id"], name="diet_user_date_id_idx")]
 
     def get_foods(self):
         return self.diet_foods.all()  # 해당 식단에 포함된 모든 음식 가져오기
 
+    def refresh_totals(self):
+        Diet.objects.filter(pk=self.pk).refresh_totals()
+        self.refresh_from_db(fields=TOTAL_FIELDS)
+
     def __str__(self):
         return self.name
+
+
+class DailyNutritionQuerySet(models.QuerySet):
+    def refresh_days(self, days):
+        """(user_id, 날짜) 목록의 일별 합계를 Diet.total_* 에서 다시 계산 (식단이 없는 날은 삭제)"""
+        days = set(days)
+        if not days:
+            return
+        by_user = {}
+        for user_id, day in days:
+            by_user.setdefault(user_id, set()).add(day)
+
+        for user_id, user_days in by_user.items():
+            rows = (
+                Diet.objects.filter(user_id=user_id, date__in=user_days)
+                .values("date")
+                .annotate(diet_count=Count("id"), **{field: Sum(field) for field in TOTAL_FIELDS})
+            )
+            rollups = [
+                DailyNutrition(user_id=user_id, day=row.pop("date"), **row)
+                for row in rows
+            ]
+            self.bulk_create(
+                rollups,
+                update_conflicts=True,
+                unique_fields=["user", "day"],
+                update_fields=["diet_count", *TOTAL_FIELDS],
+            )
+            self.filter(user_id=user_id, day__in=user_days - {rollup.day for rollup in rollups}).delete()
+
+    def by_period(self, granularity):
+        """day/week/month 단위 합계 [{period, days, diet_count, total_*}, ...] (기간 오름차순)"""
+        if granularity == "day":
+            return self.annotate(period=F("day"), days=Value(1)).values(
+                "period", "days", "diet_count", *TOTAL_FIELDS
+            ).order_by("period")
+        return (
+            self.annotate(period=PERIOD_TRUNCS[granularity]("day"))
+            .values("period")
+            .annotate(days=Count("id"), diet_count=Sum("diet_count"), **{field: Sum(field) for field in TOTAL_FIELDS})
+            .order_by("period")
+        )
+
+
+class DailyNutrition(models.Model):
+    """사용자별 하루 영양소 합계 (Diet 합계가 바뀔 때 함께 갱신, 주/월 단위는 여기서 다시 묶어 계산)"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="daily_nutrition")
+    day = models.DateField()
+    diet_count = models.PositiveIntegerField(default=0)
+    total_calories = models.FloatField(default=0)
+    total_protein = models.FloatField(default=0)
+    total_carbs = models.FloatField(default=0)
+    total_fat = models.FloatField(default=0)
+
+    objects = DailyNutritionQuerySet.as_manager()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["user", "day"], name="daily_nutrition_user_day")]
+
+    def __str__(self):
+        return f"{self.user_id} {self.day}"
+
+
+class DietJob(CommonModel):
+    """비동기 식단 생성 작업 (DB 큐, manage.py diet_worker 가 처리)"""
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "대기"),
+        (STATUS_RUNNING, "처리 중"),
+        (STATUS_DONE, "완료"),
+        (STATUS_FAILED, "실패"),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="diet_jobs")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True)  # 작업을 가져간 워커 식별자 (호스트:pid)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    diet_ids = models.JSONField(default=list, blank=True)  # 생성된 식단 ID 목록
+    error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "id"])]  # 대기 작업을 id 순으로 가져오기 위한 인덱스
+
+    def __str__(self):
+        return f"DietJob {self.id} ({self.status})"
@@ -0,0 +1,168 @@
+import random
+
+import numpy as np
+
+from food.allergens import get_classifier
+
+# 프로필 신체 정보로 하루 목표 열량/영양소를 계산하고, 후보 음식 영양소 행렬에서
+# 아침/점심/저녁 음식과 섭취량을 골라 목표에 맞추는 식단 최적화기
+# - 후보 음식 전체에 대한 점수 계산은 NumPy 벡터 연산으로 처리 (파이썬 반복 없음)
+# - 알레르기/선호도 조건은 후보 queryset(Food.objects.safe_for ...) 단계에서 이미 적용됨
+
+NUTRIENT_FIELDS = ["calories", "protein", "carbs", "fat"]  # 100g 기준 값
+MEAL_SHARES = [0.3, 0.4, 0.3]  # 아침/점심/저녁 열량 비율
+FOODS_PER_MEAL = 3
+MIN_PORTION = 30.0  # g
+MAX_PORTION = 400.0  # g
+PORTION_STEP = 5.0  # 섭취량 반올림 단위 (g)
+TOP_CHOICES = 20  # 매번 최적 1개 대신 상위 후보 중 무작위로 골라 식단이 매번 같지 않도록 함
+MAX_CANDIDATES = 50_000  # 한 번에 불러올 후보 음식 수 상한
+
+# 활동 계수 (가벼운 활동 기준)와 목표 체중에 따른 하루 열량 조정
+ACTIVITY_FACTOR = 1.375
+WEIGHT_LOSS_KCAL = -500
+WEIGHT_GAIN_KCAL = 300
+MIN_DAILY_KCAL = 1200
+
+# 열량 대비 탄수화물/단백질/지방 비율 (고단백 선호 시 단백질 비율 상향)
+MACRO_SPLIT = {"protein": 0.25, "carbs": 0.5, "fat": 0.25}
+HIGH_PROTEIN_SPLIT = {"protein": 0.35, "carbs": 0.4, "fat": 0.25}
+KCAL_PER_GRAM = {"protein": 4, "carbs": 4, "fat": 9}
+
+
+def daily_targets(profile):
+    """Mifflin-St Jeor 기초대사량 기반 하루 목표 [열량, 단백질, 탄수화물, 지방] (정보가 부족하면 None)"""
+    if not all([profile.age, profile.height, profile.weight]):
+        return None
+
+    bmr = 10 * profile.weight + 6.25 * profile.height - 5 * profile.age
+    bmr += {"M": 5, "F": -161}.get(profile.gender, -78)  # 기타/미입력은 남녀 평균
+    calories = bmr * ACTIVITY_FACTOR
+
+    if profile.target_weight and profile.target_weight < profile.weight:
+        calories += WEIGHT_LOSS_KCAL
+    elif profile.target_weight and profile.target_weight > profile.weight:
+        calories += WEIGHT_GAIN_KCAL
+    calories = max(calories, MIN_DAILY_KCAL)
+
+    split = HIGH_PROTEIN_SPLIT if "고단백" in (profile.preferences or []) else MACRO_SPLIT
+    return np.array([
+        calories,
+        calories * split["protein"] / KCAL_PER_GRAM["protein"],
+        calories * split["carbs"] / KCAL_PER_GRAM["carbs"],
+        calories * split["fat"] / KCAL_PER_GRAM["fat"],
+    ])
+
+
+def load_candidates(queryset, limit=MAX_CANDIDATES, rng=random):
+    """후보 음식 -> (id 배열, 100g 기준 영양소 행렬 n x 4)
+
+    후보가 limit 보다 많으면 임의의 id 부터 이어지는 limit 개만 사용
+    """
+    queryset = queryset.filter(calories__gt=0)
+    low = queryset.order_by("id").values_list("id", flat=True).first()
+    if low is None:
+        return np.empty(0, dtype=np.int64), np.empty((0, len(NUTRIENT_FIELDS)))
+    high = queryset.order_by("-id").values_list("id", flat=True).first()
+
+    pivot = rng.randint(low, high)
+    rows = list(queryset.filter(id__gte=pivot).order_by("id").values_list("id", *NUTRIENT_FIELDS)[:limit])
+    if len(rows) < limit:
+        rows += queryset.filter(id__lt=pivot).order_by("id").values_list("id", *NUTRIENT_FIELDS)[:limit - len(rows)]
+
+    matrix = np.array(rows, dtype=np.float64).reshape(-1, len(NUTRIENT_FIELDS) + 1)
+    return matrix[:, 0].astype(np.int64), matrix[:, 1:]
+
+
+def plan_meals(ids, nutrients, targets, meal_shares=MEAL_SHARES, foods_per_meal=FOODS_PER_MEAL, rng=random):
+    """끼니별 [(음식 id, 섭취량 g), ...] 목록 반환 (후보가 부족하면 None)
+
+    nutrients: 100g 기준 영양소 행렬 (n x 4), targets: 하루 목표 (4,)
+    """
+    nutrients = np.nan_to_num(np.asarray(nutrients, dtype=np.float64))
+    available = nutrients.any(axis=1)  # 영양소가 전부 0 인 음식은 섭취량으로 목표에 다가갈 수 없으므로 제외
+    if available.sum() < foods_per_meal * len(meal_shares):
+        return None
+    meals = []
+    for share in meal_shares:
+        meal_target = targets * share
+        weights = 1.0 / np.maximum(meal_target, 1.0)  # 영양소별 상대 오차로 비교
+        chosen = _choose_foods(nutrients, available, meal_target, weights, foods_per_meal, rng)
+        available[chosen] = False
+        portions = _fit_portions(nutrients[chosen], meal_target, weights)
+        meals.append([(int(ids[i]), float(portion)) for i, portion in zip(chosen, portions)])
+    return meals
+
+
+def _choose_foods(nutrients, available, meal_target, weights, count, rng):
+    """남은 목표를 남은 자리 수로 나눈 몫에 가장 잘 맞는 음식을 하나씩 고름 (greedy)"""
+    weighted = nutrients * weights  # n x 4
+    norms = np.einsum("ij,ij->i", weighted, weighted)
+    norms[norms == 0] = np.inf  # 0 으로 나누지 않도록 함 (영양소가 전부 0 인 음식은 plan_meals 에서 available 제외)
+
+    chosen = []
+    remaining = meal_target.copy()
+    for slot in range(count):
+        share = np.maximum(remaining, 0) / (count - slot) * weights
+        # 음식별 최적 섭취량(최소제곱, 100g 단위)을 허용 범위로 자른 뒤 오차 계산
+        scale = np.clip(weighted @ share / norms, MIN_PORTION / 100, MAX_PORTION / 100)
+        errors = np.einsum("ij,ij->i", weighted * scale[:, None] - share, weighted * scale[:, None] - share)
+        errors[~available] = np.inf
+        errors[chosen] = np.inf
+
+        top = np.argpartition(errors, min(TOP_CHOICES, len(errors) - 1))[:TOP_CHOICES]
+        top = top[np.isfinite(errors[top])]
+        index = int(rng.choice(list(top)))
+        chosen.append(index)
+        remaining -= nutrients[index] * scale[index]
+    return chosen
+
+
+def _fit_portions(food_nutrients, meal_target, weights):
+    """고른 음식들의 섭취량을 함께 최소제곱으로 맞춤 (g, 허용 범위/단위 적용)
+
+    범위를 벗어난 음식은 경계값으로 고정하고 나머지 음식만 다시 맞추는 과정을 반복 (음식 수만큼)
+    """
+    matrix = (food_nutrients * weights).T / 100  # 4 x k, 섭취량 1g 당 기여
+    target = meal_target * weights
+    portions = np.full(len(food_nutrients), MIN_PORTION)
+    free = np.ones(len(food_nutrients), dtype=bool)
+    for _ in range(len(food_nutrients)):
+        residual = target - matrix[:, ~free] @ portions[~free]
+        solution, *_ = np.linalg.lstsq(matrix[:, free], residual, rcond=None)
+        portions[free] = solution
+        out_of_range = free & ((portions < MIN_PORTION) | (portions > MAX_PORTION))
+        portions = np.clip(portions, MIN_PORTION, MAX_PORTION)
+        if not out_of_range.any():
+            break
+        free &= ~out_of_range
+        if not free.any():
+            break
+    return np.round(portions / PORTION_STEP) * PORTION_STEP
+
+
+def plan_totals(nutrients_by_id, meal):
+    """끼니 [(음식 id, g), ...] 의 영양소 합계 (4,)"""
+    return sum(nutrients_by_id[food_id] * portion / 100 for food_id, portion in meal)
+
+
+def optimize_diets(profile, queryset, table=None, rng=random):
+    """프로필 목표에 맞춘 끼니별 [(음식 id, g), ...] (신체 정보/후보가 부족하면 None)
+
+    table(food.columnar.NutrientTable)이 있으면 DB 대신 mmap 컬럼에서 알레르기 필터와 점수 계산을 하고,
+    고른 음식이 queryset 에 실제로 있는지 한 번 더 확인 (테이블 갱신 전 삭제/변경된 음식 대비)
+    """
+    targets = daily_targets(profile)
+    if targets is None:
+        return None
+
+    if table is not None and len(table):
+        ids, nutrients = table.candidates(get_classifier().mask_for(profile.allergies))
+        meals = plan_meals(ids, nutrients, targets, rng=rng)
+        if meals is not None:
+            chosen = [food_id for meal in meals for food_id, _ in meal]
+            if queryset.filter(id__in=chosen).count() == len(chosen):
+                return meals
+
+    ids, nutrients = load_candidates(queryset, rng=rng)
+    return plan_meals(ids, nutrients, targets, rng=rng)
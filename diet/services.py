@@ -0,0 +1,126 @@
+import logging
+import random
+
+from django.conf import settings
+from django.db import transaction
+
+from dietfood.models import DietFood
+from food.columnar import get_nutrient_table
+from food.models import Food
+from food.openfoodfacts import fetch_products, product_to_food_data, search_url
+from food.sampling import sample_foods
+from user.models import Profile
+from .models import Diet
+from .optimizer import FOODS_PER_MEAL, optimize_diets
+
+# 식단 생성 로직 (DietCreateView 의 동기 처리와 diet_worker 의 비동기 작업이 공유)
+
+logger = logging.getLogger(__name__)
+
+# 음식 선호도를 검색어로 변환 (사용자 선호도 반영)
+PREFERENCE_KEYWORDS = {
+    "저염식": "low-salt",
+    "비건": "vegan",
+    "채식": "vegetarian",
+    "고단백": "high-protein"
+}
+DEFAULT_QUERIES = ["organic", "green-dot", "nutriscore"]
+DEFAULT_DIET_NAMES = ["아침 식단", "점심 식단", "저녁 식단"]
+
+
+class DietGenerationError(Exception):
+    """식단을 만들 수 없는 경우 (detail 은 응답/작업 결과에 그대로 노출)"""
+
+    def __init__(self, detail):
+        super().__init__(detail)
+        self.detail = detail
+
+
+def fetch_food_from_external_api(query, max_foods=500, max_pages=10):
+    """외부 API에서 검색한 음식 데이터 가져오기 (페이지 동시 요청, 전체 시간 예산 적용)"""
+    logger.debug("외부 API 요청: %s", search_url(query))
+    products = fetch_products(
+        query, max_products=max_foods, max_pages=max_pages, budget=settings.OPENFOODFACTS_FETCH_BUDGET
+    )
+    extracted_foods = [product_to_food_data(product) for product in products]
+
+    logger.info("외부 음식 %d개 수집", len(extracted_foods), extra={"query": query, "foods": len(extracted_foods)})
+    return extracted_foods
+
+
+def generate_default_diets(user, on_created=None):
+    """외부 음식 수집 후 아침/점심/저녁 기본 식단 생성 -> 생성된 Diet 목록
+
+    on_created(diets) 는 식단을 만든 트랜잭션 안에서 호출 (예외를 던지면 식단 생성도 취소)
+    """
+    # 인증 캐시의 프로필 스냅샷(user.profile)은 다른 워커의 변경이 늦게 보일 수 있으므로 DB 에서 다시 읽음
+    profile = Profile.objects.get(user_id=user.pk)
+    allergies = profile.allergies if profile.allergies else []
+    preferences = profile.preferences if profile.preferences else []
+
+    # 기본 검색어 + 선호도 기반 검색어 설정
+    selected_keywords = [PREFERENCE_KEYWORDS[p] for p in preferences if p in PREFERENCE_KEYWORDS]
+    search_queries = selected_keywords if selected_keywords else DEFAULT_QUERIES
+
+    # API 요청을 1번만 수행하여 음식 데이터 가져오기
+    query = random.choice(search_queries)  # 하나의 검색어만 선택
+    external_foods = fetch_food_from_external_api(query)  # API 한 번만 호출
+
+    # 샘플 5개 (DEBUG 는 일부 요청만 기록되고, 인자는 기록될 때만 문자열로 변환)
+    logger.debug("외부 API 음식 샘플: %r", external_foods[:5])
+
+    # 중복 제거 (external_id 기준)
+    unique_external_foods = {food["external_id"]: food for food in external_foods}.values()
+    logger.debug("중복 제거 후 음식 %d개", len(unique_external_foods))
+
+    # 최대 500개까지만 저장 (알레르기/선호도 필터링은 식단 구성 시 DB에서 처리)
+    unique_external_foods = list(unique_external_foods)[:500]
+
+    # bulk_create()로 한 번에 저장, 이미 있는 음식은 건너뜀 (INSERT ... ON CONFLICT DO NOTHING)
+    # 요청 경로와 여러 diet_worker 가 같은 상품을 동시에 저장해도 external_id 중복으로 실패하지 않음
+    # (저장한 객체에는 pk 가 없으므로 식단은 아래에서 DB 에서 다시 고른 음식 id 로만 구성)
+    Food.objects.bulk_create([Food(**food_data) for food_data in unique_external_foods], ignore_conflicts=True)
+
+    # 알레르기 필터링 (DB 에서 allergen_mask 로 처리) + 선호 라벨이 있는 음식 우선
+    logger.debug("알레르기 필터: %s", allergies)
+    candidate_foods = Food.objects.safe_for(profile)
+    preferred_foods = candidate_foods.matching_preferences(profile)
+    use_preferred = bool(preferences) and preferred_foods.exists()
+    if use_preferred:
+        candidate_foods = preferred_foods
+
+    # 신체 정보가 있으면 목표 열량/영양소에 맞춰 음식과 섭취량을 고르고, 없으면 무작위로 3개씩 (100g)
+    # 선호 라벨 조건은 컬럼 테이블에 없으므로 그때는 DB 후보만 사용
+    table = None if use_preferred else get_nutrient_table()
+    meals = optimize_diets(profile, candidate_foods, table=table)
+    if meals is None:
+        sampled_foods = sample_foods(candidate_foods, FOODS_PER_MEAL * len(DEFAULT_DIET_NAMES))
+        meals = [
+            [(food.id, 100) for food in sampled_foods[index * FOODS_PER_MEAL:(index + 1) * FOODS_PER_MEAL]]
+            for index in range(len(DEFAULT_DIET_NAMES))
+        ]
+    logger.debug("끼니별 선택된 음식: %s", meals)
+
+    # 기본 식단 생성 (아침, 점심, 저녁) - 하나라도 실패하면 전부 취소
+    created_diets = []
+
+    foods = Food.objects.in_bulk([food_id for meal in meals for food_id, _ in meal])
+    with transaction.atomic():
+        for name, meal in zip(DEFAULT_DIET_NAMES, meals):
+            if not meal:
+                raise DietGenerationError("필터링된 음식이 없습니다.")
+
+            diet = Diet.objects.create(user=user, name=name)
+            DietFood.objects.bulk_create([
+                DietFood(diet=diet, food=foods[food_id], portion_size=portion_size).set_nutrients()
+                for food_id, portion_size in meal
+            ])
+            created_diets.append(diet)
+
+        # 영양소 합계 컬럼을 같은 트랜잭션에서 갱신
+        Diet.objects.filter(id__in=[diet.id for diet in created_diets]).refresh_totals()
+
+        if on_created is not None:
+            on_created(created_diets)
+
+    return created_diets
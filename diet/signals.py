@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from diet.models import DailyNutrition, Diet
+
+
+@receiver(post_delete, sender=Diet)
+def refresh_daily_nutrition(sender, instance, **kwargs):
+    # 식단이 삭제되면 그날 합계를 다시 계산 (추가/변경은 Diet.refresh_totals 경로에서 갱신)
+    DailyNutrition.objects.refresh_days([(instance.user_id, instance.date)])
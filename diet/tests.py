@@ -1,3 +1,341 @@
+import datetime
+import io
+import random
+import types
+from unittest import mock
+
+import numpy as np
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from diet.jobs import MAX_ATTEMPTS, STALE_AFTER, JobLost, claim_job, enqueue, run_job
+from diet.models import DailyNutrition, Diet, DietJob
+from diet.optimizer import (
+    FOODS_PER_MEAL, MAX_PORTION, MEAL_SHARES, MIN_PORTION, daily_targets, plan_meals, plan_totals,
+)
+from diet.services import generate_default_diets
+from dietfood.models import DietFood
+from food.allergens import get_classifier
+from food.models import Food
+from user.models import Profile, User
+
+
+def make_profile(**fields):
+    values = {"age": 30, "gender": "F", "height": 165, "weight": 62, "target_weight": 55, "preferences": []}
+    values.update(fields)
+    return types.SimpleNamespace(**values)
+
+
+class DietOptimizerTest(TestCase):
+    def test_daily_targets_needs_body_data(self):
+        self.assertIsNone(daily_targets(make_profile(height=None)))
+
+        targets = daily_targets(make_profile())
+        # (10*62 + 6.25*165 - 5*30 - 161) * 1.375 - 500
+        self.assertAlmostEqual(targets[0], 1342.84, places=1)
+        self.assertAlmostEqual(targets[1] * 4 + targets[2] * 4 + targets[3] * 9, targets[0])
+
+    def test_plan_meals_hits_targets(self):
+        np_rng = np.random.default_rng(1)
+        protein, carbs, fat = np_rng.uniform(0, 30, 2000), np_rng.uniform(0, 70, 2000), np_rng.uniform(0, 30, 2000)
+        nutrients = np.column_stack([protein * 4 + carbs * 4 + fat * 9, protein, carbs, fat])
+        ids = np.arange(1, 2001)
+        targets = daily_targets(make_profile())
+
+        meals = plan_meals(ids, nutrients, targets, rng=random.Random(1))
+
+        self.assertEqual([len(meal) for meal in meals], [FOODS_PER_MEAL] * 3)
+        food_ids = [food_id for meal in meals for food_id, _ in meal]
+        self.assertEqual(len(set(food_ids)), len(food_ids))
+        self.assertTrue(all(MIN_PORTION <= portion <= MAX_PORTION for meal in meals for _, portion in meal))
+        totals = sum(plan_totals(dict(zip(ids.tolist(), nutrients)), meal) for meal in meals)
+        np.testing.assert_allclose(totals, targets, rtol=0.1)
+
+    def test_plan_meals_needs_enough_candidates(self):
+        self.assertIsNone(plan_meals(np.arange(5), np.ones((5, 4)), daily_targets(make_profile())))
+
+    def test_plan_meals_skips_foods_without_nutrients(self):
+        needed = FOODS_PER_MEAL * len(MEAL_SHARES)
+        nutrients = np.vstack([np.ones((needed, 4)) * 50, np.zeros((needed, 4))])
+        meals = plan_meals(np.arange(2 * needed), nutrients, daily_targets(make_profile()), rng=random.Random(1))
+
+        self.assertTrue(all(food_id < needed for meal in meals for food_id, _ in meal))
+        self.assertIsNone(plan_meals(np.arange(needed), np.zeros((needed, 4)), daily_targets(make_profile())))
+
+
+class DietReadQueryTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="diet@example.com", password="pw", name="식단", nickname="diet")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        foods = [
+            Food.objects.create(external_id=str(n), name=f"음식 {n}", calories=100 + n, protein=10, carbs=20, fat=5)
+            for n in range(3)
+        ]
+        for n in range(30):
+            diet = Diet.objects.create(user=self.user, name=f"식단 {n}")
+            DietFood.objects.bulk_create([
+                DietFood(diet=diet, food=food, portion_size=50).set_nutrients() for food in foods
+            ])
+        Diet.objects.refresh_totals()
+
+    def test_list_runs_constant_number_of_queries(self):
+        # 식단(합계 컬럼 포함) 1번, 음식 목록(음식 정보 포함) 1번
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("diet-list"))
+
+        self.assertEqual(len(response.data), 30)
+        diet = response.data[0]
+        self.assertEqual(len(diet["diet_foods"]), 3)
+        self.assertAlmostEqual(diet["total_calories"], (100 + 101 + 102) / 2)
+        self.assertAlmostEqual(diet["total_protein"], 15)
+
+    def test_detail_runs_constant_number_of_queries(self):
+        diet = Diet.objects.first()
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("diet-detail", args=[diet.id]))
+
+        self.assertAlmostEqual(response.data["total_fat"], 7.5)
+        self.assertEqual(response.data["diet_foods"][0]["food"]["name"], "음식 0")
+
+
+class DietTotalsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="totals@example.com", password="pw", name="합계", nickname="totals")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.diet = Diet.objects.create(user=self.user, name="점심 식단")
+        Food.objects.create(external_id="rice", name="밥", calories=130, protein=2.7, carbs=28, fat=0.3)
+        Food.objects.create(external_id="egg", name="달걀", calories=155, protein=13, carbs=1.1, fat=11)
+
+    def test_add_update_remove_keep_totals_in_sync(self):
+        self.client.post(
+            reverse("dietfood-add", args=[self.diet.id]), {"external_ids": ["rice", "egg"], "portion_size": 200},
+            format="json",
+        )
+        self.diet.refresh_from_db()
+        self.assertAlmostEqual(self.diet.total_calories, 570)
+
+        self.client.put(
+            reverse("dietfood-protionsize", args=[self.diet.id]), {"updates": [{"external_id": "egg", "portion_size": 50}]},
+            format="json",
+        )
+        self.diet.refresh_from_db()
+        self.assertAlmostEqual(self.diet.total_calories, 260 + 77.5)
+
+        self.client.delete(reverse("dietfood-remove", args=[self.diet.id]), {"external_ids": ["rice"]}, format="json")
+        self.diet.refresh_from_db()
+        self.assertAlmostEqual(self.diet.total_calories, 77.5)
+        self.assertAlmostEqual(self.diet.total_fat, 5.5)
+
+    def test_failed_add_rolls_back(self):
+        response = self.client.post(
+            reverse("dietfood-add", args=[self.diet.id]), {"external_ids": ["rice", "missing"]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(self.diet.diet_foods.exists())
+
+    def test_repair_recomputes_from_food(self):
+        DietFood.objects.create(diet=self.diet, food=Food.objects.get(external_id="rice"), portion_size=100)
+        Food.objects.filter(external_id="rice").update(calories=100)
+        Diet.objects.filter(id=self.diet.id).update(total_calories=0)
+
+        call_command("repair_diet_totals", stdout=io.StringIO())
+
+        self.diet.refresh_from_db()
+        self.assertAlmostEqual(self.diet.total_calories, 100)
+        self.assertAlmostEqual(self.diet.diet_foods.get().calories, 100)
+
+
+class DietStatsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="stats@example.com", password="pw", name="통계", nickname="stats")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.food = Food.objects.create(external_id="rice", name="밥", calories=100, protein=2, carbs=20, fat=1)
+
+    def add_diet(self, day, portion_size=100):
+        diet = Diet.objects.create(user=self.user, name="식단", date=day)
+        DietFood.objects.create(diet=diet, food=self.food, portion_size=portion_size)
+        diet.refresh_totals()
+        return diet
+
+    def test_rollups_follow_diet_changes(self):
+        first = self.add_diet(datetime.date(2026, 1, 5))
+        self.add_diet(datetime.date(2026, 1, 5), portion_size=200)
+        self.add_diet(datetime.date(2026, 1, 12))
+
+        rollup = DailyNutrition.objects.get(user=self.user, day=datetime.date(2026, 1, 5))
+        self.assertEqual((rollup.diet_count, rollup.total_calories), (2, 300))
+
+        first.delete()
+        rollup.refresh_from_db()
+        self.assertEqual((rollup.diet_count, rollup.total_calories), (1, 200))
+
+    def test_stats_by_granularity(self):
+        self.add_diet(datetime.date(2026, 1, 5))  # 월요일
+        self.add_diet(datetime.date(2026, 1, 7))
+        self.add_diet(datetime.date(2026, 2, 2))
+        params = {"from": "2026-01-01", "to": "2026-12-31"}
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("diet-stats"), {**params, "granularity": "week"})
+        self.assertEqual(
+            [(str(row["period"]), row["days"], row["total_calories"]) for row in response.data["results"]],
+            [("2026-01-05", 2, 200), ("2026-02-02", 1, 100)],
+        )
+
+        response = self.client.get(reverse("diet-stats"), {**params, "granularity": "month"})
+        self.assertEqual([row["total_calories"] for row in response.data["results"]], [200, 100])
+
+        response = self.client.get(reverse("diet-stats"), {**params, "granularity": "year"})
+        self.assertEqual(response.status_code, 400)
+
+
+class DietListPaginationTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="page@example.com", password="pw", name="목록", nickname="page")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        start = datetime.date(2026, 3, 1)
+        for n in range(25):
+            Diet.objects.create(user=self.user, name=f"식단 {n}", date=start + datetime.timedelta(days=n // 3))
+
+    def test_cursor_walks_all_pages_newest_first(self):
+        seen = []
+        params = {"limit": 10}
+        while True:
+            response = self.client.get(reverse("diet-list"), params)
+            seen += [(row["date"], row["id"]) for row in response.data]
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            params = {"limit": 10, "cursor": cursor}
+
+        expected = [(str(date), pk) for date, pk in Diet.objects.order_by("-date", "-id").values_list("date", "id")]
+        self.assertEqual(seen, expected)
+
+    def test_range_filter_and_invalid_cursor(self):
+        response = self.client.get(reverse("diet-list"), {"from": "2026-03-02", "to": "2026-03-03"})
+        self.assertEqual({row["date"] for row in response.data}, {"2026-03-02", "2026-03-03"})
+        self.assertEqual(len(response.data), 6)
+        self.assertNotIn("X-Next-Cursor", response.headers)
+
+        response = self.client.get(reverse("diet-list"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+
+class DietGenerationTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="gen@example.com", password="pw", name="생성", nickname="gen")
+        Profile.objects.create(user=self.user, allergies=[])
+        milk = get_classifier().bits["milk"]
+        for n in range(FOODS_PER_MEAL * 6):
+            Food.objects.create(external_id=str(n), name=f"음식 {n}", calories=100, protein=10, carbs=10, fat=1,
+                                allergen_mask=milk if n % 2 else 0)
+
+    @mock.patch("diet.services.get_nutrient_table", return_value=None)
+    @mock.patch("diet.services.fetch_food_from_external_api", return_value=[])
+    def test_uses_current_profile_not_cached_snapshot(self, fetch, table):
+        stale_user = User.objects.select_related("profile").get(pk=self.user.pk)  # 인증 캐시의 스냅샷
+        Profile.objects.filter(user=self.user).update(allergies=["유제품"])  # 다른 워커에서 알레르기 추가
+
+        diets = generate_default_diets(stale_user)
+
+        masks = DietFood.objects.filter(diet__in=diets).values_list("food__allergen_mask", flat=True)
+        self.assertEqual(len(masks), FOODS_PER_MEAL * 3)
+        self.assertEqual(set(masks), {0})
+
+
+    @mock.patch("diet.services.get_nutrient_table", return_value=None)
+    @mock.patch("diet.services.fetch_food_from_external_api")
+    def test_foods_saved_by_another_worker_do_not_conflict(self, fetch, table):
+        # 다른 작업이 이미 저장한 상품("0")과 새 상품이 함께 수집된 경우
+        fetch.return_value = [
+            {"external_id": external_id, "name": name, "calories": 100, "protein": 10, "carbs": 10, "fat": 1}
+            for external_id, name in [("0", "다른 이름"), ("new", "새 음식")]
+        ]
+
+        diets = generate_default_diets(self.user)
+
+        self.assertEqual(len(diets), 3)
+        self.assertEqual(Food.objects.get(external_id="0").name, "음식 0")
+        self.assertTrue(Food.objects.filter(external_id="new").exists())
+
+
+@mock.patch("diet.services.get_nutrient_table", return_value=None)
+@mock.patch("diet.services.fetch_food_from_external_api", return_value=[])
+class DietJobTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="job@example.com", password="pw", name="작업", nickname="job")
+        Profile.objects.create(user=self.user)
+        for n in range(FOODS_PER_MEAL * 3):
+            Food.objects.create(external_id=str(n), name=f"음식 {n}", calories=100, protein=10, carbs=10, fat=1)
+
+    def make_stale(self, job, attempts):
+        DietJob.objects.filter(pk=job.pk).update(
+            status=DietJob.STATUS_RUNNING, attempts=attempts, started_at=timezone.now() - STALE_AFTER * 2,
+        )
+
+    def test_claim_pending_job_once(self, *mocks):
+        job = enqueue(self.user)
+
+        claimed = claim_job("w1")
+        self.assertEqual((claimed.id, claimed.status, claimed.attempts, claimed.worker),
+                         (job.id, DietJob.STATUS_RUNNING, 1, "w1"))
+        self.assertIsNone(claim_job("w2"))
+
+    def test_stale_running_job_is_reclaimed_until_attempts_run_out(self, *mocks):
+        job = enqueue(self.user)
+        self.make_stale(job, attempts=1)
+        self.assertEqual(claim_job("w2").attempts, 2)
+
+        self.make_stale(job, attempts=MAX_ATTEMPTS)
+        self.assertIsNone(claim_job("w3"))
+        job.refresh_from_db()
+        self.assertEqual(job.status, DietJob.STATUS_FAILED)
+
+    def test_run_job_retries_then_fails(self, fetch, table):
+        fetch.side_effect = RuntimeError("upstream down")
+        enqueue(self.user)
+
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            job = claim_job("w1")
+            self.assertEqual(job.attempts, attempt)
+            with self.assertRaises(RuntimeError):
+                run_job(job)
+            job.refresh_from_db()
+            expected = DietJob.STATUS_FAILED if attempt == MAX_ATTEMPTS else DietJob.STATUS_PENDING
+            self.assertEqual((job.status, job.error), (expected, "upstream down"))
+        self.assertIsNone(claim_job("w1"))
+
+    def test_reclaimed_job_result_is_discarded(self, *mocks):
+        enqueue(self.user)
+        slow = claim_job("slow")
+        self.make_stale(slow, attempts=1)
+        claim_job("fast")
+
+        with self.assertRaises(JobLost):
+            run_job(slow)
+
+        self.assertFalse(Diet.objects.exists())  # 식단 생성도 함께 취소
+        self.assertEqual(DietJob.objects.get().worker, "fast")
+
+    def test_async_create_and_status(self, *mocks):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.post(reverse("diet-create") + "?async=true")
+        self.assertEqual(response.status_code, 202)
+        status_url = response.data["status_url"]
+        self.assertEqual(client.get(status_url).data["status"], DietJob.STATUS_PENDING)
+
+        run_job(claim_job("w1"))
 
-# Create your tests here.
+        response = client.get(status_url)
+        self.assertEqual(response.data["status"], DietJob.STATUS_DONE)
+        self.assertEqual(len(response.data["diets"]), 3)
@@ -1,11 +1,13 @@
 from django.urls import path
-from .views import DietListView,DietCreateView,DietDeleteView,DietDetailView
+from .views import DietListView,DietCreateView,DietDeleteView,DietDetailView,DietJobDetailView,DietStatsView
 
 
 urlpatterns = [
     path('', DietListView.as_view(), name='diet-list'),  # 사용자의 식단 전체 목록 조회
     path('<int:diet_id>/', DietDetailView.as_view(), name='diet-detail'),  # 단일 조회 추가
     path('create/', DietCreateView.as_view(), name='diet-create'),  # 새로운 식단 생성
+    path('stats/', DietStatsView.as_view(), name='diet-stats'),  # 기간별(일/주/월) 영양소 합계
+    path('jobs/<int:job_id>/', DietJobDetailView.as_view(), name='diet-job'),  # 비동기 식단 생성 작업 상태 조회
     path('delete/<int:diet_id>/', DietDeleteView.as_view(), name='diet-delete'),  # 단일 삭제
 
 ]
\ No newline at end of file
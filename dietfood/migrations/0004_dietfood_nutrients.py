@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:16
+
+from django.db import migrations, models
+from django.db.models import F, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce
+
+NUTRIENT_FIELDS = ["calories", "protein", "carbs", "fat"]
+
+
+def backfill_nutrients(apps, schema_editor):
+    """기존 DietFood 영양소 컬럼과 Diet 합계 컬럼 채우기"""
+    DietFood = apps.get_model("dietfood", "DietFood")
+    Food = apps.get_model("food", "Food")
+    Diet = apps.get_model("diet", "Diet")
+
+    ratio = Cast(F("portion_size"), FloatField()) / 100.0
+    DietFood.objects.update(**{
+        field: Subquery(Food.objects.filter(pk=OuterRef("food_id")).values(field)[:1]) * ratio
+        for field in NUTRIENT_FIELDS
+    })
+
+    diet_foods = DietFood.objects.filter(diet=OuterRef("pk")).values("diet")
+    Diet.objects.update(**{
+        f"total_{field}": Coalesce(
+            Subquery(diet_foods.annotate(total=Sum(field)).values("total")[:1]), 0.0, output_field=FloatField()
+        )
+        for field in NUTRIENT_FIELDS
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('diet', '0004_diet_totals'),
+        ('dietfood', '0003_alter_dietfood_portion_size'),
+        ('food', '0005_food_allergen_mask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dietfood',
+            name='calories',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dietfood',
+            name='carbs',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dietfood',
+            name='fat',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dietfood',
+            name='protein',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(backfill_nutrients, migrations.RunPython.noop),
+    ]
@@ -1,15 +1,49 @@
 from django.db import models
+from django.db.models import F, FloatField, OuterRef, Subquery
+from django.db.models.functions import Cast
 from common.models import CommonModel
-from diet.models import Diet  # Diet 모델을 임포트
+from diet.models import Diet, NUTRIENT_FIELDS  # Diet 모델을 임포트
 from food.models import Food  # Food 모델을 임포트
 
+class DietFoodQuerySet(models.QuerySet):
+    def refresh_nutrients(self):
+        """영양소 컬럼을 현재 음식 정보와 양으로 다시 계산 (UPDATE 1번) -> 갱신된 행 수"""
+        ratio = Cast(F("portion_size"), FloatField()) / 100.0
+        return self.update(**{
+            field: Subquery(Food.objects.filter(pk=OuterRef("food_id")).values(field)[:1]) * ratio
+            for field in NUTRIENT_FIELDS
+        })
+
+
 class DietFood(CommonModel):
     diet = models.ForeignKey(Diet, on_delete=models.CASCADE, related_name="diet_foods")  # Diet와 연결
     food = models.ForeignKey(Food, on_delete=models.CASCADE, related_name="food_diets",default=1)  # Food와 연결
     portion_size = models.DecimalField(max_digits=6, decimal_places=2,default=100)  # 음식의 양 (예: 200g, 1개 등)
+    # 섭취량 기준 영양소 (음식 100g 기준 값 x 양 / 100, 저장 시 계산)
+    calories = models.FloatField(default=0)
+    protein = models.FloatField(default=0)
+    carbs = models.FloatField(default=0)
+    fat = models.FloatField(default=0)
+
+    objects = DietFoodQuerySet.as_manager()
 
     class Meta:
         unique_together = ('diet', 'food')  # 같은 식단에 동일한 음식을 두 번 추가하지 않도록 설정
 
+    def set_nutrients(self, food=None):
+        """음식 정보와 양으로 영양소 컬럼 계산 (bulk_create 처럼 save() 를 거치지 않을 때 직접 호출)"""
+        food = food or self.food
+        ratio = float(self.portion_size) / 100
+        for field in NUTRIENT_FIELDS:
+            setattr(self, field, float(getattr(food, field)) * ratio)
+        return self
+
+    def save(self, *args, **kwargs):
+        self.set_nutrients()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, *NUTRIENT_FIELDS}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.diet.name} - {self.food.name} ({self.portion_size}g)"
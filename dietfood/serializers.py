@@ -7,4 +7,4 @@ class DietFoodSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = DietFood
-        fields = ['diet', 'food', 'portion_size']  # 음식, 식단, 양
+        fields = ['diet', 'food', 'portion_size', 'calories', 'protein', 'carbs', 'fat']  # 음식, 식단, 양, 양 기준 영양소
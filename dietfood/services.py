@@ -0,0 +1,139 @@
+from decimal import Decimal
+
+from django.db.models import Case, DecimalField, F, Value, When
+from django.utils import timezone
+from rest_framework import status
+
+from diet.models import Diet, NUTRIENT_FIELDS
+from food.models import Food
+from .models import DietFood
+
+# 식단 음식 추가/삭제/양 변경의 집합 단위 처리 (단일 식단 뷰와 여러 식단 일괄 처리 뷰가 공유)
+# - 호출자는 transaction.atomic 안에서 lock_diets 로 식단 행을 잠근 뒤 호출
+#   (같은 식단에 대한 동시 요청은 잠금 순서대로 처리되므로 기존 행 조회 후 쓰기가 안전)
+# - 음식 id 개수와 관계없이 함수마다 고정된 수의 쿼리만 실행
+# - 식단 합계(total_*)는 마지막에 refresh_diets 로 한 번에 갱신
+
+
+class DietFoodError(Exception):
+    """요청을 처리할 수 없는 경우 (트랜잭션 안에서 던져 지금까지의 변경을 모두 취소)"""
+
+    def __init__(self, detail, status_code=status.HTTP_400_BAD_REQUEST):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+MAX_PORTION = Decimal("9999.99")  # DietFood.portion_size(max_digits=6, decimal_places=2) 최대값
+
+
+def to_portion(value):
+    """요청의 양(int/float/문자열) -> Decimal (0 이하, 너무 크거나 숫자가 아니면 None)"""
+    if isinstance(value, bool):
+        return None
+    try:
+        portion = Decimal(str(value)).quantize(Decimal("0.01"))
+        return portion if 0 < portion <= MAX_PORTION else None
+    except (ArithmeticError, ValueError):  # NaN/Infinity/숫자가 아닌 문자열
+        return None
+
+
+def lock_diets(user, diet_ids):
+    """사용자의 식단들을 id 순서로 잠그고 {id: Diet} 반환 (하나라도 없거나 남의 식단이면 404)"""
+    diet_ids = set(diet_ids)
+    diets = Diet.objects.select_for_update().filter(user=user, id__in=diet_ids).order_by("id").in_bulk()
+    missing = diet_ids - set(diets)
+    if missing:
+        raise DietFoodError(f"식단 ID {sorted(missing)[0]}를 찾을 수 없습니다.", status.HTTP_404_NOT_FOUND)
+    return diets
+
+
+def foods_by_external_id(external_ids, required=True):
+    """external_id -> Food (쿼리 1번), required 이면 없는 음식이 있을 때 404"""
+    foods = Food.objects.in_bulk(set(external_ids), field_name="external_id")
+    if required:
+        for external_id in external_ids:
+            if external_id not in foods:
+                raise DietFoodError(f"음식 ID {external_id}를 찾을 수 없습니다.", status.HTTP_404_NOT_FOUND)
+    return foods
+
+
+def add_foods(diet, items, merge=False):
+    """[(Food, 양), ...] 을 식단에 추가 -> 추가/변경된 DietFood 목록
+
+    이미 있는 음식은 merge 이면 기존 양에 더하고(F() 증가), 아니면 양을 덮어씀
+    """
+    portions = {}
+    foods = {}
+    for food, portion in items:
+        foods[food.id] = food
+        # 같은 요청에 같은 음식이 여러 번 오면 merge 는 합산, 덮어쓰기는 마지막 값
+        portions[food.id] = portions.get(food.id, 0) + portion if merge else portion
+    if not portions:
+        return []
+
+    now = timezone.now()
+    if not merge:
+        # INSERT ... ON CONFLICT (diet, food) DO UPDATE 한 번으로 추가/덮어쓰기
+        DietFood.objects.bulk_create(
+            [DietFood(diet=diet, food=foods[food_id], portion_size=portion).set_nutrients()
+             for food_id, portion in portions.items()],
+            update_conflicts=True,
+            unique_fields=["diet", "food"],
+            update_fields=["portion_size", *NUTRIENT_FIELDS, "updated_at"],
+        )
+    else:
+        existing = dict(DietFood.objects.filter(diet=diet, food_id__in=portions).values_list("food_id", "portion_size"))
+        # 새로 추가되는 음식도 같은 요청 안에서 합산된 양이 컬럼 최대값을 넘을 수 있으므로 모두 확인
+        for food_id, portion in portions.items():
+            if existing.get(food_id, 0) + portion > MAX_PORTION:
+                raise DietFoodError(f"양은 {MAX_PORTION} 이하여야 합니다. (ID: {foods[food_id].external_id})")
+        DietFood.objects.bulk_create([
+            DietFood(diet=diet, food=foods[food_id], portion_size=portion).set_nutrients()
+            for food_id, portion in portions.items() if food_id not in existing
+        ])
+        if existing:
+            merged = DietFood.objects.filter(diet=diet, food_id__in=existing)
+            merged.update(
+                portion_size=F("portion_size") + _case_by_food({food_id: portions[food_id] for food_id in existing}),
+                updated_at=now,
+            )
+            merged.refresh_nutrients()
+
+    return list(DietFood.objects.filter(diet=diet, food_id__in=portions).select_related("food").order_by("id"))
+
+
+def remove_foods(diet, foods):
+    """식단에서 음식 삭제 -> 삭제된 음식 수 (식단에 없는 음식이 있으면 400)"""
+    food_ids = {food.id for food in foods}
+    present = set(DietFood.objects.filter(diet=diet, food_id__in=food_ids).values_list("food_id", flat=True))
+    for food in foods:
+        if food.id not in present:
+            raise DietFoodError(f"이 식단에 음식 ID {food.external_id}가 없습니다.")
+    deleted, _ = DietFood.objects.filter(diet=diet, food_id__in=food_ids).delete()
+    return deleted
+
+
+def set_portions(diet, items):
+    """[(Food, 양), ...] 의 양을 변경 (UPDATE 1번) -> 변경된 DietFood 목록 (식단에 없는 음식은 무시)"""
+    portions = {food.id: portion for food, portion in items}
+    if not portions:
+        return []
+    updated = DietFood.objects.filter(diet=diet, food_id__in=portions)
+    if not updated.update(portion_size=_case_by_food(portions), updated_at=timezone.now()):
+        return []
+    updated.refresh_nutrients()
+    return list(updated.select_related("food").order_by("id"))
+
+
+def refresh_diets(diets):
+    """변경된 식단들의 합계 컬럼(과 일별 합계) 갱신"""
+    Diet.objects.filter(id__in=[diet.id for diet in diets]).refresh_totals()
+
+
+def _case_by_food(values):
+    """food_id 별 값을 고르는 CASE 식 (여러 행을 UPDATE 한 번으로 서로 다른 값으로 변경)"""
+    return Case(
+        *[When(food_id=food_id, then=Value(value)) for food_id, value in values.items()],
+        output_field=DecimalField(max_digits=6, decimal_places=2),
+    )
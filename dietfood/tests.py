@@ -1,3 +1,143 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from diet.models import Diet
+from dietfood.models import DietFood
+from food.models import Food
+from user.models import User
+
+
+class DietFoodBatchPathTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="batch@example.com", password="pw", name="일괄", nickname="batch")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.diet = Diet.objects.create(user=self.user, name="점심 식단")
+        Food.objects.bulk_create([
+            Food(external_id=f"f{n}", name=f"음식 {n}", calories=100, protein=10, carbs=10, fat=1) for n in range(100)
+        ])
+        self.external_ids = [f"f{n}" for n in range(100)]
+
+    def count_queries(self, method, name, data):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(reverse(name, args=[self.diet.id]), data, format="json")
+        return response, len(queries)
+
+    def test_query_count_does_not_depend_on_number_of_ids(self):
+        _, few = self.count_queries("post", "dietfood-add", {"external_ids": self.external_ids[:2]})
+        DietFood.objects.all().delete()
+        _, more = self.count_queries("post", "dietfood-add", {"external_ids": self.external_ids[:50]})
+        self.assertEqual(few, more)
+
+        # SQLite 는 변수 개수 제한으로 INSERT 가 나뉠 수 있어 100개는 상한만 확인
+        DietFood.objects.all().delete()
+        response, queries = self.count_queries("post", "dietfood-add", {"external_ids": self.external_ids})
+        self.assertEqual(response.status_code, 201)
+        self.assertLessEqual(queries, 12)
+
+        updates = [{"external_id": external_id, "portion_size": 50} for external_id in self.external_ids]
+        response, queries = self.count_queries("put", "dietfood-protionsize", {"updates": updates})
+        self.assertEqual(len(response.data["updated_foods"]), 100)
+        self.assertLessEqual(queries, 12)
+
+        response, queries = self.count_queries("delete", "dietfood-remove", {"external_ids": self.external_ids})
+        self.assertEqual(len(response.data["deleted_foods"]), 100)
+        self.assertLessEqual(queries, 12)
+
+    def test_merge_quantity_increments_in_place(self):
+        data = {"external_ids": ["f1", "f2"], "portion_size": 100}
+        self.client.post(reverse("dietfood-add", args=[self.diet.id]), data, format="json")
+        response = self.client.post(
+            reverse("dietfood-add", args=[self.diet.id]), {**data, "external_ids": ["f1"], "merge_quantity": True},
+            format="json",
+        )
+
+        self.assertEqual(response.data["added_foods"][0]["portion_size"], 200)
+        self.assertEqual(response.data["added_foods"][0]["calories"], 200)
+        self.diet.refresh_from_db()
+        self.assertEqual(self.diet.total_calories, 300)
+
+    def test_merge_rejects_summed_portion_over_column_limit(self):
+        response = self.client.post(
+            reverse("dietfood-add", args=[self.diet.id]),
+            {"external_ids": ["f1"] * 200, "portion_size": 100, "merge_quantity": True},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(DietFood.objects.exists())
+
+    def test_other_users_diet_is_not_found(self):
+        other = User.objects.create_user(email="other@example.com", password="pw", name="남", nickname="other")
+        diet = Diet.objects.create(user=other, name="남의 식단")
+
+        response = self.client.post(reverse("dietfood-add", args=[diet.id]), {"external_ids": ["f1"]}, format="json")
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(DietFood.objects.exists())
+
+
+class DietFoodBatchViewTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="multi@example.com", password="pw", name="여러", nickname="multi")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.lunch = Diet.objects.create(user=self.user, name="점심 식단")
+        self.dinner = Diet.objects.create(user=self.user, name="저녁 식단")
+        Food.objects.bulk_create([
+            Food(external_id=f"f{n}", name=f"음식 {n}", calories=100, protein=10, carbs=10, fat=1) for n in range(5)
+        ])
+
+    def test_applies_operations_across_diets_in_order(self):
+        operations = [
+            {"op": "add", "diet_id": self.lunch.id, "external_ids": ["f0", "f1", "f2"]},
+            {"op": "remove", "diet_id": self.lunch.id, "external_ids": ["f2"]},
+            {"op": "add", "diet_id": self.dinner.id, "external_ids": ["f3"], "portion_size": 50},
+            {"op": "set_portion", "diet_id": self.dinner.id, "updates": [{"external_id": "f3", "portion_size": 300}]},
+        ]
+
+        response = self.client.post(reverse("dietfood-batch"), {"operations": operations}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(diet["id"], diet["total_calories"]) for diet in response.data["diets"]],
+            [(self.lunch.id, 200), (self.dinner.id, 300)],
+        )
+
+    def test_failure_rolls_back_every_operation(self):
+        other = User.objects.create_user(email="o@example.com", password="pw", name="남", nickname="o")
+        foreign = Diet.objects.create(user=other, name="남의 식단")
+        operations = [
+            {"op": "add", "diet_id": self.lunch.id, "external_ids": ["f0"]},
+            {"op": "add", "diet_id": foreign.id, "external_ids": ["f1"]},
+        ]
+
+        response = self.client.post(reverse("dietfood-batch"), {"operations": operations}, format="json")
+        self.assertEqual(response.status_code, 404)
+
+        operations = [
+            {"op": "add", "diet_id": self.lunch.id, "external_ids": ["f0"]},
+            {"op": "remove", "diet_id": self.dinner.id, "external_ids": ["f0"]},  # 저녁 식단에 없음
+        ]
+        response = self.client.post(reverse("dietfood-batch"), {"operations": operations}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(DietFood.objects.exists())
+
+        response = self.client.post(reverse("dietfood-batch"), {"operations": [{"op": "rename"}]}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_malformed_operation_is_bad_request(self):
+        malformed = [
+            {"op": "set_portion", "diet_id": self.lunch.id, "updates": ["f0"]},
+            {"op": "set_portion", "diet_id": self.lunch.id, "updates": {"external_id": "f0", "portion_size": 10}},
+            {"op": "add", "diet_id": self.lunch.id, "external_ids": "f0"},
+            {"op": "remove", "diet_id": self.lunch.id, "external_ids": [["f0"]]},
+        ]
+
+        for operation in malformed:
+            response = self.client.post(reverse("dietfood-batch"), {"operations": [operation]}, format="json")
+            self.assertEqual(response.status_code, 400, operation)
+        self.assertFalse(DietFood.objects.exists())
@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import DietFoodAddView,DietFoodRemoveView,DietFoodUpdatePortionSizeView
+from .views import DietFoodAddView,DietFoodRemoveView,DietFoodUpdatePortionSizeView,DietFoodBatchView
 
 urlpatterns = [
     path('add/<int:diet_id>/', DietFoodAddView.as_view(), name='dietfood-add'),  # 음식 추가
     path('remove/<int:diet_id>/', DietFoodRemoveView.as_view(), name='dietfood-remove'),  # 음식 제거
+    path('batch/', DietFoodBatchView.as_view(), name='dietfood-batch'),  # 여러 식단 일괄 추가/삭제/양 수정
     path('protionsize/<int:diet_id>/', DietFoodUpdatePortionSizeView.as_view(), name='dietfood-protionsize'), # 양 수정
 ]
\ No newline at end of file
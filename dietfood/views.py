@@ -1,60 +1,52 @@
-from django.shortcuts import get_object_or_404
+from django.db import transaction
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .models import DietFood, Diet
-from food.models import Food
 from rest_framework.permissions import IsAuthenticated
 
+from diet.models import Diet
+from .services import (
+    DietFoodError, add_foods, foods_by_external_id, lock_diets, refresh_diets, remove_foods, set_portions, to_portion,
+)
+
+
+def diet_food_data(diet_food):
+    return {
+        "external_id": diet_food.food.external_id,
+        "portion_size": diet_food.portion_size,
+        "calories": diet_food.calories,
+        "protein": diet_food.protein,
+        "carbs": diet_food.carbs,
+        "fat": diet_food.fat
+    }
+
+
 class DietFoodAddView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, diet_id):
         """음식 단일 추가 및 대량 추가 (이미 존재하면 양만 수정, 영양소 업데이트 포함)"""
-        diet = get_object_or_404(Diet, id=diet_id, user=request.user)
         external_ids = request.data.get("external_ids", [])
-        portion_size = request.data.get("portion_size", 100)
+        portion_size = to_portion(request.data.get("portion_size", 100))
         merge_quantity = request.data.get("merge_quantity", False)  # 기존 양에 더하는 옵션
 
         if not external_ids:
             return Response({"detail": "추가할 음식 ID가 필요합니다."}, status=status.HTTP_400_BAD_REQUEST)
-        if portion_size <= 0:
+        if portion_size is None:
             return Response({"detail": "양은 0보다 커야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
 
-        added_foods = []
-
-        for external_id in external_ids:
-            food = Food.objects.filter(external_id=external_id).first()
-            if not food:
-                return Response({"detail": f"음식 ID {external_id}를 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
-
-            diet_food, created = DietFood.objects.get_or_create(
-                diet=diet, food=food, defaults={"portion_size": portion_size}
-            )
-
-            if not created:
-                if merge_quantity:
-                    diet_food.portion_size += portion_size  # 기존 양에 추가
-                else:
-                    diet_food.portion_size = portion_size  # 기존 양을 덮어씀
-
-            # **영양소 업데**
-            diet_food.calories = food.calories * (diet_food.portion_size / 100.0)
-            diet_food.protein = food.protein * (diet_food.portion_size / 100.0)
-            diet_food.carbs = food.carbs * (diet_food.portion_size / 100.0)
-            diet_food.fat = food.fat * (diet_food.portion_size / 100.0)
-
-            diet_food.save()
-
-            added_foods.append({
-                "external_id": external_id,
-                "portion_size": diet_food.portion_size,
-                "calories": diet_food.calories,
-                "protein": diet_food.protein,
-                "carbs": diet_food.carbs,
-                "fat": diet_food.fat
-            })
-
+        # 식단 잠금 -> 음식 조회 1번 -> 일괄 추가 -> 합계 갱신을 한 트랜잭션으로 처리 (실패 시 전부 취소)
+        try:
+            with transaction.atomic():
+                diet = lock_diets(request.user, [diet_id])[diet_id]
+                foods = foods_by_external_id(external_ids)
+                diet_foods = add_foods(diet, [(foods[external_id], portion_size) for external_id in external_ids],
+                                       merge=bool(merge_quantity))
+                refresh_diets([diet])
+        except DietFoodError as e:
+            return Response({"detail": e.detail}, status=e.status_code)
+
+        added_foods = [diet_food_data(diet_food) for diet_food in diet_foods]
         return Response({"detail": "음식이 추가되었습니다.", "added_foods": added_foods}, status=status.HTTP_201_CREATED)
 
 
@@ -63,29 +55,22 @@ class DietFoodRemoveView(APIView):
 
     def delete(self, request, diet_id):
         """음식 단일 삭제 및 대량 삭제"""
-        diet = get_object_or_404(Diet, id=diet_id, user=request.user)
         external_ids = request.data.get("external_ids", [])
 
         if not external_ids:
             return Response({"detail": "삭제할 음식 ID가 필요합니다."}, status=status.HTTP_400_BAD_REQUEST)
 
-        deleted_foods = []
-
-        for external_id in external_ids:
-            food = Food.objects.filter(external_id=external_id).first()
-            if not food:
-                return Response({"detail": f"음식 ID {external_id}를 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
-
-            diet_food = DietFood.objects.filter(diet=diet, food=food).first()
-            if not diet_food:
-                return Response({"detail": f"이 식단에 음식 ID {external_id}가 없습니다."}, status=status.HTTP_400_BAD_REQUEST)
-
-            diet_food.delete()
-            deleted_foods.append({
-                "external_id": external_id,
-                "name": food.name
-            })
-
+        try:
+            with transaction.atomic():
+                diet = lock_diets(request.user, [diet_id])[diet_id]
+                foods = foods_by_external_id(external_ids)
+                removed = list({foods[external_id].id: foods[external_id] for external_id in external_ids}.values())
+                remove_foods(diet, removed)
+                refresh_diets([diet])
+        except DietFoodError as e:
+            return Response({"detail": e.detail}, status=e.status_code)
+
+        deleted_foods = [{"external_id": food.external_id, "name": food.name} for food in removed]
         return Response({"detail": "음식이 삭제되었습니다.", "deleted_foods": deleted_foods}, status=status.HTTP_200_OK)
 
 
@@ -94,8 +79,6 @@ class DietFoodUpdatePortionSizeView(APIView):
 
     def put(self, request, diet_id):
         """음식 양(포션) 수정 (대량 수정 & 개별 수정 가능, 영양소 업데이트 포함)"""
-        diet = get_object_or_404(Diet, id=diet_id, user=request.user)
-
         # 같은 양을 여러 개의 음식에 적용
         external_ids = request.data.get("external_ids", [])
         portion_size = request.data.get("portion_size")
@@ -106,64 +89,125 @@ class DietFoodUpdatePortionSizeView(APIView):
         if not external_ids and not updates:
             return Response({"detail": "수정할 음식 ID와 수량이 필요합니다."}, status=status.HTTP_400_BAD_REQUEST)
 
-        updated_foods = []
-
-        # 같은 양을 여러 개에 적용
+        # (external_id, 양) 목록으로 정리 (개별 양이 같은 양보다 나중에 적용)
+        portions = []
         if external_ids and portion_size is not None:
-            if portion_size <= 0:
+            portion_size = to_portion(portion_size)
+            if portion_size is None:
                 return Response({"detail": "양은 0보다 커야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+            portions += [(external_id, portion_size) for external_id in external_ids]
 
-            for external_id in external_ids:
-                food = Food.objects.filter(external_id=external_id).first()
-                if not food:
-                    continue  # 존재하지 않는 음식은 무시
-
-                diet_food = DietFood.objects.filter(diet=diet, food=food).first()
-                if not diet_food:
-                    continue  # 해당 식단에 음식이 없으면 무시
-
-                diet_food.portion_size = portion_size
-                diet_food.calories = food.calories * (portion_size / 100)
-                diet_food.protein = food.protein * (portion_size / 100)
-                diet_food.carbs = food.carbs * (portion_size / 100)
-                diet_food.fat = food.fat * (portion_size / 100)
-                diet_food.save()
-
-                updated_foods.append({
-                    "external_id": external_id,
-                    "portion_size": diet_food.portion_size
-                })
-
-        # 개별 양 적용
         for update in updates:
             external_id = update.get("external_id")
-            portion_size = update.get("portion_size")
-
-            if portion_size is None or portion_size <= 0:
+            portion = to_portion(update.get("portion_size"))
+            if portion is None:
                 return Response({"detail": f"양은 0보다 커야 합니다. (ID: {external_id})"},
                                 status=status.HTTP_400_BAD_REQUEST)
+            portions.append((external_id, portion))
+
+        try:
+            with transaction.atomic():
+                diet = lock_diets(request.user, [diet_id])[diet_id]
+                # 존재하지 않는 음식이나 식단에 없는 음식은 무시
+                foods = foods_by_external_id([external_id for external_id, _ in portions], required=False)
+                diet_foods = set_portions(
+                    diet, [(foods[external_id], portion) for external_id, portion in portions if external_id in foods]
+                )
+                if not diet_foods:
+                    raise DietFoodError("수정된 음식이 없습니다.")
+                refresh_diets([diet])
+        except DietFoodError as e:
+            return Response({"detail": e.detail}, status=e.status_code)
+
+        updated_foods = [
+            {"external_id": diet_food.food.external_id, "portion_size": diet_food.portion_size}
+            for diet_food in diet_foods
+        ]
+        return Response({"detail": "음식의 양이 업데이트되었습니다.", "updated_foods": updated_foods}, status=status.HTTP_200_OK)
 
-            food = Food.objects.filter(external_id=external_id).first()
-            if not food:
-                continue  # 존재하지 않는 음식은 무시
-
-            diet_food = DietFood.objects.filter(diet=diet, food=food).first()
-            if not diet_food:
-                continue  # 해당 식단에 음식이 없으면 무시
-
-            diet_food.portion_size = portion_size
-            diet_food.calories = food.calories * (portion_size / 100)
-            diet_food.protein = food.protein * (portion_size / 100)
-            diet_food.carbs = food.carbs * (portion_size / 100)
-            diet_food.fat = food.fat * (portion_size / 100)
-            diet_food.save()
-
-            updated_foods.append({
-                "external_id": external_id,
-                "portion_size": diet_food.portion_size
-            })
-
-        if not updated_foods:
-            return Response({"detail": "수정된 음식이 없습니다."}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response({"detail": "음식의 양이 업데이트되었습니다.", "updated_foods": updated_foods}, status=status.HTTP_200_OK)
+class DietFoodBatchView(APIView):
+    permission_classes = [IsAuthenticated]
+    OPERATIONS = ("add", "remove", "set_portion")
+    MAX_OPERATIONS = 50
+
+    def post(self, request):
+        """여러 식단의 음식 추가/삭제/양 변경을 한 요청, 한 트랜잭션으로 처리
+
+        {"operations": [
+            {"op": "add", "diet_id": 1, "external_ids": [...], "portion_size": 100, "merge_quantity": false},
+            {"op": "remove", "diet_id": 1, "external_ids": [...]},
+            {"op": "set_portion", "diet_id": 2, "updates": [{"external_id": "...", "portion_size": 150}]}
+        ]}
+        작업은 순서대로 적용되며 하나라도 실패하면 전부 취소
+        """
+        operations = request.data.get("operations")
+        if not isinstance(operations, list) or not operations:
+            return Response({"detail": "operations 목록이 필요합니다."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(operations) > self.MAX_OPERATIONS:
+            return Response({"detail": f"작업은 최대 {self.MAX_OPERATIONS}개까지 가능합니다."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            parsed = [self.parse_operation(index, operation) for index, operation in enumerate(operations)]
+            with transaction.atomic():
+                # 식단 소유권 확인/잠금 1번, 모든 작업의 음식 조회 1번
+                diets = lock_diets(request.user, {operation["diet_id"] for operation in parsed})
+                foods = foods_by_external_id(
+                    [external_id for operation in parsed for external_id, _ in operation["items"]]
+                )
+                results = [self.apply(diets[operation["diet_id"]], operation, foods) for operation in parsed]
+                refresh_diets(diets.values())
+        except DietFoodError as e:
+            return Response({"detail": e.detail}, status=e.status_code)
+
+        totals = Diet.objects.filter(id__in=diets).order_by("id").values(
+            "id", "total_calories", "total_protein", "total_carbs", "total_fat"
+        )
+        return Response({"detail": "일괄 작업이 완료되었습니다.", "results": results, "diets": list(totals)},
+                        status=status.HTTP_200_OK)
+
+    def parse_operation(self, index, operation):
+        """요청 작업 -> {"op", "diet_id", "merge", "items": [(external_id, 양), ...]} (잘못되면 400)"""
+        if not isinstance(operation, dict) or operation.get("op") not in self.OPERATIONS:
+            raise DietFoodError(f"{index}번 작업: op 는 {', '.join(self.OPERATIONS)} 중 하나여야 합니다.")
+        try:
+            diet_id = int(operation.get("diet_id"))
+        except (TypeError, ValueError):
+            raise DietFoodError(f"{index}번 작업: diet_id 가 필요합니다.") from None
+
+        op = operation["op"]
+        if op == "set_portion":
+            updates = operation.get("updates") or []
+            if not isinstance(updates, list) or not all(isinstance(update, dict) for update in updates):
+                raise DietFoodError(f"{index}번 작업: updates 는 {{external_id, portion_size}} 객체 목록이어야 합니다.")
+            items = [(update.get("external_id"), to_portion(update.get("portion_size"))) for update in updates]
+        else:
+            external_ids = operation.get("external_ids") or []
+            if not isinstance(external_ids, list):
+                raise DietFoodError(f"{index}번 작업: external_ids 는 목록이어야 합니다.")
+            portion = to_portion(operation.get("portion_size", 100)) if op == "add" else None
+            items = [(external_id, portion) for external_id in external_ids]
+
+        if not all(isinstance(external_id, str) for external_id, _ in items):
+            raise DietFoodError(f"{index}번 작업: 음식 ID는 문자열이어야 합니다.")
+
+        if not items:
+            raise DietFoodError(f"{index}번 작업: 대상 음식 ID가 필요합니다.")
+        if op != "remove" and any(portion is None for _, portion in items):
+            raise DietFoodError(f"{index}번 작업: 양은 0보다 커야 합니다.")
+        return {"op": op, "diet_id": diet_id, "merge": bool(operation.get("merge_quantity")), "items": items}
+
+    def apply(self, diet, operation, foods):
+        items = [(foods[external_id], portion) for external_id, portion in operation["items"]]
+        result = {"op": operation["op"], "diet_id": diet.id}
+        if operation["op"] == "add":
+            result["foods"] = [diet_food_data(diet_food) for diet_food in add_foods(diet, items, operation["merge"])]
+        elif operation["op"] == "remove":
+            removed = list({food.id: food for food, _ in items}.values())
+            remove_foods(diet, removed)
+            result["foods"] = [{"external_id": food.external_id, "name": food.name} for food in removed]
+        else:
+            diet_foods = set_portions(diet, items)
+            result["foods"] = [diet_food_data(diet_food) for diet_food in diet_foods]
+        return result
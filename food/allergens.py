@@ -0,0 +1,100 @@
+from functools import lru_cache
+from itertools import chain
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+# 알레르기 분류기: OpenFoodFacts 태그 -> 알레르기 비트마스크
+# 분류 체계(키 순서 = 비트 순서)는 settings.ALLERGEN_TAXONOMY 로 바꿀 수 있음
+# 한 번 정해진 비트 순서는 DB 에 저장된 마스크와 맞아야 하므로 새 항목은 항상 맨 뒤에 추가
+# 마스크는 Food.allergen_mask(BigIntegerField, 부호 있는 64비트)에 저장되므로 항목은 최대 MAX_ALLERGENS 개
+
+PRODUCT_TAG_FIELDS = ["ingredients_tags", "categories_tags", "allergens_tags", "traces_tags"]
+MAX_ALLERGENS = 63  # 부호 비트를 쓰지 않도록 63개까지
+
+# EU 14대 알레르기 유발 성분(en: allergen taxonomy) + 하위 성분 태그
+DEFAULT_ALLERGEN_TAXONOMY = {
+    "nuts": {
+        "names": ["견과류"],
+        "tags": [
+            "en:nuts", "en:almonds", "en:hazelnuts", "en:walnuts", "en:cashew-nuts", "en:pecan-nuts",
+            "en:brazil-nuts", "en:pistachio-nuts", "en:macadamia-nuts", "en:queensland-nuts",
+        ],
+    },
+    "gluten": {
+        "names": ["글루텐"],
+        "tags": [
+            "en:gluten", "en:wheat", "en:barley", "en:rye", "en:oats", "en:spelt", "en:kamut",
+            "en:wheat-flour", "en:durum-wheat",
+        ],
+    },
+    "milk": {
+        "names": ["유제품"],
+        "tags": [
+            "en:dairy", "en:dairies", "en:milk", "en:lactose", "en:butter", "en:cheese", "en:cream",
+            "en:whey", "en:milk-powder", "en:skimmed-milk", "en:yogurts",
+        ],
+    },
+    "peanuts": {"names": ["땅콩"], "tags": ["en:peanuts", "en:peanut"]},
+    "eggs": {"names": ["달걀", "계란"], "tags": ["en:eggs", "en:egg", "en:egg-yolk", "en:egg-white"]},
+    "soybeans": {"names": ["대두"], "tags": ["en:soybeans", "en:soy", "en:soya", "en:soy-lecithin"]},
+    "fish": {"names": ["생선"], "tags": ["en:fish", "en:fishes", "en:tuna", "en:salmon", "en:anchovy"]},
+    "crustaceans": {"names": ["갑각류"], "tags": ["en:crustaceans", "en:shrimp", "en:prawn", "en:crab", "en:lobster"]},
+    "molluscs": {"names": ["연체동물"], "tags": ["en:molluscs", "en:squid", "en:octopus", "en:mussels", "en:oysters"]},
+    "sesame-seeds": {"names": ["참깨"], "tags": ["en:sesame-seeds", "en:sesame", "en:sesame-oil"]},
+    "celery": {"names": ["셀러리"], "tags": ["en:celery"]},
+    "mustard": {"names": ["겨자"], "tags": ["en:mustard"]},
+    "lupin": {"names": ["루핀"], "tags": ["en:lupin"]},
+    "sulphur-dioxide-and-sulphites": {
+        "names": ["아황산류"],
+        "tags": ["en:sulphur-dioxide-and-sulphites", "en:sulphites", "en:sulfites"],
+    },
+}
+
+
+class AllergenClassifier:
+    """분류 체계를 미리 컴파일 (태그 -> 비트, 이름 -> 비트)"""
+
+    def __init__(self, taxonomy):
+        if len(taxonomy) > MAX_ALLERGENS:
+            raise ImproperlyConfigured(
+                f"ALLERGEN_TAXONOMY 항목은 최대 {MAX_ALLERGENS}개입니다 (allergen_mask 는 64비트 정수): {len(taxonomy)}개"
+            )
+        self.bits = {}
+        name_bits = {}
+        tag_bits = {}
+        for position, (key, entry) in enumerate(taxonomy.items()):
+            bit = 1 << position
+            self.bits[key] = bit
+            for name in chain([key], entry.get("names", [])):
+                name_bits[name] = name_bits.get(name, 0) | bit
+            for tag in entry.get("tags", []):
+                tag_bits[tag] = tag_bits.get(tag, 0) | bit
+
+        self.name_bits = name_bits
+        self.tag_bits = tag_bits
+        self.known_tags = frozenset(tag_bits)
+
+    def classify(self, product):
+        """제품의 모든 태그 목록을 한 번만 훑어 알레르기 비트마스크 계산"""
+        tags = chain.from_iterable(product.get(field) or () for field in PRODUCT_TAG_FIELDS)
+        mask = 0
+        # frozenset.intersection 이 C 레벨에서 한 번에 훑고, 일치한 소수의 태그만 파이썬에서 처리
+        for tag in self.known_tags.intersection(tags):
+            mask |= self.tag_bits[tag]
+        return mask
+
+    def mask_for(self, allergies):
+        """프로필 알레르기 목록(한글 이름 또는 키) -> 비트마스크 (모르는 값은 무시)"""
+        mask = 0
+        for allergy in allergies or ():
+            mask |= self.name_bits.get(allergy, 0)
+        return mask
+
+    def contains(self, mask, key):
+        return bool(mask & self.bits.get(key, 0))
+
+
+@lru_cache(maxsize=1)
+def get_classifier():
+    return AllergenClassifier(getattr(settings, "ALLERGEN_TAXONOMY", DEFAULT_ALLERGEN_TAXONOMY))
@@ -0,0 +1,137 @@
+import hashlib
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+
+from common.cache import shared_cache
+from common.http import http_client
+from food.search import normalize_query
+
+# FoodInfoView 읽기 캐시 (read-through)
+# - 검색어를 정규화해 대소문자/공백만 다른 검색어가 같은 키를 쓰도록 함
+# - "찾을 수 없음" 결과도 짧은 TTL 로 캐싱 (negative caching)
+# - 같은 검색어의 동시 캐시 미스는 한 요청만 DB/외부 API 를 조회 (single-flight)
+#   프로세스 안에서는 검색어별 Event, 프로세스 간에는 공유 캐시(L2)의 add 락 사용 (조회 중 스레드 락은 잡지 않음)
+# - 캐시 값에 음식별 버전을 함께 저장하고, Food 가 수정/삭제되면 버전을 바꿔 그 음식을 담은 값을 모두 무효화
+#   (food/signals.py, 버전/락 키는 모든 워커가 바로 보도록 L1 을 거치지 않음)
+#   버전은 공유 순번에서 받으므로 조회 전에 읽은 순번보다 큰 버전이면 조회 중에 바뀐 음식 -> 캐싱하지 않음
+
+FOOD_INFO_TTL = 60 * 60  # 1시간
+NOT_FOUND_TTL = 30  # 없는 음식은 곧 추가될 수 있으므로 짧게 유지
+LOCK_TTL = http_client.max_duration() + 5  # 조회 중 락 유지 시간 (외부 API 재시도/백오프 최대 시간 + DB 조회 여유)
+LOCK_WAIT_INTERVAL = 0.05
+
+NOT_FOUND = "__not_found__"  # negative 캐시 값
+VERSION_SEQUENCE_KEY = "food_info_version:sequence"  # 음식 버전으로 쓰는 증가 순번
+
+_inflight = {}  # 캐시 키 -> 이 프로세스에서 조회 중인 요청이 끝나면 set 되는 Event
+_inflight_lock = threading.Lock()
+
+
+def food_info_key(query):
+    # 공백/한글이 들어간 키는 일부 캐시 백엔드에서 경고가 나므로 해시 사용
+    digest = hashlib.sha1(normalize_query(query).encode()).hexdigest()
+    return f"food_info:{digest}"
+
+
+def food_version_key(food_id):
+    return f"food_info_version:{food_id}"
+
+
+def _cached(key):
+    """캐시 값 -> (찾음 여부, 데이터), 음식 버전이 바뀐 값은 없는 것으로 처리"""
+    entry = cache.get(key)
+    if entry is None:
+        return False, None
+    if entry == NOT_FOUND:
+        return True, None
+    if shared_cache().get(food_version_key(entry["food_id"])) != entry["version"]:
+        return False, None
+    return True, entry["data"]
+
+
+def get_food_info(query, loader):
+    """캐시된 음식 정보 반환. 없으면 loader(query) -> (food_id, 데이터) 또는 None 으로 채움
+
+    loader 가 예외를 던지면(외부 API 장애 등) 캐싱하지 않고 그대로 전파
+    """
+    key = food_info_key(query)
+    found, data = _cached(key)
+    if found:
+        return data
+
+    with _inflight_lock:
+        event = _inflight.get(key)
+        leader = event is None
+        if leader:
+            event = _inflight[key] = threading.Event()
+
+    if not leader:
+        # 같은 프로세스의 다른 요청이 조회 중이면 끝날 때까지 대기 (실패했으면 직접 조회)
+        event.wait(LOCK_TTL)
+        found, data = _cached(key)
+        if found:
+            return data
+        return _load(key, query, loader)
+
+    try:
+        return _load(key, query, loader)
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        event.set()
+
+
+def _load(key, query, loader):
+    """프로세스 간 락을 잡고 조회 (다른 프로세스가 조회 중이면 결과를 기다림)"""
+    locks = shared_cache()
+    lock_key = f"{key}:lock"
+    token = uuid.uuid4().hex
+    if not locks.add(lock_key, token, LOCK_TTL):
+        if _wait_for_fill(key, lock_key):
+            return _cached(key)[1]
+        token = None  # 락이 만료/해제됐지만 결과가 없으면 락 없이 조회
+
+    try:
+        return _fill(key, query, loader)
+    finally:
+        if token and locks.get(lock_key) == token:
+            locks.delete(lock_key)
+
+
+def _wait_for_fill(key, lock_key):
+    """다른 프로세스가 조회 중이면 결과가 채워지거나 락이 풀릴 때까지 대기 -> 결과가 채워졌는지"""
+    deadline = time.monotonic() + LOCK_TTL
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_WAIT_INTERVAL)
+        if _cached(key)[0]:
+            return True
+        if shared_cache().get(lock_key) is None:
+            return _cached(key)[0]
+    return False
+
+
+def _fill(key, query, loader):
+    # 조회 결과의 음식 id 는 조회 후에야 알 수 있으므로 조회 전의 버전 순번을 읽어 둠
+    started = shared_cache().get(VERSION_SEQUENCE_KEY, 0)
+    result = loader(query)
+    if result is None:
+        cache.set(key, NOT_FOUND, NOT_FOUND_TTL)
+        return None
+
+    food_id, data = result
+    version = shared_cache().get(food_version_key(food_id))
+    if version is not None and version > started:
+        return data  # 조회 중에 음식이 바뀌었으면 이전 값일 수 있으므로 캐싱하지 않음
+    cache.set(key, {"food_id": food_id, "version": version, "data": data}, FOOD_INFO_TTL)
+    return data
+
+
+def invalidate_food(food_id):
+    """음식이 바뀌면 버전을 새 순번으로 바꿔 그 음식을 결과로 캐싱한 검색어 값들을 무효화"""
+    versions = shared_cache()
+    versions.add(VERSION_SEQUENCE_KEY, 0, None)
+    # 버전이 값보다 먼저 만료되지 않도록 값과 같은 TTL 사용 (이전 버전 값은 그 전에 만료)
+    versions.set(food_version_key(food_id), versions.incr(VERSION_SEQUENCE_KEY), FOOD_INFO_TTL)
@@ -0,0 +1,188 @@
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from food.models import Food
+
+# 음식 영양소 컬럼 테이블 (gunicorn 워커들이 같은 파일을 읽기 전용 mmap 으로 공유)
+# - <NUTRIENT_TABLE_DIR>/<버전>/<컬럼>.npy + meta.json, CURRENT 파일이 현재 버전 디렉터리 이름을 가리킴
+# - 새 버전을 다 쓴 뒤 CURRENT 를 os.replace 로 바꾸므로 읽는 쪽은 항상 완성된 버전만 봄
+# - 페이지 캐시를 워커끼리 공유하므로 워커 수가 늘어도 메모리가 늘지 않음 (필터 결과만 요청별로 복사)
+
+COLUMNS = {
+    "id": np.int64,
+    "calories": np.float32,
+    "protein": np.float32,
+    "carbs": np.float32,
+    "fat": np.float32,
+    "allergen_mask": np.int64,
+}
+NUTRIENT_COLUMNS = ["calories", "protein", "carbs", "fat"]
+CURRENT_FILE = "CURRENT"
+KEEP_VERSIONS = 2  # 이전 버전을 mmap 중인 워커가 있을 수 있으므로 바로 지우지 않음
+CHECK_INTERVAL = 5  # 워커가 CURRENT 변경을 확인하는 주기(초)
+BATCH_SIZE = 50_000
+# 조회 시작보다 먼저 updated_at 이 정해졌지만 조회 후에 커밋된 행(긴 임포트 배치 등)을 다음 증분 갱신에서
+# 다시 읽도록 watermark 를 이만큼 앞당김 (이보다 오래 열린 트랜잭션의 변경은 전체 재생성으로 반영)
+WATERMARK_MARGIN = timedelta(minutes=10)
+
+
+class NutrientTable:
+    """읽기 전용 컬럼 배열 묶음 (id 오름차순 정렬)"""
+
+    def __init__(self, version, columns, meta):
+        self.version = version
+        self.columns = columns
+        self.meta = meta
+
+    def __len__(self):
+        return len(self.columns["id"])
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__["columns"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    @property
+    def watermark(self):
+        return parse_datetime(self.meta["watermark"]) if self.meta.get("watermark") else None
+
+    def safe_mask(self, allergy_mask):
+        """알레르기 성분이 없는 행의 불리언 마스크 (벡터 연산)"""
+        if not allergy_mask:
+            return np.ones(len(self), dtype=bool)
+        return (self.allergen_mask & allergy_mask) == 0
+
+    def candidates(self, allergy_mask=0):
+        """알레르기 조건을 만족하고 열량이 있는 음식 -> (id 배열, 영양소 행렬 n x 4)"""
+        mask = self.safe_mask(allergy_mask) & (self.calories > 0)
+        nutrients = np.column_stack([self.columns[name][mask] for name in NUTRIENT_COLUMNS]).astype(np.float64)
+        return self.id[mask], nutrients
+
+
+def table_dir():
+    return settings.NUTRIENT_TABLE_DIR
+
+
+def _read_current(root):
+    try:
+        with open(os.path.join(root, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def load_table(root=None):
+    """현재 버전을 mmap 으로 열기 (아직 만들지 않았으면 None)"""
+    root = root or table_dir()
+    version = _read_current(root)
+    if version is None:
+        return None
+    path = os.path.join(root, version)
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in COLUMNS}
+    return NutrientTable(version, columns, meta)
+
+
+_table = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_nutrient_table():
+    """프로세스별로 연 테이블 반환, CHECK_INTERVAL 마다 새 버전이 있으면 다시 연다 (없으면 None)"""
+    global _table, _checked_at
+    now = time.monotonic()
+    if now - _checked_at < CHECK_INTERVAL:
+        return _table
+    with _lock:
+        if now - _checked_at >= CHECK_INTERVAL:
+            version = _read_current(table_dir())
+            if version is None:
+                _table = None
+            elif _table is None or _table.version != version:
+                _table = load_table()
+            _checked_at = now
+    return _table
+
+
+def _fetch_columns(queryset):
+    """queryset 의 행을 컬럼 배열로 (id 순서대로 배치 조회, 모델 인스턴스를 만들지 않음)"""
+    chunks = {name: [] for name in COLUMNS}
+    last_id = 0
+    while True:
+        rows = list(queryset.filter(id__gt=last_id).order_by("id").values_list(*COLUMNS)[:BATCH_SIZE])
+        if not rows:
+            break
+        for name, values in zip(COLUMNS, zip(*rows)):
+            chunks[name].append(np.array(values, dtype=COLUMNS[name]))
+        last_id = rows[-1][0]
+    return {
+        name: np.concatenate(parts) if parts else np.empty(0, dtype=COLUMNS[name])
+        for name, parts in chunks.items()
+    }
+
+
+def _merge(current, changed, existing_ids):
+    """현재 테이블에 변경 행을 덮어쓰고, DB 에서 삭제된 행을 뺀 새 컬럼 (id 정렬 유지)"""
+    keep = np.isin(current["id"], changed["id"], invert=True) & np.isin(current["id"], existing_ids)
+    merged = {name: np.concatenate([np.asarray(current[name])[keep], changed[name]]) for name in COLUMNS}
+    order = np.argsort(merged["id"], kind="stable")
+    return {name: values[order] for name, values in merged.items()}
+
+
+def build_table(root=None, full=False):
+    """컬럼 테이블 생성/갱신 후 새 버전 이름 반환
+
+    이전 버전이 있으면 updated_at 이 watermark 이후인 행만 읽어 합침 (삭제된 행은 id 목록으로 정리)
+    """
+    root = root or table_dir()
+    os.makedirs(root, exist_ok=True)
+    current = None if full else load_table(root)
+    started_at = timezone.now()  # 조회 중 바뀐 행은 다음 갱신에서 다시 읽도록 시작 시각 기준으로 watermark 계산
+
+    if current is None or current.watermark is None:
+        columns = _fetch_columns(Food.objects.all())
+        mode = "full"
+    else:
+        changed = _fetch_columns(Food.objects.filter(updated_at__gte=current.watermark))
+        existing_ids = np.fromiter(Food.objects.values_list("id", flat=True).iterator(), dtype=np.int64)
+        columns = _merge(current.columns, changed, existing_ids)
+        mode = "incremental"
+
+    version = f"{started_at:%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}"
+    path = os.path.join(root, version)
+    os.makedirs(path)
+    for name, values in columns.items():
+        np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(values, dtype=COLUMNS[name]))
+    meta = {"watermark": (started_at - WATERMARK_MARGIN).isoformat(), "rows": int(len(columns["id"])), "mode": mode}
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+    tmp_path = os.path.join(root, f"{CURRENT_FILE}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_path, "w") as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(root, CURRENT_FILE))
+
+    _prune(root, keep=version)
+    return version, meta
+
+
+def _prune(root, keep):
+    """가장 최근 KEEP_VERSIONS 개만 남기고 이전 버전 디렉터리 삭제 (열려 있는 mmap 은 리눅스에서 계속 유효)"""
+    versions = sorted(
+        name for name in os.listdir(root) if os.path.isdir(os.path.join(root, name)) and name != keep
+    )
+    for name in versions[:max(0, len(versions) - (KEEP_VERSIONS - 1))]:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
@@ -0,0 +1,48 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from food.allergens import DEFAULT_ALLERGEN_TAXONOMY, PRODUCT_TAG_FIELDS, get_classifier
+
+FILLER_TAGS = [f"en:ingredient-{n}" for n in range(500)]
+ALLERGEN_TAGS = [tag for entry in DEFAULT_ALLERGEN_TAXONOMY.values() for tag in entry["tags"]]
+
+
+def legacy_flags(product):
+    """기존 방식: 태그 3개 x 태그 목록 4개를 각각 선형 탐색"""
+    return {
+        tag: any(tag in product.get(field, []) for field in PRODUCT_TAG_FIELDS)
+        for tag in ("en:nuts", "en:gluten", "en:dairy")
+    }
+
+
+class Command(BaseCommand):
+    help = "알레르기 분류기 마이크로 벤치마크 (기존 태그 목록 선형 탐색 vs 컴파일된 분류기)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=100_000)
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        products = [
+            {
+                field: rng.sample(FILLER_TAGS, rng.randint(0, 25)) + rng.sample(ALLERGEN_TAGS, rng.randint(0, 2))
+                for field in PRODUCT_TAG_FIELDS
+            }
+            for _ in range(options["products"])
+        ]
+        classifier = get_classifier()
+
+        report = {"products": len(products), "allergens": len(classifier.bits)}
+        for name, func in (("legacy_3_allergens", legacy_flags), ("classifier_all_allergens", classifier.classify)):
+            started = time.perf_counter()
+            for product in products:
+                func(product)
+            elapsed = time.perf_counter() - started
+            report[name] = {"total_ms": round(elapsed * 1000, 2), "ns_per_product": round(elapsed / len(products) * 1e9)}
+            self.stdout.write(f"{name:<26} {report[name]['total_ms']:>10}ms  {report[name]['ns_per_product']:>6}ns/product")
+
+        self.stdout.write(json.dumps(report))
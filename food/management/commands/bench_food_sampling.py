@@ -0,0 +1,87 @@
+import json
+import random
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from common.benchmark import benchmark_database, measure, summarize
+from food.allergens import get_classifier
+from food.models import Food
+from food.sampling import sample_foods
+
+
+class Command(BaseCommand):
+    help = "식단용 무작위 음식 샘플링(sample_foods) 지연시간/메모리 벤치마크 (테스트 DB에 합성 데이터를 채워 측정)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000], help="Food 행 수 목록")
+        parser.add_argument("--iterations", type=int, default=200, help="크기별 샘플링 횟수")
+        parser.add_argument("--count", type=int, default=9, help="한 번에 뽑을 음식 수 (식단 3개 x 3개)")
+        parser.add_argument("--allergy", default="유제품", help="샘플링 대상에서 제외할 알레르기 (safe_for 필터)")
+        parser.add_argument("--naive", action="store_true", help="기존 방식(전체 목록 로드 후 random.sample)도 1회 측정")
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        profile = type("Profile", (), {"allergies": [options["allergy"]], "preferences": []})()
+        count = options["count"]
+        report = {"vendor": connection.vendor, "count": count, "results": []}
+
+        with benchmark_database():
+            seeded = 0
+            for size in sorted(options["sizes"]):
+                seeded = self.seed_foods(rng, seeded, size)
+                queryset = Food.objects.safe_for(profile)
+
+                with CaptureQueriesContext(connection) as queries:
+                    sample_foods(queryset, count, rng=rng)
+                samples = measure(lambda i: sample_foods(queryset, count, rng=rng), options["iterations"])
+                result = {
+                    "foods": size,
+                    "queries": len(queries),
+                    "peak_kb": self.peak_memory(lambda: sample_foods(queryset, count, rng=rng)),
+                    **summarize(samples),
+                }
+
+                if options["naive"]:
+                    started = time.perf_counter()
+                    result["naive_peak_kb"] = self.peak_memory(lambda: rng.sample(list(queryset), count))
+                    result["naive_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+                report["results"].append(result)
+                self.stdout.write(
+                    f"foods={size:>9,}  p50={result['p50_ms']}ms  p99={result['p99_ms']}ms  "
+                    f"queries={result['queries']}  peak={result['peak_kb']}KB"
+                )
+
+        self.stdout.write(json.dumps(report, ensure_ascii=False))
+
+    def peak_memory(self, func):
+        """func 1회 실행 중 파이썬 힙 최대 사용량(KB)"""
+        tracemalloc.start()
+        try:
+            func()
+            return round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        finally:
+            tracemalloc.stop()
+
+    def seed_foods(self, rng, start, stop, batch_size=5000):
+        """start 번째부터 stop 번째까지 합성 음식을 배치 단위로 저장 (약 30% 는 알레르기 성분 포함)"""
+        bits = list(get_classifier().bits.values())
+        for batch_start in range(start, stop, batch_size):
+            Food.objects.bulk_create([
+                Food(
+                    external_id=f"bench-{n}",
+                    name=f"음식 {n}",
+                    calories=rng.uniform(0, 600),
+                    protein=rng.uniform(0, 40),
+                    carbs=rng.uniform(0, 80),
+                    fat=rng.uniform(0, 40),
+                    allergen_mask=rng.choice(bits) if rng.random() < 0.3 else 0,
+                )
+                for n in range(batch_start, min(batch_start + batch_size, stop))
+            ])
+        return stop
@@ -0,0 +1,66 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from common.benchmark import benchmark_database, measure, summarize
+from food.models import Food
+from food.search import search_foods
+
+WORDS = [
+    "organic", "banana", "apple", "greek", "yogurt", "chicken", "breast", "brown", "rice", "oat", "milk",
+    "almond", "peanut", "butter", "whole", "wheat", "bread", "tofu", "salmon", "tuna", "spinach", "kimchi",
+    "cheddar", "cheese", "granola", "honey", "dark", "chocolate", "protein", "bar", "low", "salt", "soup",
+    "tomato", "pasta", "sweet", "potato", "vegan", "burger", "coconut", "water", "mango", "juice", "seaweed",
+]
+
+
+class Command(BaseCommand):
+    help = "음식 검색(search_foods) 지연시간 벤치마크 (테스트 DB에 합성 데이터를 채워 측정)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000], help="Food 행 수 목록")
+        parser.add_argument("--iterations", type=int, default=200, help="크기별 검색 횟수")
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        report = {"vendor": connection.vendor, "results": []}
+
+        with benchmark_database():
+            seeded = 0
+            for size in sorted(options["sizes"]):
+                seeded = self.seed_foods(rng, seeded, size)
+                queries = [" ".join(rng.sample(WORDS, rng.choice([1, 2]))) for _ in range(options["iterations"])]
+
+                # 첫 호출은 (n-gram 폴백일 때) 색인 생성 비용이 포함되므로 따로 기록
+                started = time.perf_counter()
+                search_foods(queries[0])
+                warmup = time.perf_counter() - started
+
+                samples = measure(lambda i: search_foods(queries[i]), len(queries))
+                result = {"foods": size, "warmup_ms": round(warmup * 1000, 3), **summarize(samples)}
+                report["results"].append(result)
+                self.stdout.write(
+                    f"foods={size:>9,}  p50={result['p50_ms']}ms  p95={result['p95_ms']}ms  p99={result['p99_ms']}ms"
+                )
+
+        self.stdout.write(json.dumps(report, ensure_ascii=False))
+
+    def seed_foods(self, rng, start, stop, batch_size=5000):
+        """start 번째부터 stop 번째까지 합성 음식을 배치 단위로 저장"""
+        for batch_start in range(start, stop, batch_size):
+            Food.objects.bulk_create([
+                Food(
+                    external_id=f"bench-{n}",
+                    name=" ".join(rng.sample(WORDS, rng.randint(2, 4))),
+                    calories=rng.uniform(0, 600),
+                    protein=rng.uniform(0, 40),
+                    carbs=rng.uniform(0, 80),
+                    fat=rng.uniform(0, 40),
+                )
+                for n in range(batch_start, min(batch_start + batch_size, stop))
+            ])
+        return stop
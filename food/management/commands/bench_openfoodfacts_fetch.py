@@ -0,0 +1,38 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from common.benchmark import measure, summarize
+from common.stub_server import StubServer
+from food.openfoodfacts import SEARCH_PATH, fetch_products
+from food.stubs import openfoodfacts_search_handler
+
+
+class Command(BaseCommand):
+    help = "OpenFoodFacts 페이지 수집 벤치마크: 순차 수집 vs 동시 수집(시간 예산) - 로컬 스텁 서버 대상"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--latency", type=float, default=0.3, help="스텁 서버의 페이지당 응답 지연(초)")
+        parser.add_argument("--products", type=int, default=1500, help="스텁 검색 결과 전체 제품 수")
+        parser.add_argument("--budget", type=float, default=2.0, help="동시 수집의 전체 시간 예산(초)")
+        parser.add_argument("--iterations", type=int, default=5)
+
+    def handle(self, *args, **options):
+        routes = {SEARCH_PATH: openfoodfacts_search_handler(options["products"])}
+        report = {"latency_s": options["latency"], "budget_s": options["budget"], "results": {}}
+
+        with StubServer(routes, latency=options["latency"]) as stub, \
+                override_settings(OPENFOODFACTS_BASE_URL=stub.url):
+            modes = {
+                "sequential": {"max_workers": 1, "budget": None},  # 기존 방식 (페이지 하나씩, 예산 없음)
+                "concurrent": {"budget": options["budget"]},
+            }
+            for mode, kwargs in modes.items():
+                counts = []
+                samples = measure(lambda i: counts.append(len(fetch_products("bench", **kwargs))), options["iterations"])
+                report["results"][mode] = {**summarize(samples), "products": min(counts)}
+                result = report["results"][mode]
+                self.stdout.write(f"{mode:<11} p50={result['p50_ms']}ms  p95={result['p95_ms']}ms  products={result['products']}")
+
+        self.stdout.write(json.dumps(report))
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from food.columnar import build_table, table_dir
+
+
+class Command(BaseCommand):
+    help = "음식 영양소 컬럼 테이블(mmap 공유용 .npy) 생성 - 기본은 updated_at 기준 증분 갱신"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="이전 버전을 무시하고 전체 다시 생성")
+        parser.add_argument("--dir", help="출력 디렉터리 (기본 settings.NUTRIENT_TABLE_DIR)")
+
+    def handle(self, *args, **options):
+        root = options["dir"] or table_dir()
+        started = time.perf_counter()
+        version, meta = build_table(root, full=options["full"])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {meta['mode']} 갱신 완료: {root}/{version} ({meta['rows']:,}행, {elapsed:.2f}초)"
+        ))
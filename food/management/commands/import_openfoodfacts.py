@@ -0,0 +1,147 @@
+import csv
+import gzip
+import json
+import os
+import sys
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from food.models import Food
+from food.openfoodfacts import FOOD_DATA_FIELDS, is_valid_product, product_to_food_data
+
+# CSV 덤프(탭 구분)의 영양 정보 컬럼 -> API 응답의 nutriments 키
+CSV_NUTRIMENT_COLUMNS = {
+    "energy-kcal_100g": "energy-kcal",
+    "proteins_100g": "proteins",
+    "carbohydrates_100g": "carbohydrates",
+    "fat_100g": "fat",
+}
+CSV_TAG_COLUMNS = ["categories_tags", "ingredients_tags", "allergens_tags", "traces_tags", "labels_tags"]
+
+
+def open_dump(path):
+    """.gz 여부에 따라 텍스트 스트림으로 열기 (전체를 메모리에 올리지 않음)"""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+
+def detect_format(path):
+    name = path[:-3] if path.endswith(".gz") else path
+    if name.endswith((".jsonl", ".json", ".ndjson")):
+        return "jsonl"
+    if name.endswith((".csv", ".tsv")):
+        return "csv"
+    raise CommandError("덤프 형식을 알 수 없습니다. --format 옵션으로 jsonl/csv 를 지정하세요.")
+
+
+def read_jsonl(stream):
+    for line in stream:
+        line = line.strip()
+        if not line:
+            yield None  # 레코드 번호(체크포인트)를 맞추기 위해 빈 줄도 한 레코드로 셈
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            yield None
+
+
+def read_csv(stream):
+    csv.field_size_limit(sys.maxsize)
+    for row in csv.DictReader(stream, delimiter="\t"):
+        product = {
+            "code": row.get("code"),
+            "product_name": row.get("product_name"),
+            "nutriments": {
+                key: row[column] for column, key in CSV_NUTRIMENT_COLUMNS.items() if row.get(column)
+            },
+        }
+        for column in CSV_TAG_COLUMNS:
+            value = row.get(column) or ""
+            product[column] = [tag for tag in value.split(",") if tag]
+        yield product
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = "OpenFoodFacts 덤프(JSONL/CSV, gzip 가능)를 스트리밍으로 읽어 Food 테이블에 일괄 upsert"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="덤프 파일 경로 (.jsonl, .jsonl.gz, .csv, .csv.gz)")
+        parser.add_argument("--format", choices=["jsonl", "csv"], help="덤프 형식 (기본값: 확장자로 판단)")
+        parser.add_argument("--batch-size", type=int, default=2000, help="한 번에 upsert 할 제품 수")
+        parser.add_argument("--checkpoint", help="체크포인트 파일 경로 (기본값: <path>.checkpoint)")
+        parser.add_argument("--restart", action="store_true", help="체크포인트를 무시하고 처음부터 임포트")
+        parser.add_argument("--limit", type=int, help="읽을 최대 레코드 수 (테스트용)")
+
+    def handle(self, *args, **options):
+        path = os.path.abspath(options["path"])
+        if not os.path.exists(path):
+            raise CommandError(f"덤프 파일이 없습니다: {path}")
+
+        dump_format = options["format"] or detect_format(path)
+        checkpoint_path = options["checkpoint"] or f"{path}.checkpoint"
+        source = {"path": path, "size": os.path.getsize(path)}
+
+        skip = 0 if options["restart"] else self.load_checkpoint(checkpoint_path, source)
+        if skip:
+            self.stdout.write(f"체크포인트에서 재개: {skip:,}개 레코드 건너뜀")
+
+        processed, upserted = skip, 0
+        with open_dump(path) as stream:
+            records = read_jsonl(stream) if dump_format == "jsonl" else read_csv(stream)
+            # --limit 은 이번 실행에서 읽을 레코드 수 (체크포인트에서 재개해도 skip 이후부터 셈)
+            stop = None if options["limit"] is None else skip + options["limit"]
+            records = islice(records, skip, stop)
+
+            for batch in batched(records, options["batch_size"]):
+                upserted += self.upsert(batch)
+                processed += len(batch)
+                self.save_checkpoint(checkpoint_path, source, processed)
+                self.stdout.write(f"레코드 {processed:,}개 처리 / 음식 {upserted:,}개 저장")
+
+        self.stdout.write(self.style.SUCCESS(f"임포트 완료: 레코드 {processed:,}개, 음식 {upserted:,}개 upsert"))
+
+    def upsert(self, batch):
+        """배치 내 유효한 제품을 external_id 기준으로 중복 제거 후 한 번의 INSERT ... ON CONFLICT 로 저장"""
+        foods = {}
+        for product in batch:
+            if product and is_valid_product(product):
+                food_data = product_to_food_data(product)
+                foods[food_data["external_id"]] = food_data  # 같은 배치 안의 중복은 마지막 값 사용
+
+        if not foods:
+            return 0
+
+        # updated_at(auto_now)도 함께 갱신해야 증분 작업들이 변경을 감지할 수 있음
+        Food.objects.bulk_create(
+            [Food(**food_data) for food_data in foods.values()],
+            update_conflicts=True,
+            unique_fields=["external_id"],
+            update_fields=FOOD_DATA_FIELDS + ["updated_at"],
+        )
+        return len(foods)
+
+    def load_checkpoint(self, checkpoint_path, source):
+        if not os.path.exists(checkpoint_path):
+            return 0
+        with open(checkpoint_path, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("source") != source:
+            self.stdout.write(self.style.WARNING("덤프 파일이 바뀌어 체크포인트를 무시하고 처음부터 임포트합니다."))
+            return 0
+        return checkpoint.get("records", 0)
+
+    def save_checkpoint(self, checkpoint_path, source, records):
+        # 임시 파일에 쓴 뒤 교체하여 중단되더라도 깨진 체크포인트가 남지 않게 함
+        tmp_path = f"{checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"source": source, "records": records}, f)
+        os.replace(tmp_path, checkpoint_path)
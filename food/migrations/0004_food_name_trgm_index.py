@@ -0,0 +1,29 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+def create_name_trgm_index(apps, schema_editor):
+    # GIN + gin_trgm_ops 인덱스는 PostgreSQL 에서만 생성 (SQLite 테스트 DB 는 파이썬 n-gram 색인 사용)
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS food_name_trgm_idx ON food_food USING gin (name gin_trgm_ops)"
+    )
+
+
+def drop_name_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS food_name_trgm_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('food', '0003_food_date'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_name_trgm_index, drop_name_trgm_index),
+    ]
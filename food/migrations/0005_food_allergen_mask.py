@@ -0,0 +1,95 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:05
+
+from django.db import migrations, models
+
+JSON_TAG_FIELDS = ["tags", "labels", "categories"]
+
+# 이 마이그레이션 시점의 알레르기 분류 체계 (순서 = 비트 순서)
+# food.allergens 가 나중에 바뀌어도 이 마이그레이션의 결과가 달라지지 않도록 앱 코드를 가져오지 않고 고정
+ALLERGEN_TAGS = [
+    ("nuts", [
+        "en:nuts", "en:almonds", "en:hazelnuts", "en:walnuts", "en:cashew-nuts", "en:pecan-nuts",
+        "en:brazil-nuts", "en:pistachio-nuts", "en:macadamia-nuts", "en:queensland-nuts",
+    ]),
+    ("gluten", [
+        "en:gluten", "en:wheat", "en:barley", "en:rye", "en:oats", "en:spelt", "en:kamut",
+        "en:wheat-flour", "en:durum-wheat",
+    ]),
+    ("milk", [
+        "en:dairy", "en:dairies", "en:milk", "en:lactose", "en:butter", "en:cheese", "en:cream",
+        "en:whey", "en:milk-powder", "en:skimmed-milk", "en:yogurts",
+    ]),
+    ("peanuts", ["en:peanuts", "en:peanut"]),
+    ("eggs", ["en:eggs", "en:egg", "en:egg-yolk", "en:egg-white"]),
+    ("soybeans", ["en:soybeans", "en:soy", "en:soya", "en:soy-lecithin"]),
+    ("fish", ["en:fish", "en:fishes", "en:tuna", "en:salmon", "en:anchovy"]),
+    ("crustaceans", ["en:crustaceans", "en:shrimp", "en:prawn", "en:crab", "en:lobster"]),
+    ("molluscs", ["en:molluscs", "en:squid", "en:octopus", "en:mussels", "en:oysters"]),
+    ("sesame-seeds", ["en:sesame-seeds", "en:sesame", "en:sesame-oil"]),
+    ("celery", ["en:celery"]),
+    ("mustard", ["en:mustard"]),
+    ("lupin", ["en:lupin"]),
+    ("sulphur-dioxide-and-sulphites", ["en:sulphur-dioxide-and-sulphites", "en:sulphites", "en:sulfites"]),
+]
+
+
+def backfill_allergen_mask(apps, schema_editor):
+    # 저장된 성분/카테고리 태그와 기존 contains_* 플래그로 알레르기 마스크 계산
+    Food = apps.get_model("food", "Food")
+    bits = {key: 1 << position for position, (key, _) in enumerate(ALLERGEN_TAGS)}
+    tag_bits = {}
+    for key, tags in ALLERGEN_TAGS:
+        for tag in tags:
+            tag_bits[tag] = tag_bits.get(tag, 0) | bits[key]
+    flag_bits = {"contains_nuts": bits["nuts"], "contains_gluten": bits["gluten"], "contains_dairy": bits["milk"]}
+
+    batch = []
+    for food in Food.objects.only("id", "tags", "categories", *flag_bits).iterator(chunk_size=2000):
+        mask = 0
+        for tag in set(food.tags or ()) | set(food.categories or ()):
+            mask |= tag_bits.get(tag, 0)
+        for flag, bit in flag_bits.items():
+            if getattr(food, flag):
+                mask |= bit
+        if mask:
+            food.allergen_mask = mask
+            batch.append(food)
+        if len(batch) >= 2000:
+            Food.objects.bulk_update(batch, ["allergen_mask"])
+            batch = []
+    if batch:
+        Food.objects.bulk_update(batch, ["allergen_mask"])
+
+
+def create_tag_gin_indexes(apps, schema_editor):
+    # jsonb @> 검색용 GIN 인덱스는 PostgreSQL 에서만 생성
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for field in JSON_TAG_FIELDS:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS food_{field}_gin_idx ON food_food USING gin ({field} jsonb_path_ops)"
+        )
+
+
+def drop_tag_gin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for field in JSON_TAG_FIELDS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS food_{field}_gin_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('food', '0004_food_name_trgm_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='food',
+            name='allergen_mask',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_allergen_mask, migrations.RunPython.noop),
+        migrations.RunPython(create_tag_gin_indexes, drop_tag_gin_indexes),
+    ]
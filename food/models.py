@@ -1,5 +1,51 @@
-from django.db import models
+from django.db import connections, models
+from django.db.models import F, Q
 from common.models import CommonModel
+from food.allergens import get_classifier
+
+# 프로필 음식 선호도 -> OpenFoodFacts 라벨 태그
+PREFERENCE_LABELS = {
+    "비건": ["en:vegan"],
+    "채식": ["en:vegetarian", "en:vegan"],
+    "저염식": ["en:low-salt", "en:no-added-salt", "en:low-or-no-salt"],
+    "고단백": ["en:high-proteins", "en:source-of-proteins"],
+}
+
+
+class FoodQuerySet(models.QuerySet):
+    def safe_for(self, profile):
+        """프로필의 알레르기 성분이 하나도 없는 음식만 (allergen_mask & 알레르기 마스크 = 0)"""
+        mask = get_classifier().mask_for(profile.allergies)
+        if not mask:
+            return self
+        return self.alias(allergen_hits=F("allergen_mask").bitand(mask)).filter(allergen_hits=0)
+
+    def _tag_condition(self, field, tag):
+        if connections[self.db].features.supports_json_field_contains:
+            # PostgreSQL: jsonb @> 연산자 (GIN jsonb_path_ops 인덱스 사용)
+            return Q(**{f"{field}__contains": [tag]})
+        # SQLite 등: JSON 문자열에서 따옴표로 감싼 태그를 검색 (테스트용 폴백)
+        return Q(**{f"{field}__icontains": f'"{tag}"'})
+
+    def with_tags(self, *tags, field="tags"):
+        """tags 를 모두 가진 음식 (field: tags, labels, categories)"""
+        condition = Q()
+        for tag in tags:
+            condition &= self._tag_condition(field, tag)
+        return self.filter(condition)
+
+    def with_any_tags(self, *tags, field="tags"):
+        """tags 중 하나라도 가진 음식"""
+        condition = Q()
+        for tag in tags:
+            condition |= self._tag_condition(field, tag)
+        return self.filter(condition) if tags else self
+
+    def matching_preferences(self, profile):
+        """프로필 음식 선호도에 해당하는 라벨이 하나라도 있는 음식"""
+        labels = [label for preference in profile.preferences or [] for label in PREFERENCE_LABELS.get(preference, [])]
+        return self.with_any_tags(*labels, field="labels")
+
 
 class Food(CommonModel):
     external_id = models.CharField(max_length=255, unique=True)  # 외부 API의 id를 이 필드에 저장
@@ -11,10 +57,13 @@ class Food(CommonModel):
     contains_nuts = models.BooleanField(default=False)
     contains_gluten = models.BooleanField(default=False)
     contains_dairy = models.BooleanField(default=False)
+    # food.allergens 분류기의 알레르기 비트마스크 (allergen_mask & x = 0 조건은 B-tree 인덱스를 쓸 수 없어 인덱스 없음)
+    allergen_mask = models.BigIntegerField(default=0)
     tags = models.JSONField(default=list, blank=True, null=True)
     labels = models.JSONField(default=list, blank=True, null=True)
     categories = models.JSONField(default=list, blank=True, null=True)
 
+    objects = FoodQuerySet.as_manager()
 
     def __str__(self):
-        return self.name  # 음식 이름이 출력되도록 설정
\ No newline at end of file
+        return self.name  # 음식 이름이 출력되도록 설정
@@ -0,0 +1,134 @@
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlencode
+
+import requests
+from django.conf import settings
+
+from common.http import http_client
+from food.allergens import get_classifier
+
+# OpenFoodFacts 검색 API 호출 및 제품 데이터 -> Food 모델 데이터 변환 (뷰, 일괄 임포트 명령어 공용)
+
+SEARCH_PATH = "/cgi/search.pl"
+PAGE_SIZE = 150
+PAGE_TIMEOUT = 10  # 페이지 1건당 최대 대기 시간(초)
+MAX_WORKERS = 4  # 동시에 가져올 페이지 수
+
+# 변환에 실제로 쓰는 필드만 요청 (응답 크기 축소)
+PRODUCT_FIELDS = [
+    "code", "product_name", "nutriments",
+    "ingredients_tags", "categories_tags", "allergens_tags", "traces_tags", "labels_tags",
+]
+
+# 제품 정보로 갱신되는 Food 필드 (external_id 충돌 시 upsert 대상)
+FOOD_DATA_FIELDS = [
+    "name", "calories", "protein", "carbs", "fat",
+    "contains_nuts", "contains_gluten", "contains_dairy", "allergen_mask",
+    "categories", "tags", "labels",
+]
+
+
+def to_float(value, default=0.0):
+    """영양 정보 값은 문자열/빈 값으로 오는 경우가 있어 안전하게 float 변환"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def is_valid_product(product):
+    """영양 정보와 이름이 있는 제품만 저장 대상"""
+    return bool(product.get("code")) and "nutriments" in product and bool(product.get("product_name"))
+
+
+def product_to_food_data(product, default_name=None):
+    """OpenFoodFacts 제품(dict)을 Food 모델 필드 구조로 변환"""
+    nutriments = product.get("nutriments") or {}
+    classifier = get_classifier()
+    allergen_mask = classifier.classify(product)
+    return {
+        "external_id": product.get("code"),
+        "name": product.get("product_name") or default_name,
+        "calories": to_float(nutriments.get("energy-kcal")),
+        "protein": to_float(nutriments.get("proteins")),
+        "carbs": to_float(nutriments.get("carbohydrates")),
+        "fat": to_float(nutriments.get("fat")),
+        "contains_nuts": classifier.contains(allergen_mask, "nuts"),
+        "contains_gluten": classifier.contains(allergen_mask, "gluten"),
+        "contains_dairy": classifier.contains(allergen_mask, "milk"),
+        "allergen_mask": allergen_mask,
+        "categories": product.get("categories_tags", []),  # 카테고리 태그
+        "tags": product.get("ingredients_tags", []),  # 성분 태그
+        "labels": product.get("labels_tags", []),  # 라벨 데이터
+    }
+
+
+def search_url(query, page=1, page_size=PAGE_SIZE):
+    params = {
+        "search_terms": query,
+        "search_simple": 1,
+        "action": "process",
+        "json": 1,
+        "page_size": page_size,
+        "page": page,
+        "fields": ",".join(PRODUCT_FIELDS),
+    }
+    return f"{settings.OPENFOODFACTS_BASE_URL}{SEARCH_PATH}?{urlencode(params)}"
+
+
+def fetch_page(query, page, page_size=PAGE_SIZE, timeout=PAGE_TIMEOUT):
+    # 전체 시간 예산 안에서 움직이므로 페이지 단위 재시도는 하지 않음 (부분 결과 사용)
+    response = http_client.get(search_url(query, page, page_size), timeout=timeout, retries=0)
+    response.raise_for_status()
+    return response.json()
+
+
+def fetch_products(query, max_products=500, max_pages=10, page_size=PAGE_SIZE, budget=None, max_workers=MAX_WORKERS):
+    """검색 결과 페이지들을 동시에 가져와 유효한 제품 목록 반환
+
+    budget(초) 안에 끝나지 않은 페이지는 버리고 그때까지 받은 페이지만 사용 (None 이면 제한 없음)
+    """
+    deadline = time.monotonic() + budget if budget is not None else None
+
+    def fetch_before_deadline(page):
+        # 큐에서 대기하다 실행되는 페이지도 남은 시간만큼만 기다리도록 실행 시점에 타임아웃 계산
+        timeout = PAGE_TIMEOUT
+        if deadline is not None:
+            timeout = min(PAGE_TIMEOUT, deadline - time.monotonic())
+            if timeout <= 0:
+                raise requests.exceptions.Timeout("시간 예산 초과")
+        return fetch_page(query, page, page_size, timeout=timeout)
+
+    # 1페이지에서 전체 결과 수(count)를 확인해 실제로 필요한 페이지만 요청
+    try:
+        first_page = fetch_before_deadline(1)
+    except requests.exceptions.RequestException:
+        return []
+
+    pages = {1: first_page.get("products", [])}
+    total_pages = min(
+        max_pages,
+        math.ceil(int(first_page.get("count") or 0) / page_size),
+        math.ceil(max_products / page_size) + 1,  # 유효하지 않은 제품이 섞여 있을 것을 감안해 1페이지 여유
+    )
+
+    if total_pages > 1 and pages[1]:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        futures = {executor.submit(fetch_before_deadline, page): page for page in range(2, total_pages + 1)}
+        done, _ = wait(futures, timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+        # 시간 예산을 넘긴 페이지는 기다리지 않음 (각 요청은 자체 타임아웃으로 정리됨)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        for future in done:
+            if future.exception() is None:
+                pages[futures[future]] = future.result().get("products", [])
+
+    products = []
+    for page in sorted(pages):
+        valid_products = [product for product in pages[page] if is_valid_product(product)]
+        if not valid_products:
+            break  # 더 이상 유효한 음식이 없으면 이후 페이지는 사용하지 않음
+        products.extend(valid_products)
+    return products[:max_products]
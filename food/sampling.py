@@ -0,0 +1,36 @@
+import random
+
+# 식단 구성용 무작위 음식 샘플링 (테이블 전체를 파이썬으로 읽지 않음)
+# - id 범위 안의 임의 값 r 을 골라 "id >= r 인 첫 행"을 PK 인덱스로 찾음 (행마다 LIMIT 1 쿼리 1번)
+# - 이미 뽑은 행은 쿼리에서 제외하므로 중복 없이 정확히 count 번만 탐색
+# id 사이 빈 구간 바로 뒤의 행이 조금 더 자주 뽑히는 편향이 있지만 식단 추천 용도로는 충분함
+
+
+def sample_foods(queryset, count, exclude_ids=(), rng=random):
+    """queryset 에서 서로 다른 음식 count 개를 무작위로 뽑아 반환 (exclude_ids 는 제외)
+
+    조건에 맞는 음식이 count 개보다 적으면 있는 만큼만 반환
+    """
+    if count <= 0:
+        return []
+    queryset = queryset.exclude(id__in=list(exclude_ids)) if exclude_ids else queryset
+    # MIN/MAX 집계 대신 PK 인덱스 양 끝에서 LIMIT 1 로 조회 (필터가 있어도 전체 스캔하지 않음)
+    low = queryset.order_by("id").values_list("id", flat=True).first()
+    if low is None:
+        return []
+    high = queryset.order_by("-id").values_list("id", flat=True).first()
+
+    foods = []
+    chosen_ids = []
+    for _ in range(count):
+        food = _probe(queryset.exclude(id__in=chosen_ids), rng.randint(low, high))
+        if food is None:
+            break  # 남은 후보가 없음
+        foods.append(food)
+        chosen_ids.append(food.id)
+    return foods
+
+
+def _probe(queryset, pivot):
+    """pivot 이상인 첫 행, 없으면 처음으로 돌아가 가장 작은 id 의 행"""
+    return queryset.filter(id__gte=pivot).order_by("id").first() or queryset.order_by("id").first()
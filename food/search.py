@@ -0,0 +1,161 @@
+import re
+import threading
+from array import array
+from collections import defaultdict
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connection
+from django.db.models import Case, Count, IntegerField, Max, Q, Value, When
+
+from food.models import Food
+
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 50
+# pg_trgm 의 기본 similarity_threshold 와 같은 값
+SIMILARITY_THRESHOLD = 0.3
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize_query(query):
+    """검색어 정규화 (앞뒤 공백 제거, 연속 공백 축약, 소문자)"""
+    return " ".join(query.split()).lower()
+
+
+def trigrams(text):
+    """pg_trgm 과 같은 규칙으로 trigram 집합 생성 (단어마다 앞 공백 2칸, 뒤 공백 1칸)"""
+    grams = set()
+    for word in _WORD_RE.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(query_grams, name_grams, shared=None):
+    """pg_trgm similarity() 와 같은 정의: 공통 trigram 수 / 합집합 trigram 수"""
+    if shared is None:
+        shared = len(query_grams & name_grams)
+    union = len(query_grams) + len(name_grams) - shared
+    return shared / union if union else 0.0
+
+
+def _match_rank(name, query):
+    """정확히 일치 2, 부분 일치 1, 그 외 0 (PostgreSQL 쿼리의 match_rank 와 동일)"""
+    lowered = name.lower()
+    if lowered == query:
+        return 2
+    if query in lowered:
+        return 1
+    return 0
+
+
+class NgramIndex:
+    """PostgreSQL 이 아닐 때(SQLite 테스트 등) 쓰는 순수 파이썬 trigram 역색인"""
+
+    def __init__(self, rows):
+        self.ids = array("q")
+        self.names = []
+        self.gram_counts = array("H")
+        self.postings = defaultdict(lambda: array("I"))  # trigram -> 행 번호 목록
+
+        for row, (food_id, name) in enumerate(rows):
+            grams = trigrams(name)
+            self.ids.append(food_id)
+            self.names.append(name)
+            self.gram_counts.append(min(len(grams), 65535))
+            for gram in grams:
+                self.postings[gram].append(row)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def search(self, query, limit):
+        """(food_id, match_rank, similarity) 목록을 관련도 순으로 최대 limit개 반환"""
+        query = normalize_query(query)
+        query_grams = trigrams(query)
+
+        shared_counts = defaultdict(int)
+        for gram in query_grams:
+            for row in self.postings.get(gram, ()):
+                shared_counts[row] += 1
+
+        if len(query) < 3:
+            # trigram 이 거의 없는 짧은 검색어는 부분 일치를 놓칠 수 있으므로 전체 확인
+            candidates = (row for row, name in enumerate(self.names) if query in name.lower())
+            for row in candidates:
+                shared_counts.setdefault(row, 0)
+
+        scored = []
+        for row, shared in shared_counts.items():
+            score = shared / (len(query_grams) + self.gram_counts[row] - shared) if query_grams else 0.0
+            rank = _match_rank(self.names[row], query)
+            if rank or score >= SIMILARITY_THRESHOLD:
+                scored.append((-rank, -score, self.ids[row]))
+
+        scored.sort()
+        return [(food_id, -rank, -score) for rank, score, food_id in scored[:limit]]
+
+
+_index = None
+_index_stamp = None
+_index_lock = threading.Lock()
+
+
+def get_ngram_index():
+    """Food 테이블이 바뀌었을 때만(행 수, 마지막 수정시각 기준) 역색인을 다시 생성"""
+    global _index, _index_stamp
+
+    stamp = Food.objects.aggregate(count=Count("id"), updated=Max("updated_at"))
+    stamp = (stamp["count"], stamp["updated"])
+    with _index_lock:
+        if _index is None or _index_stamp != stamp:
+            rows = Food.objects.order_by("id").values_list("id", "name").iterator(chunk_size=5000)
+            _index = NgramIndex(rows)
+            _index_stamp = stamp
+        return _index
+
+
+def _search_postgresql(query, offset, limit):
+    # pg_trgm GIN 인덱스(food_name_trgm_idx)는 % 연산자와 ~* (iregex) 를 모두 인덱스로 처리함
+    # icontains 는 UPPER(name) LIKE ... 로 변환되어 인덱스를 못 쓰므로 iregex 로 부분 일치를 표현
+    return list(
+        Food.objects.filter(Q(name__trigram_similar=query) | Q(name__iregex=re.escape(query)))
+        .annotate(
+            similarity=TrigramSimilarity("name", query),
+            match_rank=Case(
+                When(name__iexact=query, then=Value(2)),
+                When(name__iregex=re.escape(query), then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField(),
+            ),
+        )
+        .order_by("-match_rank", "-similarity", "id")[offset:offset + limit]
+    )
+
+
+def _search_ngram(query, offset, limit):
+    hits = get_ngram_index().search(query, offset + limit)[offset:]
+    foods = Food.objects.in_bulk([food_id for food_id, _, _ in hits])
+    results = []
+    for food_id, rank, score in hits:
+        food = foods.get(food_id)
+        if food is not None:
+            food.match_rank = rank
+            food.similarity = score
+            results.append(food)
+    return results
+
+
+def search_foods(query, page=1, page_size=DEFAULT_PAGE_SIZE):
+    """음식 이름 검색 결과를 관련도 순으로 페이지 단위 반환 -> (음식 목록, 다음 페이지 존재 여부)"""
+    query = normalize_query(query)
+    page = max(int(page), 1)
+    page_size = min(max(int(page_size), 1), MAX_PAGE_SIZE)
+    offset = (page - 1) * page_size
+
+    # 다음 페이지 존재 여부 확인을 위해 1개 더 조회 (COUNT 쿼리 생략)
+    if connection.vendor == "postgresql":
+        foods = _search_postgresql(query, offset, page_size + 1)
+    else:
+        foods = _search_ngram(query, offset, page_size + 1)
+    return foods[:page_size], len(foods) > page_size
@@ -5,3 +5,10 @@ class FoodSerializer(serializers.ModelSerializer):
     class Meta:
         model = Food
         fields = ['id', "external_id",'name', 'calories', 'protein', 'carbs', 'fat', 'contains_nuts', 'contains_gluten', 'contains_dairy']
+
+
+class FoodInfoSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Food
+        fields = ["external_id", 'name', 'calories', 'protein', 'carbs', 'fat', 'contains_nuts', 'contains_gluten',
+                  'contains_dairy', 'categories', 'tags', 'labels']
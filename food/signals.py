@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from food.cache import invalidate_food
+from food.models import Food
+
+
+@receiver([post_save, post_delete], sender=Food)
+def invalidate_food_info_cache(sender, instance, **kwargs):
+    # bulk_create/update 경로는 시그널이 없으므로 캐시 TTL 안에서만 이전 값이 보일 수 있음
+    # 커밋 전에 다른 요청이 이전 값으로 다시 채웠을 수 있으므로 커밋 후 한 번 더 무효화
+    food_id = instance.pk
+    invalidate_food(food_id)
+    transaction.on_commit(lambda: invalidate_food(food_id))
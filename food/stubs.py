@@ -0,0 +1,39 @@
+# OpenFoodFacts 검색 API 스텁 (벤치마크용 합성 제품 데이터)
+
+ALLERGEN_TAGS = [[], ["en:nuts"], ["en:gluten"], ["en:milk"], []]
+
+
+def fake_product(n):
+    return {
+        "code": f"stub-{n}",
+        "product_name": f"stub product {n}",
+        "nutriments": {
+            "energy-kcal": 50 + n % 500,
+            "proteins": n % 30,
+            "carbohydrates": n % 70,
+            "fat": n % 25,
+        },
+        "ingredients_tags": ["en:water", "en:sugar"],
+        "categories_tags": ["en:snacks"],
+        "allergens_tags": ALLERGEN_TAGS[n % len(ALLERGEN_TAGS)],
+        "traces_tags": [],
+        "labels_tags": ["en:organic"] if n % 3 == 0 else [],
+    }
+
+
+def openfoodfacts_search_handler(total_products=1500):
+    """/cgi/search.pl 과 같은 형태로 page, page_size 에 맞는 제품 목록 반환"""
+
+    def handler(method, params, body):
+        page = int(params.get("page", 1))
+        page_size = int(params.get("page_size", 24))
+        start = (page - 1) * page_size
+        stop = min(start + page_size, total_products)
+        return 200, {
+            "count": total_products,
+            "page": page,
+            "page_size": page_size,
+            "products": [fake_product(n) for n in range(start, stop)],
+        }
+
+    return handler
@@ -1,3 +1,333 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from common.http import http_client
+from common.stub_server import StubServer
+from food.allergens import MAX_ALLERGENS, AllergenClassifier, get_classifier
+from food.cache import LOCK_TTL, get_food_info
+from food.columnar import build_table, load_table
+from food.models import Food
+from food.openfoodfacts import SEARCH_PATH, fetch_products
+from food.sampling import sample_foods
+from food.search import search_foods
+from food.stubs import fake_product, openfoodfacts_search_handler
+
+
+def make_food(external_id, name, **fields):
+    values = {"calories": 100, "protein": 1, "carbs": 1, "fat": 1}
+    values.update(fields)
+    return Food.objects.create(external_id=external_id, name=name, **values)
+
+
+class FoodSearchTest(TestCase):
+    def setUp(self):
+        make_food("1", "Banana chips")
+        make_food("2", "banana")
+        make_food("3", "Organic banana bread")
+        make_food("4", "Greek yogurt")
+
+    def test_exact_match_ranks_first(self):
+        foods, has_next = search_foods("  BANANA ")
+        self.assertEqual([food.external_id for food in foods][0], "2")
+        self.assertEqual({food.external_id for food in foods}, {"1", "2", "3"})
+        self.assertFalse(has_next)
+
+    def test_pagination(self):
+        first, has_next = search_foods("banana", page=1, page_size=2)
+        second, _ = search_foods("banana", page=2, page_size=2)
+        self.assertEqual(len(first), 2)
+        self.assertTrue(has_next)
+        self.assertEqual(len(second), 1)
+
+    def test_fuzzy_match(self):
+        foods, _ = search_foods("yoghurt")
+        self.assertEqual([food.external_id for food in foods], ["4"])
+
+    def test_search_view(self):
+        response = APIClient().get(reverse("food-search"), {"query": "banana", "page_size": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertTrue(response.data["has_next"])
+
+
+class FoodInfoCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.food = make_food("10", "Banana")
+        self.client = APIClient()
+
+    def test_normalized_query_hits_cache(self):
+        self.client.get(reverse("food-info"), {"query": "banana"})
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("food-info"), {"query": "  BANANA "})
+        self.assertEqual(response.data["external_id"], "10")
+
+    def test_not_found_is_cached(self):
+        loader = mock.Mock(return_value=None)
+        self.assertIsNone(get_food_info("nothing", loader))
+        self.assertIsNone(get_food_info("Nothing", loader))
+        loader.assert_called_once()
+
+    def test_food_update_invalidates_cache(self):
+        self.client.get(reverse("food-info"), {"query": "banana"})
+        self.food.calories = 250
+        self.food.save()
+        response = self.client.get(reverse("food-info"), {"query": "banana"})
+        self.assertEqual(response.data["calories"], 250)
+
+    def test_food_update_invalidates_every_query(self):
+        loader = mock.Mock(side_effect=lambda query: (self.food.id, {"query": query}))
+        get_food_info("banana", loader)
+        get_food_info("yellow banana", loader)
+
+        self.food.save()
+        get_food_info("banana", loader)
+        get_food_info("yellow banana", loader)
+
+        self.assertEqual(loader.call_count, 4)
+
+    def test_food_updated_during_load_is_not_cached(self):
+        def loader(query):
+            data = {"calories": self.food.calories}
+            self.food.save()  # 조회와 캐시 저장 사이에 다른 요청이 음식을 수정
+            return self.food.id, data
+
+        loader = mock.Mock(side_effect=loader)
+        get_food_info("banana", loader)
+        get_food_info("banana", loader)
+
+        self.assertEqual(loader.call_count, 2)
+
+    def test_concurrent_misses_load_once_without_blocking_other_keys(self):
+        release = threading.Event()
+        calls = []
+
+        def slow_loader(query):
+            calls.append(query)
+            release.wait(5)
+            return self.food.id, {"query": query}
+
+        threads = [threading.Thread(target=get_food_info, args=("slow", slow_loader)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        # 다른 검색어는 조회 중인 검색어를 기다리지 않음
+        self.assertEqual(get_food_info("fast", lambda query: (self.food.id, {"query": query})), {"query": "fast"})
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(calls, ["slow"])
+
+    def test_lock_outlives_upstream_retries(self):
+        self.assertGreater(LOCK_TTL, http_client.max_duration())
+
+
+class AllergenClassifierTest(TestCase):
+    def setUp(self):
+        self.classifier = AllergenClassifier({
+            "nuts": {"names": ["견과류"], "tags": ["en:nuts", "en:almonds"]},
+            "milk": {"names": ["유제품"], "tags": ["en:milk", "en:cheese"]},
+            "eggs": {"names": ["달걀", "계란"], "tags": ["en:eggs"]},
+        })
+        self.bits = self.classifier.bits
+
+    def test_bits_follow_taxonomy_order(self):
+        self.assertEqual(self.bits, {"nuts": 1, "milk": 2, "eggs": 4})
+
+    def test_classify_tags_ingredients_and_traces(self):
+        self.assertEqual(self.classifier.classify({"allergens_tags": ["en:milk"]}), self.bits["milk"])
+        self.assertEqual(self.classifier.classify({"ingredients_tags": ["en:water", "en:almonds"]}), self.bits["nuts"])
+        self.assertEqual(self.classifier.classify({"traces_tags": ["en:eggs"]}), self.bits["eggs"])
+        self.assertEqual(
+            self.classifier.classify({"categories_tags": ["en:cheese"], "traces_tags": ["en:nuts"], "labels_tags": None}),
+            self.bits["milk"] | self.bits["nuts"],
+        )
+        self.assertEqual(self.classifier.classify({"ingredients_tags": ["en:sugar"], "traces_tags": None}), 0)
+
+    def test_mask_for_profile_names_and_keys(self):
+        self.assertEqual(self.classifier.mask_for(["계란", "milk"]), self.bits["eggs"] | self.bits["milk"])
+        self.assertEqual(self.classifier.mask_for(["모르는 값"]), 0)
+        self.assertEqual(self.classifier.mask_for(None), 0)
+
+    def test_taxonomy_size_is_limited_by_mask_column(self):
+        AllergenClassifier({f"a{n}": {} for n in range(MAX_ALLERGENS)})
+        with self.assertRaises(ImproperlyConfigured):
+            AllergenClassifier({f"a{n}": {} for n in range(MAX_ALLERGENS + 1)})
+
+
+class FoodFilterTest(TestCase):
+    def test_safe_for_excludes_any_matching_allergen(self):
+        milk = get_classifier().bits["milk"]
+        nuts = get_classifier().bits["nuts"]
+        make_food("1", "우유", allergen_mask=milk)
+        make_food("2", "견과 우유", allergen_mask=milk | nuts)
+        make_food("3", "사과")
+        profile = mock.Mock(allergies=["유제품"])
+
+        names = set(Food.objects.safe_for(profile).values_list("name", flat=True))
+
+        self.assertEqual(names, {"사과"})
+
+    def test_with_tags_and_preferences(self):
+        make_food("1", "두부", tags=["en:soy", "en:water"], labels=["en:vegan"])
+        make_food("2", "치즈", tags=["en:milk"], labels=["en:organic"])
+
+        self.assertEqual(list(Food.objects.with_tags("en:soy", "en:water").values_list("name", flat=True)), ["두부"])
+        profile = mock.Mock(preferences=["채식"])
+        self.assertEqual(list(Food.objects.matching_preferences(profile).values_list("name", flat=True)), ["두부"])
+
+
+class FoodSamplingTest(TestCase):
+    def test_sample_is_distinct_and_respects_filters(self):
+        for n in range(30):
+            make_food(str(n), f"음식 {n}", allergen_mask=get_classifier().bits["milk"] if n % 3 == 0 else 0)
+        excluded = Food.objects.get(external_id="1")
+        profile = mock.Mock(allergies=["유제품"])
+
+        foods = sample_foods(Food.objects.safe_for(profile), 9, exclude_ids=[excluded.id])
+
+        self.assertEqual(len({food.id for food in foods}), 9)
+        self.assertTrue(all(food.allergen_mask == 0 and food.id != excluded.id for food in foods))
+
+    def test_sample_returns_what_is_available(self):
+        make_food("1", "사과")
+        make_food("2", "배")
+
+        self.assertEqual(len(sample_foods(Food.objects.all(), 9)), 2)
+        self.assertEqual(sample_foods(Food.objects.none(), 9), [])
+
+
+class NutrientTableTest(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+    def test_incremental_build_merges_changes_and_deletions(self):
+        apple = make_food("1", "사과", calories=52)
+        milk = make_food("2", "우유", calories=60, allergen_mask=get_classifier().bits["milk"])
+        removed = make_food("3", "삭제될 음식")
+        build_table(self.root)
+
+        Food.objects.filter(id=apple.id).update(calories=55, updated_at=timezone.now() + timedelta(seconds=1))
+        removed.delete()
+        bread = make_food("4", "빵", calories=250)
+        version, meta = build_table(self.root)
+
+        table = load_table(self.root)
+        self.assertEqual((table.version, meta["mode"]), (version, "incremental"))
+        self.assertEqual(table.id.tolist(), [apple.id, milk.id, bread.id])
+        self.assertEqual(table.calories.tolist(), [55, 60, 250])
+
+        ids, nutrients = table.candidates(get_classifier().mask_for(["유제품"]))
+        self.assertEqual(ids.tolist(), [apple.id, bread.id])
+        self.assertEqual(nutrients.shape, (2, 4))
+
+    def test_row_committed_after_build_with_earlier_updated_at_is_picked_up(self):
+        apple = make_food("1", "사과", calories=52)
+        build_started = timezone.now()
+        build_table(self.root)
+
+        # 빌드 시작 전에 저장(updated_at)됐지만 빌드가 읽은 뒤에 커밋된 변경
+        Food.objects.filter(id=apple.id).update(calories=55, updated_at=build_started - timedelta(seconds=30))
+        build_table(self.root)
+
+        self.assertEqual(load_table(self.root).calories.tolist(), [55])
+
+
+class ImportOpenFoodFactsTest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def write_jsonl(self, products, name="dump.jsonl.gz"):
+        path = os.path.join(self.tmp, name)
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            for product in products:
+                f.write((json.dumps(product) if product else "not json") + "\n")
+        return path
+
+    def run_import(self, path, *args):
+        call_command("import_openfoodfacts", path, "--batch-size", "2", *args, stdout=io.StringIO())
+
+    def test_jsonl_upsert_skips_invalid_records(self):
+        products = [fake_product(n) for n in range(3)]
+        path = self.write_jsonl([*products, None, {"code": "no-name", "nutriments": {}}])
+        self.run_import(path)
+
+        self.assertEqual(Food.objects.count(), 3)
+
+        # 같은 코드를 다시 임포트하면 새로 만들지 않고 갱신
+        products[0]["product_name"] = "renamed"
+        self.run_import(self.write_jsonl(products[:1], "update.jsonl.gz"))
+        self.assertEqual(Food.objects.count(), 3)
+        self.assertEqual(Food.objects.get(external_id="stub-0").name, "renamed")
+
+    def test_csv_columns_are_mapped(self):
+        path = os.path.join(self.tmp, "dump.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("code\tproduct_name\tenergy-kcal_100g\tproteins_100g\tallergens_tags\tlabels_tags\n")
+            f.write("c1\tMilk\t64\t3.3\ten:milk\ten:organic,en:eu-organic\n")
+        self.run_import(path)
+
+        food = Food.objects.get(external_id="c1")
+        self.assertEqual((food.name, food.calories, food.protein), ("Milk", 64, 3.3))
+        self.assertTrue(food.contains_dairy)
+        self.assertEqual(food.labels, ["en:organic", "en:eu-organic"])
+
+    def test_resume_from_checkpoint_with_limit(self):
+        path = self.write_jsonl([fake_product(n) for n in range(7)])
+
+        self.run_import(path, "--limit", "4")
+        self.assertEqual(Food.objects.count(), 4)
+        with open(f"{path}.checkpoint") as f:
+            self.assertEqual(json.load(f)["records"], 4)
+
+        # 재개 시 --limit 은 체크포인트 이후 읽을 개수
+        self.run_import(path, "--limit", "2")
+        self.assertEqual(Food.objects.count(), 6)
+        self.run_import(path)
+        self.assertEqual(set(Food.objects.values_list("external_id", flat=True)), {f"stub-{n}" for n in range(7)})
+
+
+class FetchProductsTest(TestCase):
+    def search_server(self, slow_page=None, delay=1.0):
+        handler = openfoodfacts_search_handler(total_products=50)
+
+        def slow_handler(method, params, body):
+            if int(params.get("page", 1)) == slow_page:
+                time.sleep(delay)
+            return handler(method, params, body)
+
+        return StubServer({SEARCH_PATH: slow_handler})
+
+    def test_concurrent_pages_are_merged_in_order(self):
+        with self.search_server() as stub, override_settings(OPENFOODFACTS_BASE_URL=stub.url):
+            products = fetch_products("stub", max_products=50, page_size=10, max_workers=4)
+
+        self.assertEqual([product["code"] for product in products], [f"stub-{n}" for n in range(50)])
+
+    def test_budget_returns_partial_results(self):
+        with self.search_server(slow_page=3) as stub, override_settings(OPENFOODFACTS_BASE_URL=stub.url):
+            started = time.monotonic()
+            products = fetch_products("stub", max_products=50, page_size=10, budget=0.5, max_workers=4)
+            elapsed = time.monotonic() - started
+
+        codes = [product["code"] for product in products]
+        self.assertLess(elapsed, 1.0)  # 느린 페이지를 기다리지 않음
+        self.assertEqual(codes, [f"stub-{n}" for n in range(50) if not 20 <= n < 30])
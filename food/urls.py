@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import FoodInfoView
+from .views import FoodInfoView, FoodSearchView
 
 urlpatterns = [
     path("info/", FoodInfoView.as_view(), name="food-info"),
+    path("search/", FoodSearchView.as_view(), name="food-search"),  # 관련도 순 검색 목록
 ]
\ No newline at end of file
@@ -1,99 +1,97 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import APIException
 from food.models import Food
+from food.openfoodfacts import product_to_food_data, search_url, FOOD_DATA_FIELDS
+from food.search import search_foods, DEFAULT_PAGE_SIZE
+from food.serializers import FoodSerializer, FoodInfoSerializer
 import requests
-from django.core.cache import cache
+from common.http import http_client
+from food.cache import get_food_info
+import logging
+
+logger = logging.getLogger(__name__)
+
+class UpstreamTimeout(APIException):
+    status_code = status.HTTP_504_GATEWAY_TIMEOUT
+    default_detail = "외부 API 응답이 너무 느립니다."
+
+
+class UpstreamError(APIException):
+    status_code = status.HTTP_502_BAD_GATEWAY
+    default_detail = "외부 API 요청 실패"
+
 
 class FoodInfoView(APIView):
     def get(self, request):
         query = request.query_params.get("query")  # 사용자가 입력한 query를 가져옴 예:?query=banana
         # 검색어가 없을 경우 에러 반환
-        if not query:
+        if not query or not query.strip():
             return Response({"detail": "음식 이름을 입력하세요."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # 캐시에서 데이터 확인
-        cache_key = f"food_info_{query}"  # 검색어를 이용해 캐시 키 생성 (food_info_banana)
-        cached_data = cache.get(cache_key)  # 이미 캐시에 저장된 데이터가 있으면 가져옴
-        if cached_data:
-            return Response(cached_data, status=status.HTTP_200_OK)  # 캐싱된 데이터 반환
+        # 캐시 -> DB -> 외부 API 순서로 조회 (없으면 결과를 캐시에 저장)
+        food_data = get_food_info(query, self.load_food_info)
+        if food_data is None:
+            return Response({"detail": "검색된 음식을 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(food_data, status=status.HTTP_200_OK)
 
-        # DB에서 해당 음식이 존재하는지 확인
-        food_in_db = Food.objects.filter(name__icontains=query).first()  # 이름으로 검색 (부분 일치)
-        if food_in_db:
+    def load_food_info(self, query):
+        """캐시 미스일 때 호출 -> (food_id, 응답 데이터) 또는 None"""
+        # DB에서 해당 음식이 존재하는지 확인 (trigram 색인 기반 관련도 1순위)
+        found_foods, _ = search_foods(query, page_size=1)
+        if found_foods:
             # DB에 저장된 음식이 있다면, DB에서 가져온 데이터를 응답으로 반환
-            food_data = {
-                "external_id": food_in_db.external_id,
-                "name": food_in_db.name,
-                "calories": food_in_db.calories,
-                "protein": food_in_db.protein,
-                "carbs": food_in_db.carbs,
-                "fat": food_in_db.fat,
-                "contains_nuts": food_in_db.contains_nuts,
-                "contains_gluten": food_in_db.contains_gluten,
-                "contains_dairy": food_in_db.contains_dairy,
-                "categories": food_in_db.categories,  # 카테고리 태그 추가
-                "tags": food_in_db.tags,  # 성분 태그 추가
-                "labels": food_in_db.labels  # 라벨 데이터 포함
-            }
-            return Response(food_data, status=status.HTTP_200_OK)
-
-        # 캐시와 DB에서 찾지 못했으면 외부 API 호출
-        search_url = f"https://world.openfoodfacts.org/cgi/search.pl?search_terms={query}&search_simple=1&action=process&json=1"
+            return found_foods[0].id, FoodInfoSerializer(found_foods[0]).data
+
+        # 캐시와 DB에서 찾지 못했으면 외부 API 호출 (실패는 캐싱하지 않도록 예외로 전달)
         try:
-            search_response = requests.get(search_url, timeout=50)  # 타임아웃 설정 (시간 초과 방지)
+            search_response = http_client.get(search_url(query, page_size=1), timeout=10)  # 시도별 타임아웃 (재시도는 공용 클라이언트가 처리)
             search_response.raise_for_status()  # HTTP 오류 발생 시 예외 처리
             search_data = search_response.json()  # 정상적으로 가져오면 search_data에 저장됨
         except requests.exceptions.Timeout:
-            return Response({"detail": "외부 API 응답이 너무 느립니다."}, status=status.HTTP_504_GATEWAY_TIMEOUT)
+            raise UpstreamTimeout()
         except requests.exceptions.RequestException:
-            return Response({"detail": "외부 API 요청 실패"}, status=status.HTTP_502_BAD_GATEWAY)
+            raise UpstreamError()
 
         # API 응답 데이터에서 음식 정보 추출
-        if search_response.status_code == 200:
-            products = search_data.get("products", [])  # api 응답에서 products 리스트를 가져옴
-
-            if products:
-                product = products[0]  # 첫 번째 음식만 선택 (첫 번째 음식은 검색어와 가장 관련이 높은 음식일 가능성이 높음)
-                # 음식 정보 생성 (기존 모델에 맞춰 저장)
-                food_data = {
-                    "external_id": product.get("code", None),
-                    "name": product.get("product_name", query),
-                    "calories": product.get("nutriments", {}).get("energy-kcal", 0),
-                    "protein": product.get("nutriments", {}).get("proteins", 0),
-                    "carbs": product.get("nutriments", {}).get("carbohydrates", 0),
-                    "fat": product.get("nutriments", {}).get("fat", 0),
-                    "contains_nuts": "en:nuts" in product.get("ingredients_tags", []) or "en:nuts" in product.get("categories_tags", []) or "en:nuts" in product.get("allergens_tags", []) or "en:nuts" in product.get("traces_tags", []),
-                    "contains_gluten": "en:gluten" in product.get("ingredients_tags", []) or "en:gluten" in product.get("categories_tags", []) or "en:gluten" in product.get("allergens_tags", []) or "en:gluten" in product.get("traces_tags", []),
-                    "contains_dairy": "en:dairy" in product.get("ingredients_tags", []) or "en:dairy" in product.get("categories_tags", []) or "en:dairy" in product.get("allergens_tags", []) or "en:dairy" in product.get("traces_tags", []),
-                    "categories": product.get("categories_tags", []),  # 카테고리 태그
-                    "tags": product.get("ingredients_tags", []),      # 성분 태그
-                    "labels": product.get("labels_tags", [])  # 라벨 데이터 추가
-                }
-
-                # 외부에서 가져온 데이터를 DB에 저장 (새로운 음식 객체로 생성)
-                food, created = Food.objects.update_or_create(
-                    external_id=food_data["external_id"],
-                    defaults={
-                        'name': food_data["name"],
-                        'calories': food_data["calories"],
-                        'protein': food_data["protein"],
-                        'carbs': food_data["carbs"],
-                        'fat': food_data["fat"],
-                        'contains_nuts': food_data["contains_nuts"],
-                        'contains_gluten': food_data["contains_gluten"],
-                        'contains_dairy': food_data["contains_dairy"],
-                        'categories': food_data["categories"],
-                        'tags': food_data["tags"],
-                        'labels': food_data["labels"]  # 라벨 저장
-                    }
-                )
-
-                if created:
-                    print(f"[DB 저장 성공] 음식 추가됨: {food.name}")
-                else:
-                    print(f"[DB 존재] 기존 음식 업데이트됨: {food.name}")
-
-                return Response(food_data, status=status.HTTP_200_OK)
-
-        return Response({"detail": "검색된 음식을 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+        products = search_data.get("products", [])  # api 응답에서 products 리스트를 가져옴
+        if not products or not products[0].get("code"):
+            return None
+
+        product = products[0]  # 첫 번째 음식만 선택 (첫 번째 음식은 검색어와 가장 관련이 높은 음식일 가능성이 높음)
+        # 음식 정보 생성 (기존 모델에 맞춰 저장)
+        food_data = product_to_food_data(product, default_name=query)
+
+        # 외부에서 가져온 데이터를 DB에 저장 (새로운 음식 객체로 생성)
+        food, created = Food.objects.update_or_create(
+            external_id=food_data["external_id"],
+            defaults={field: food_data[field] for field in FOOD_DATA_FIELDS}
+        )
+
+        logger.debug("외부 API 음식 %s: %s", "추가" if created else "업데이트", food.name,
+                     extra={"food_id": food.id, "created": created})
+
+        return food.id, FoodInfoSerializer(food).data
+
+
+class FoodSearchView(APIView):
+    def get(self, request):
+        """음식 이름 검색 (관련도 순, 페이지네이션) 예: ?query=banana&page=1&page_size=10"""
+        query = request.query_params.get("query", "").strip()
+        if not query:
+            return Response({"detail": "음식 이름을 입력하세요."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            page = int(request.query_params.get("page", 1))
+            page_size = int(request.query_params.get("page_size", DEFAULT_PAGE_SIZE))
+        except ValueError:
+            return Response({"detail": "page, page_size 는 정수여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        foods, has_next = search_foods(query, page=page, page_size=page_size)
+        return Response({
+            "query": query,
+            "page": max(page, 1),
+            "has_next": has_next,
+            "results": FoodSerializer(foods, many=True).data,
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,15 @@
+import os
+
+# gunicorn 설정 (Dockerfile CMD 에서 -c 로 사용)
+# - 워커가 종료되면 그 워커의 메트릭 파일을 종료된 워커 합계로 옮기고 삭제 (common/metrics.py)
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "main_project_07.settings")
+
+
+def child_exit(server, worker):
+    from common.metrics import retire_worker
+
+    try:
+        retire_worker(worker.pid)
+    except OSError:
+        server.log.warning("워커 %s 메트릭 파일 정리 실패", worker.pid, exc_info=True)
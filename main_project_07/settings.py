@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 from pathlib import Path
 import os
+import tempfile
 from dotenv import load_dotenv  # .env 불러오기
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,7 +47,7 @@ DJANGO_SYSTEM_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-
+    'django.contrib.postgres',  # pg_trgm 검색 (TrigramSimilarity)
 ]
 CUSTOM_USER_APPS = [
     'diet',
@@ -62,7 +63,10 @@ CUSTOM_USER_APPS = [
 INSTALLED_APPS = DJANGO_SYSTEM_APPS + CUSTOM_USER_APPS
 
 MIDDLEWARE = [
+    'common.middleware.RequestIdMiddleware',  # 요청 id (로그 request_id, X-Request-ID 헤더)
+    'common.middleware.ProfilingMiddleware',  # 일부 요청 샘플링 프로파일 (PROFILE_SAMPLE_RATE, X-Profile 헤더)
     'corsheaders.middleware.CorsMiddleware',
+    'common.middleware.QueryInstrumentationMiddleware',  # 요청별 쿼리 수/DB 시간 (common.sql 로그, DEBUG/staff 는 Server-Timing 헤더)
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -72,6 +76,51 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# SQL 계측 (common/middleware.py)
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))  # 이보다 느린 SELECT 는 EXPLAIN 을 함께 로그
+SQL_REPEAT_THRESHOLD = int(os.getenv("SQL_REPEAT_THRESHOLD", "5"))  # 같은 모양 쿼리가 이만큼 반복되면 N+1 경고
+SQL_EXPLAIN_MAX = 3  # 요청당 EXPLAIN 최대 개수
+
+# 로그: JSON 한 줄씩 stdout 으로 출력, 실제 쓰기는 백그라운드 스레드가 처리 (common/logging.py)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+DEBUG_LOG_SAMPLE_RATE = float(os.getenv("DEBUG_LOG_SAMPLE_RATE", "0.01"))  # DEBUG 로그를 남길 요청 비율
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "filters": {
+        "request_id": {"()": "common.logging.RequestIdFilter"},
+        "debug_sampling": {"()": "common.logging.DebugSamplingFilter", "rate": DEBUG_LOG_SAMPLE_RATE},
+    },
+    "formatters": {
+        "json": {"()": "common.logging.JsonFormatter"},
+    },
+    "handlers": {
+        "console": {
+            "class": "common.logging.BackgroundHandler",
+            "stream": "ext://sys.stdout",
+            "formatter": "json",
+            "filters": ["request_id", "debug_sampling"],
+        },
+    },
+    "root": {"handlers": ["console"], "level": "WARNING"},
+    "loggers": {
+        "django": {"level": "INFO"},
+        **{app: {"level": LOG_LEVEL} for app in ["common", "diet", "dietfood", "food", "user"]},
+    },
+}
+
+# 샘플링 프로파일러 (common/profiling.py): 기본은 꺼짐, 헤더 토큰이나 비율로 켬
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(BASE_DIR, "var", "profiles"))
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))  # 프로파일할 요청 비율
+PROFILE_HEADER_TOKEN = os.getenv("PROFILE_HEADER_TOKEN")  # X-Profile 헤더가 이 값이면 그 요청을 프로파일
+PROFILE_INTERVAL = 0.005  # 스택 샘플링 주기(초)
+PROFILE_KEEP = 50  # URL 이름별로 남길 프로파일 파일 수
+
+# 메트릭 (common/metrics.py): 워커별 값을 저장할 디렉터리 (배포 시 비우기), 스크레이프 토큰 (없으면 staff 만 조회)
+METRICS_DIR = os.getenv("METRICS_DIR", os.path.join(tempfile.gettempdir(), "main_project_07_metrics"))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
 ROOT_URLCONF = 'main_project_07.urls'
 
 TEMPLATES = [
@@ -137,18 +186,49 @@ REST_FRAMEWORK = {
     ),
 
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'user.authentication.CachedJWTAuthentication',  # JWT + 사용자/프로필 캐시 (user/authentication.py)
     )
 }
 
+PRINCIPAL_CACHE_TTL = 60  # 인증 사용자 스냅샷 캐시 유지 시간(초), 저장 시에는 바로 무효화
+
+# 로그인/회원가입 비밀번호 해시의 호스트 전체 동시 실행 수 (user/hashing.py), 0 이면 제한 없이 바로 계산
+# 슬롯 디렉터리는 같은 호스트의 모든 gunicorn 워커가 공유해야 함
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_SLOT_DIR = os.getenv(
+    "PASSWORD_HASH_SLOT_DIR", os.path.join(tempfile.gettempdir(), "main_project_07_password_hash")
+)
+PASSWORD_HASH_WAIT = 0.5  # 슬롯이 날 때까지 기다릴 시간(초), 넘으면 503
+PASSWORD_HASH_RETRY_AFTER = 1  # 503 응답의 Retry-After(초)
+
 
 
 
+# 캐시: 워커별 L1(LRU) + 워커 간 공유 L2 (common/cache.py TieredCache)
+# L2 는 REDIS_URL 이 있으면 Redis, 없으면(로컬/테스트) 파일 기반 캐시 사용
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    SHARED_CACHE = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+    }
+else:
+    SHARED_CACHE = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(tempfile.gettempdir(), "main_project_07_cache"),
+    }
+
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",  # 로컬 메모리 캐싱
-        "LOCATION": "unique-snowflake",  # 캐시 구분을 위한 위치명
-    }
+        "BACKEND": "common.cache.TieredCache",
+        "OPTIONS": {
+            "SHARED": "shared",  # L2 로 쓸 캐시 alias
+            "L1_MAX_ENTRIES": 2000,
+            "L1_TIMEOUT": 5,  # L1 보관 시간(초)
+            "VERSION_CHECK_INTERVAL": 1,  # 다른 워커의 무효화 확인 간격(초)
+        },
+    },
+    "shared": SHARED_CACHE,
 }
 
 AUTH_USER_MODEL = 'user.User'
@@ -170,10 +250,31 @@ import os
 # Gunicorn 타임아웃 설정
 os.environ.setdefault("GUNICORN_CMD_ARGS", "--timeout 60")
 
+# OpenFoodFacts 검색 API
+OPENFOODFACTS_BASE_URL = os.getenv("OPENFOODFACTS_BASE_URL", "https://world.openfoodfacts.org")
+OPENFOODFACTS_FETCH_BUDGET = float(os.getenv("OPENFOODFACTS_FETCH_BUDGET", "8"))  # 식단 생성 시 외부 API 전체 시간 예산(초)
+
+# 음식 영양소 컬럼 테이블 (manage.py build_nutrient_table 로 생성, 워커들이 mmap 으로 공유)
+NUTRIENT_TABLE_DIR = os.getenv("NUTRIENT_TABLE_DIR", os.path.join(BASE_DIR, "var", "nutrient_table"))
+
 KAKAO_CLIENT_ID = "072d2d003b490b28d2f4e683471df7b8"
 KAKAO_REDIRECT_URI = "http://localhost:3000/callback"
 KAKAO_CLIENT_SECRET = ""  # 선택사항 (없어도 됨)
 
+GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID", "")
+GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET", "")
+GOOGLE_REDIRECT_URI = os.getenv("GOOGLE_REDIRECT_URI", "http://localhost:3000/callback")
+NAVER_CLIENT_ID = os.getenv("NAVER_CLIENT_ID", "")
+NAVER_CLIENT_SECRET = os.getenv("NAVER_CLIENT_SECRET", "")
+
+# 소셜 로그인 OAuth 엔드포인트 (벤치마크/테스트에서 로컬 스텁 서버로 바꿀 수 있음)
+GOOGLE_TOKEN_URL = os.getenv("GOOGLE_TOKEN_URL", "https://oauth2.googleapis.com/token")
+GOOGLE_USER_INFO_URL = os.getenv("GOOGLE_USER_INFO_URL", "https://www.googleapis.com/oauth2/v2/userinfo")
+KAKAO_TOKEN_URL = os.getenv("KAKAO_TOKEN_URL", "https://kauth.kakao.com/oauth/token")
+KAKAO_USER_INFO_URL = os.getenv("KAKAO_USER_INFO_URL", "https://kapi.kakao.com/v2/user/me")
+NAVER_TOKEN_URL = os.getenv("NAVER_TOKEN_URL", "https://nid.naver.com/oauth2.0/token")
+NAVER_USER_INFO_URL = os.getenv("NAVER_USER_INFO_URL", "https://openapi.naver.com/v1/nid/me")
+
 CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:5173",
     "http://localhost:5173",
@@ -200,3 +301,8 @@ CORS_ALLOW_HEADERS = (
 
 CORS_ALLOW_CREDENTIALS = True
 
+
+# 브라우저에서 읽을 수 있는 응답 헤더 (식단 목록 다음 페이지 커서)
+CORS_EXPOSE_HEADERS = (
+    "x-next-cursor",
+)
@@ -29,6 +29,8 @@ urlpatterns = [
 
     path("api/dietfood/", include("dietfood.urls")), # 음식 추가/제거, 양 수정
 
+    path("api/common/", include("common.urls")), # 운영용 (메트릭, 프로파일)
+
 
 ]
 
@@ -1,3 +1,17 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from common.cache import shared_cache
+from user.models import Profile, User
+
 # from rest_framework_simplejwt.authentication import JWTAuthentication
 # from rest_framework_simplejwt.settings import api_settings
 # from user.models import User  # ✅ User 모델 직접 가져오기
@@ -25,3 +39,96 @@
 #             return None  # 기타 예외
 #
 #         return user, validated_token
+
+
+# 인증된 사용자(principal) 캐시
+# - 요청마다 JWT 의 user_id 로 User 를 조회하던 것을 User + Profile 스냅샷 캐시로 대체 (캐시 hit 이면 쿼리 0번)
+#   공유 캐시(Redis)에는 요청 처리에 쓰는 필드만 dict 로 저장 (비밀번호 해시는 저장하지 않고 토큰 폐기 확인용 md5 만)
+# - 키: principal:<user_id>:<버전>, 버전은 사용자별 무작위 값이라 User/Profile 저장 시 새 버전으로 바꾸면
+#   이전 스냅샷은 더 이상 읽히지 않음 (user/signals.py), 남은 값은 PRINCIPAL_CACHE_TTL 뒤 만료
+# - 버전 키는 L1 을 거치지 않는 공유 캐시에 두어 다른 워커의 무효화(비활성화 등)가 바로 반영되게 함
+# - 스냅샷은 읽기 전용으로 사용 (수정은 DB 에서 다시 읽은 객체로)
+
+PRINCIPAL_USER_FIELDS = ("id", "email", "name", "nickname", "is_active", "is_staff", "is_superuser")
+PRINCIPAL_PROFILE_FIELDS = tuple(field.name for field in Profile._meta.concrete_fields if field.name != "user")
+
+
+def _version_key(user_id):
+    return f"principal_version:{user_id}"
+
+
+def _principal_version(user_id):
+    versions = shared_cache()
+    version = versions.get(_version_key(user_id))
+    if version is None:
+        # 버전 키가 없으면(만료/삭제) 새 값으로 시작해 이전 스냅샷과 겹치지 않게 함
+        versions.add(_version_key(user_id), uuid.uuid4().hex, None)
+        version = versions.get(_version_key(user_id))
+    return version
+
+
+def principal_key(user_id):
+    return f"principal:{user_id}:{_principal_version(user_id)}"
+
+
+def _load_snapshot(user_id):
+    """User + Profile 을 쿼리 1번으로 읽어 캐시할 dict 로 변환, 없는 사용자면 None"""
+    row = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).values(
+        *PRINCIPAL_USER_FIELDS, "password", *(f"profile__{name}" for name in PRINCIPAL_PROFILE_FIELDS)
+    ).first()
+    if row is None:
+        return None
+    return {
+        "user": {name: row[name] for name in PRINCIPAL_USER_FIELDS},
+        "revoke_claim": get_md5_hash_password(row["password"]),  # CHECK_REVOKE_TOKEN 비교 값
+        "profile": {name: row[f"profile__{name}"] for name in PRINCIPAL_PROFILE_FIELDS}
+        if row["profile__id"] is not None else None,
+    }
+
+
+def _from_snapshot(snapshot):
+    """스냅샷 -> 저장하지 않은 User (user.profile 은 쿼리 없이 스냅샷 값, 프로필이 없으면 DoesNotExist)"""
+    user = User(**snapshot["user"])
+    user.revoke_claim = snapshot["revoke_claim"]
+    profile = Profile(user_id=user.pk, **snapshot["profile"]) if snapshot["profile"] else None
+    User.profile.related.set_cached_value(user, profile)
+    if profile is not None:
+        Profile.user.field.set_cached_value(profile, user)
+    return user
+
+
+def get_principal(user_id):
+    """user_id 의 User (profile 포함) 스냅샷, 없는 사용자면 None"""
+    key = principal_key(user_id)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = _load_snapshot(user_id)
+        if snapshot is None:
+            return None
+        cache.set(key, snapshot, settings.PRINCIPAL_CACHE_TTL)
+    return _from_snapshot(snapshot)
+
+
+def invalidate_principal(user_id):
+    shared_cache().set(_version_key(user_id), uuid.uuid4().hex, None)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication 과 같은 검사를 하되 사용자 조회는 principal 캐시 사용"""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        user = get_principal(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and (
+            validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != user.revoke_claim
+        ):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
@@ -0,0 +1,79 @@
+import fcntl
+import os
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, get_hasher, identify_hasher, make_password
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+# 비밀번호 해시/검증(PBKDF2 등 CPU 작업)의 호스트 전체 동시 실행 수 제한
+# - gunicorn 워커(프로세스)와 스레드가 함께 쓰는 PASSWORD_HASH_WORKERS 개의 슬롯 파일에 flock 을 걸어
+#   슬롯을 잡은 요청만 해시를 계산 (로그인이 몰려도 나머지 CPU 는 다른 API 가 사용)
+# - PASSWORD_HASH_WAIT 안에 슬롯을 잡지 못하면 503 + Retry-After 로 거절
+# - 슬롯은 해시 계산이 끝나면 바로 풀리고, 프로세스가 죽으면 커널이 flock 을 풀어 줌
+# - 해시는 요청 스레드에서 계산 (hashlib 의 PBKDF2 는 계산 중 GIL 을 놓으므로 같은 프로세스의 다른 스레드는 계속 진행)
+# - PASSWORD_HASH_WORKERS = 0 이면 제한 없이 바로 계산 (테스트/로컬)
+
+SLOT_POLL_INTERVAL = 0.01  # 슬롯이 모두 사용 중일 때 다시 시도하는 간격(초)
+
+
+class PasswordHashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "로그인 요청이 많습니다. 잠시 후 다시 시도해 주세요."
+    default_code = "password_hashing_busy"
+
+    def __init__(self):
+        super().__init__()
+        self.wait = settings.PASSWORD_HASH_RETRY_AFTER  # DRF 가 Retry-After 헤더로 변환
+
+
+def _try_acquire(slot_dir, slots):
+    """비어 있는 슬롯 파일 하나에 flock -> 열린 파일 디스크립터, 모두 사용 중이면 None"""
+    for n in range(slots):
+        fd = os.open(os.path.join(slot_dir, f"slot-{n}.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            continue
+        return fd
+    return None
+
+
+@contextmanager
+def hashing_slot():
+    """해시 계산 동안 호스트 전체 슬롯 하나를 잡음 (PASSWORD_HASH_WAIT 안에 못 잡으면 PasswordHashingBusy)"""
+    slots = settings.PASSWORD_HASH_WORKERS
+    if not slots:
+        yield
+        return
+
+    os.makedirs(settings.PASSWORD_HASH_SLOT_DIR, exist_ok=True)
+    deadline = time.monotonic() + settings.PASSWORD_HASH_WAIT
+    while (fd := _try_acquire(settings.PASSWORD_HASH_SLOT_DIR, slots)) is None:
+        if time.monotonic() >= deadline:
+            raise PasswordHashingBusy()
+        time.sleep(SLOT_POLL_INTERVAL)
+    try:
+        yield
+    finally:
+        os.close(fd)  # flock 해제
+
+
+def hash_password(raw_password):
+    """슬롯을 잡고 make_password -> 저장할 해시 문자열"""
+    with hashing_slot():
+        return make_password(raw_password)
+
+
+def verify_password(raw_password, encoded):
+    """슬롯을 잡고 check_password -> (일치 여부, 현재 해시 설정으로 다시 해시해야 하는지)"""
+    with hashing_slot():
+        valid = check_password(raw_password, encoded)
+    if not valid:
+        return False, False
+    # 알고리즘/반복 횟수 비교는 문자열만 보면 되므로 슬롯 밖에서 확인 (check_password 의 setter 와 같은 기준)
+    hasher, preferred = identify_hasher(encoded), get_hasher("default")
+    return True, hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
@@ -2,7 +2,7 @@ import base64
 from django.core.files.base import ContentFile
 from rest_framework import serializers
 from .models import User, Profile
-from django.contrib.auth.hashers import check_password
+from .hashing import hash_password, verify_password
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -28,7 +28,7 @@ class RegisterSerializer(serializers.ModelSerializer):
             name=validated_data["name"],
             nickname=validated_data.get("nickname"),
         )
-        user.set_password(validated_data["password"])
+        user.password = hash_password(validated_data["password"])  # 호스트 전체 동시 해시 수 제한
         user.save()
 
         # ✅ 회원가입 시 자동으로 Profile 생성
@@ -47,9 +47,15 @@ class LoginSerializer(serializers.Serializer):
         except User.DoesNotExist:
             raise serializers.ValidationError("이메일이 잘못되었습니다.")
 
-        if not check_password(data['password'], user.password):
+        valid, must_update = verify_password(data['password'], user.password)
+        if not valid:
             raise serializers.ValidationError("비밀번호가 잘못되었습니다.")
 
+        # 해시 알고리즘/반복 횟수 설정이 바뀌었으면 로그인 시점에 새 설정으로 다시 저장
+        if must_update:
+            user.password = hash_password(data['password'])
+            user.save(update_fields=["password"])
+
         return user
 
 
@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from user.authentication import invalidate_principal
+from user.models import Profile, User
+
+
+@receiver([post_save, post_delete], sender=User)
+@receiver([post_save, post_delete], sender=Profile)
+def invalidate_principal_cache(sender, instance, **kwargs):
+    user_id = instance.pk if sender is User else instance.user_id
+    # 지금 바로 무효화하고, 커밋 전에 다른 요청이 이전 값으로 다시 채웠을 수 있으므로 커밋 후 한 번 더
+    invalidate_principal(user_id)
+    transaction.on_commit(lambda: invalidate_principal(user_id))
@@ -1,4 +1,4 @@
-import requests
+from common.http import http_client
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
@@ -11,7 +11,7 @@ class GoogleLoginAPIView(APIView):
     def post(self, request):
         code = request.data.get("code")
 
-        token_url = "https://oauth2.googleapis.com/token"
+        token_url = settings.GOOGLE_TOKEN_URL
         data = {
             "client_id": settings.GOOGLE_CLIENT_ID,
             "client_secret": settings.GOOGLE_CLIENT_SECRET,
@@ -20,14 +20,14 @@ class GoogleLoginAPIView(APIView):
             "redirect_uri": settings.GOOGLE_REDIRECT_URI,
         }
 
-        response = requests.post(token_url, data=data)
+        response = http_client.post(token_url, data=data)
         token_data = response.json()
 
         if "access_token" not in token_data:
             return Response({"error": "Invalid authorization code"}, status=status.HTTP_400_BAD_REQUEST)
 
-        user_info_url = "https://www.googleapis.com/oauth2/v2/userinfo"
-        user_info_response = requests.get(user_info_url, headers={"Authorization": f"Bearer {token_data['access_token']}"})
+        user_info_url = settings.GOOGLE_USER_INFO_URL
+        user_info_response = http_client.get(user_info_url, headers={"Authorization": f"Bearer {token_data['access_token']}"})
         user_info = user_info_response.json()
 
         email = user_info.get("email")
@@ -48,7 +48,7 @@ class KakaoLoginAPIView(APIView):
     def post(self, request):
         code = request.data.get("code")
 
-        token_url = "https://kauth.kakao.com/oauth/token"
+        token_url = settings.KAKAO_TOKEN_URL
         data = {
             "grant_type": "authorization_code",
             "client_id": settings.KAKAO_CLIENT_ID,
@@ -57,14 +57,14 @@ class KakaoLoginAPIView(APIView):
             "code": code,
         }
 
-        response = requests.post(token_url, data=data)
+        response = http_client.post(token_url, data=data)
         token_data = response.json()
 
         if "access_token" not in token_data:
             return Response({"error": "Invalid authorization code"}, status=status.HTTP_400_BAD_REQUEST)
 
-        user_info_url = "https://kapi.kakao.com/v2/user/me"
-        user_info_response = requests.get(user_info_url, headers={"Authorization": f"Bearer {token_data['access_token']}"})
+        user_info_url = settings.KAKAO_USER_INFO_URL
+        user_info_response = http_client.get(user_info_url, headers={"Authorization": f"Bearer {token_data['access_token']}"})
         user_info = user_info_response.json()
 
         email = user_info.get("kakao_account", {}).get("email")
@@ -86,7 +86,7 @@ class NaverLoginAPIView(APIView):
         code = request.data.get("code")
         state = request.data.get("state")
 
-        token_url = "https://nid.naver.com/oauth2.0/token"
+        token_url = settings.NAVER_TOKEN_URL
         data = {
             "grant_type": "authorization_code",
             "client_id": settings.NAVER_CLIENT_ID,
@@ -95,14 +95,14 @@ class NaverLoginAPIView(APIView):
             "state": state,
         }
 
-        response = requests.post(token_url, data=data)
+        response = http_client.post(token_url, data=data)
         token_data = response.json()
 
         if "access_token" not in token_data:
             return Response({"error": "Invalid authorization code"}, status=status.HTTP_400_BAD_REQUEST)
 
-        user_info_url = "https://openapi.naver.com/v1/nid/me"
-        user_info_response = requests.get(user_info_url, headers={"Authorization": f"Bearer {token_data['access_token']}"})
+        user_info_url = settings.NAVER_USER_INFO_URL
+        user_info_response = http_client.get(user_info_url, headers={"Authorization": f"Bearer {token_data['access_token']}"})
         user_info = user_info_response.json()
 
         email = user_info.get("response", {}).get("email")
@@ -1,3 +1,141 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, get_hasher
+from django.core.cache import cache, caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from user import hashing
+from user.authentication import _version_key, principal_key
+from user.models import Profile, User
+
+
+class CachedJWTAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="me@example.com", password="pw", name="나", nickname="me")
+        Profile.objects.create(user=self.user, age=30, allergies=["견과류"], preferences=["고단백"])
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}")
+
+    def test_repeated_requests_do_not_query_user_or_profile(self):
+        self.client.get(reverse("my-info"))  # 캐시 채우기 (User + Profile 쿼리 1번)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("my-info"))
+        self.assertEqual(response.data["profile"]["allergies"], ["견과류"])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("profile"))
+        self.assertEqual(response.data["preferences"], ["고단백"])
+
+    def test_cached_snapshot_does_not_contain_password_hash(self):
+        self.client.get(reverse("my-info"))
+
+        snapshot = cache.get(principal_key(self.user.pk))
+        self.assertNotIn("password", snapshot["user"])
+        self.assertNotIn(self.user.password, repr(snapshot))
+        self.assertEqual(snapshot["profile"]["allergies"], ["견과류"])
+
+    def test_user_without_profile_is_cached_without_queries(self):
+        user = User.objects.create_user(email="new@example.com", password="pw", name="새", nickname="new")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+        self.client.get(reverse("my-info"))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("my-info"))
+        self.assertIsNone(response.data["profile"])
+
+    def test_profile_update_invalidates_cache(self):
+        self.client.get(reverse("profile"))
+
+        response = self.client.put(reverse("profile"), {"allergies": ["유제품"]}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.client.get(reverse("profile")).data["allergies"], ["유제품"])
+        self.assertEqual(self.client.get(reverse("my-info")).data["profile"]["allergies"], ["유제품"])
+
+    def test_user_changes_invalidate_cache(self):
+        self.client.get(reverse("my-info"))
+
+        User.objects.filter(pk=self.user.pk).update(name="이전 캐시")  # 시그널 없는 변경은 TTL 동안 이전 값
+        self.assertEqual(self.client.get(reverse("my-info")).data["name"], "나")
+
+        self.user.name = "새 이름"
+        self.user.save()
+        self.assertEqual(self.client.get(reverse("my-info")).data["name"], "새 이름")
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse("my-info")).status_code, 401)
+
+        self.user.delete()
+        self.assertEqual(self.client.get(reverse("my-info")).status_code, 401)
+
+    def test_other_worker_invalidation_is_seen_immediately(self):
+        self.client.get(reverse("my-info"))
+
+        # 다른 워커의 무효화는 L2 의 버전 키만 바꿈 -> 이 워커 L1 의 이전 스냅샷을 바로 쓰지 않음
+        caches["shared"].set(_version_key(self.user.pk), "other-worker", None)
+        with self.assertNumQueries(1):
+            self.client.get(reverse("my-info"))
+
+
+@override_settings(PASSWORD_HASH_WORKERS=0)
+class PasswordHashingTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="login@example.com", password="pw1234", name="로그인",
+                                             nickname="login")
+
+    def login(self, password="pw1234"):
+        return self.client.post(reverse("login"), {"email": "login@example.com", "password": password},
+                                content_type="application/json")
+
+    def test_login_and_signup(self):
+        self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(self.login("wrong").status_code, 400)
+
+        response = self.client.post(reverse("signup"), {
+            "email": "new@example.com", "password": "pw5678", "name": "새", "nickname": "new",
+        }, content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(User.objects.get(email="new@example.com").check_password("pw5678"))
+
+    def test_outdated_hash_is_upgraded_on_login(self):
+        outdated = PBKDF2PasswordHasher().encode("pw1234", "oldsalt", iterations=1000)  # 예전 반복 횟수
+        User.objects.filter(pk=self.user.pk).update(password=outdated)
+
+        self.assertEqual(self.login().status_code, 200)
+
+        self.user.refresh_from_db()
+        self.assertNotEqual(self.user.password, outdated)
+        self.assertFalse(get_hasher("default").must_update(self.user.password))
+        self.assertEqual(self.login().status_code, 200)
+
+    def hold_slots(self, slot_dir):
+        """다른 워커(프로세스)가 슬롯을 모두 사용 중인 상태"""
+        fd = hashing._try_acquire(slot_dir, 1)
+        self.addCleanup(os.close, fd)
+
+    def test_saturated_slots_return_503_with_retry_after(self):
+        slot_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, slot_dir)
+        with override_settings(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_SLOT_DIR=slot_dir, PASSWORD_HASH_WAIT=0):
+            self.hold_slots(slot_dir)
+            response = self.login()
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+
+    def test_slot_is_released_after_hashing(self):
+        slot_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, slot_dir)
+        with override_settings(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_SLOT_DIR=slot_dir, PASSWORD_HASH_WAIT=0):
+            encoded = hashing.hash_password("secret")
+            self.assertEqual(hashing.verify_password("secret", encoded), (True, False))
+            self.assertEqual(hashing.verify_password("other", encoded), (False, False))
+            self.assertEqual(self.login().status_code, 200)
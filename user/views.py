@@ -9,6 +9,9 @@ from .models import User,Profile
 from .serializers import RegisterSerializer, LoginSerializer, UserSerializer, UserUpdateSerializer, ProfileSerializer
 from django.core.files.base import ContentFile
 import base64
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 # 회원가입 api
@@ -81,20 +84,24 @@ class MyUserInfoAPIView(APIView):
         return Response(serializer.errors, status=400)
 
     def delete(self, request, pk):
-        print(f"Deleting user with id: {pk}")
         # 본인 계정만 삭제 가능하도록 제한
         if request.user.pk != pk:
             raise PermissionDenied('본인의 정보만 삭제할 수 있습니다.')
 
         user = get_object_or_404(User, pk=pk)
         user.delete()
+        logger.info("회원 탈퇴", extra={"user_id": pk})
         return Response({"message": "Deleted successfully"}, status=200)
 
 class ProfileView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        profile, created = Profile.objects.get_or_create(user=request.user)
+        # 인증 시 캐시에서 함께 가져온 프로필 사용 (없을 때만 생성)
+        try:
+            profile = request.user.profile
+        except Profile.DoesNotExist:
+            profile, created = Profile.objects.get_or_create(user=request.user)
         serializer = ProfileSerializer(profile)
         return Response(serializer.data, status=status.HTTP_200_OK)
 